@@ -26,12 +26,23 @@
 # ---
 
 # %%
+import os
+import sys
+import tempfile
 import numpy as np
-from typing import Any, List, Union, Optional, Tuple, Callable
+from typing import Any, List, Union, Optional, Tuple, Callable, Iterator
 from fractions import Fraction
 from math import *
 import matplotlib.pyplot as plt
-from itertools import product
+from itertools import product, groupby, islice
+from timeit import timeit
+from functools import lru_cache, partial
+from operator import mul
+from collections import deque
+
+# %% [markdown]
+# Les fonctions présentées dans ce notebook sont définies dans le paquet Python `rationnels` (répertoire `rationnels/`), qui s'importe sans exécuter les démonstrations du notebook et sans importer `matplotlib`: chaque fonction est importée du paquet là où elle est présentée, et son code peut être lu avec `??`, par exemple `SBpath??`.
+# Seules les premières versions de certaines fonctions, remplacées plus loin par des versions plus rapides, sont encore définies dans le notebook.
 
 # %% [markdown]
 # # Arbres binaires
@@ -42,28 +53,7 @@ from itertools import product
 # Ci-dessous une fonction `bin_levels(lst)` qui transforme une liste `lst` en  les niveaux de l'arbre binaire correspondant.
 
 # %% {"code_folding": [0]}
-def bin_levels(lst: List[Any]) -> List[List[Any]]:
-    """ divide a list in blocks (lists) corresponding to the first levels of a binary tree
-    
-    Args: 
-        lst:  a list
-    Returns:
-        a list of levels: [lvls[0],...,lvls[k],..., lvls[-1]]] 
-        length(lvls[0]) == 1, lvls[0][0] is the root of the binary tree
-        for each level k > 0, len(lvls[k]) == 2*len(lvls[k-1]), 
-        but for the last level, len(lvls[-1]) <= 2*len(lvls[-2]) depending on len(lst)
-    Example:
-        if lst = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
-        bin_levels(lst) -> [[1], [2, 3], [4, 5, 6, 7], [8, 9, 10, 11, 12, 13, 14, 15]]
-    """
-    n = len(lst)
-    lvls = []
-    m = 1
-    while 2*m <= n:
-        lvls.append(lst[m-1:2*m-1])
-        m = 2*m
-    lvls.append(lst[m-1:n+1])
-    return lvls
+from rationnels.bintree import bin_levels
 
 # %%
 l13 = list(range(1,14))
@@ -71,49 +61,11 @@ print('l13 = {}'.format(l13))
 print('levels:             0    1       2             3')
 print('bin_levels(l13):  {}'.format(bin_levels(l13)))
 
-
 # %% [markdown]
 # Et `print_bintree(levels)` est un "pretty print" des arbres binaires représentés de cette façon.
 
 # %% {"code_folding": [0]}
-def print_bintree(lvls : List[List[Any]],r: int = 1, fmt: Callable[[Any],str] = str) -> None:
-    """ pretty print of a binary tree defined by lvls as in the result 
-        of the bin_levels function
-        
-    Args:
-        lvls: binary tree as a list of levels: [lvls[0],...,lvls[k],..., lvls[-1]]] 
-              length(lvls[0]) == 1, lvls[0][0] is the root of the binary tree
-              for each level k > 0, len(lvls[k]) == 2*len(lvls[k-1]), 
-              but for the last level, len(lvls[-1]) <= 2*len(lvls[-2]) 
-        r:    (int) w = 2*r+1 is the width of printed label for each node.
-              default: r=1 => 3 characters for each node's label
-        fmt:  a function defining the print format of each node. 
-              default: the function str
-    Returns:
-        None: this function is just for printing the first levels of a binary tree 
-    """
-    def bn(klvl: int, r: int, n: int) -> int:
-        """returns the half-distance between two nodes at level klvl
-        
-        Args:
-            klvl: (int) the level number
-            r:    (int) w = 2*r+1 is the width of label for each node
-            n:    number of levels
-        Returns:
-            (int) the half-distance between two nodes at level klvl
-        """
-        return (2*r+1)*(2**(n-1-klvl)-1)
-    n = len(lvls)
-    # lbn: list of the half-distance lbn[k] between two nodes at each level k
-    lbn = [bn(k,r,n) for k in range(n)]
-    # lu[k]: length of horizontal branches in level k
-    lu = [el//2 for el in lbn]
-    # w: number of chars for each node
-    w = 2*r+1
-    for k in range(n):
-        print(''.join([(lbn[k]+r)*' ' + '|' + (lbn[k]+3*r+1)*' ' for el in lvls[k]]))
-        print(''.join([(lu[k]+(k!=(n-1)))*' ' + lu[k]*'_' + '{:^{}}'.format(fmt(el),w) + 
-                       lu[k]*'_'+ (lu[k]+(k!=(n-1))+2*r+1)*' ' for el in lvls[k]]))
+from rationnels.bintree import print_bintree
 
 # %%
 print_bintree(bin_levels(l13))
@@ -131,19 +83,7 @@ print_bintree(bin_levels(l13))
 # Et ainsi de suite ... 
 
 # %%
-def paths_level(k: int) -> List[str]:
-    """ return the path strings describing the kth level of a binary tree:
-    
-    Args: 
-        k: an integer
-    Returns:
-        a list of strings, defining the ordered list of the level's nodes
-    Examples:
-        [''] for the root at level k = 0
-        ['L', 'R'] for the left and right sons of the root at the first level k = 1,
-        ['LL', 'LR', 'RL', 'RR'] at level k = 2 for the respective left and right sons of level 1 nodes
-        """
-    return [''.join(t) for t in product(('L','R'),repeat=k)]
+from rationnels.bintree import paths_level
 
 # %%
 print(paths_level(3))
@@ -152,52 +92,7 @@ print(paths_level(3))
 # ##  Bits representation  
 
 # %%
-def ints2bin(ints: List[int], nbits: Optional[int] = None) -> List[str]:
-    """ return the list of the binary representations on nbits of all integers in the list ints.
-    
-    Args:
-        ints: a list of integers 
-        nbits: an integer, the fixed length for all the bits string representing the integers in ints.
-        If nbits == None then for each integer in ints the binary representation is the string of minimal length
-    Returns:
-        The list of the binary representation of the integers in ints
-    Example:
-        ints2bin([1,2],nbits=3) ->  ['001', '010']
-        ints2bin([1,2]) ->  ['1', '10']
-    """
-    return [np.binary_repr(k,nbits) for k in ints]
-
-def rev_ints(ints: List[int], nbits: Optional[int] = None) -> List[int]:
-    """return the list of integers resulting of the reversing of the binary repr of the integers in  ints
-    
-    Args:
-        ints: a list of integers 
-        nbits: an integer, the fixed length for all the bits string representing the integers in ints.
-        If nbits == None then for each integer in ints the binary representation is the string of minimal length   
-    Returns:
-        the list of integers resulting of the reversing of the binary repr of the integers in  ints
-    Example:
-        rev_ints([1,2],nbits=3) -> [4, 2] (['001', '010'] -> ['100', '010'])
-        rev_ints([1,2]) -> [1, 1] (['1', '10'] -> ['1', '1'])
-    """
-    return [int(bits[::-1],2) for bits in ints2bin(ints,nbits)]
-
-def str_translate(s: str, fromchrs: str = '01', tochrs: str = '10') -> str:
-    """substitute in the string s the characters in fromchrs to those in tochrs and return the resulting string
-    
-    Args:
-        s: a string
-        fromchrs: a string listing all the characters to be changed
-        tochrs: a string listing the corresponding substitutes
-    Returns:
-        the string resulting from the substitutions in s.
-    Examples:
-       str_transl('1101') -> '0010'
-       str_transl('LLRL','LR','01') -> '0010'
-    """
-    if s == '':
-        return tochrs[0]
-    return s.translate(dict(list(zip((map(ord,fromchrs)),tochrs))))
+from rationnels.bintree import ints2bin, rev_ints, str_translate
 
 # %% [markdown]
 # Par les substitutions: `L -> 0` and `R -> 1`, nous remplaçons l'indexation d'un noeud avec un "chemin" par une paire d'entiers `(level, idx)` indiquant la position `idx` du noeud dans la liste décrivant le niveau `level`.  
@@ -207,36 +102,13 @@ def str_translate(s: str, fromchrs: str = '01', tochrs: str = '10') -> str:
 # Nous définissons ci-dessous deux fonctions réciproques l'une de l'autre pour passer d'une indexation à l'autre: `level_idx(path_string)` et `path_str(level,idx)`
 
 # %%
-def level_idx(path_string: str) -> Tuple[int, int]:
-    """ returns a pair of integers(level_number,idx) identifying the positition  
-        idx of a node in the list representing the level in a binary tree.
-    
-    Args:
-        path_string: a string of 'L' and 'R',describing the left and right from the root moves to reach a node
-    Returns:
-        a tuple of 2 integers: the node's level number and his index position in the corresponding list
-    Example:
-        level_idx('RRL') -> (3, 6)
-        """
-    return len(path_string), int(str_translate(path_string,'LR','01'), 2)
+from rationnels.bintree import level_idx
 
 # %%
 level_idx('RRL')
 
 # %%
-def path_str(level: int, idx: int) -> str:
-    """ returns the path string of the node defined by level and idx
-    
-    Args:
-        level: (int) node's level number of the node the pair of integers(level,idx) identifies the positition idx of a node 
-        idx: (int) node's index in the list representing the level
-    Returns:
-        the node's corresponding path string
-    Example:
-        path_str(3,6) == 'RRL' 
-    """
-    return str_translate(np.binary_repr(idx,level),'01','LR')
-
+from rationnels.bintree import path_str
 
 # %%
 path_str(3,6)
@@ -377,7 +249,6 @@ for l in SBdens_5:
 i=3
 print(list(zip(SBnums_5[i],SBdens_5[i])))
 
-
 # %% [markdown]
 # Ou comme liste des fractions correspondantes:
 
@@ -411,6 +282,19 @@ print_bintree(SBpairs(5),fmt=lambda pair:'{},{}'.format(*pair))
 # %%
 print_bintree(SBpairs(5),fmt=lambda pair:str(Fraction(*pair)))
 
+# %% [markdown]
+# La largeur des lignes double à chaque niveau : pour de grands arbres, `write_bintree` écrit le même dessin dans un fichier (ou tout objet ayant une méthode `write`) par morceaux, sans construire les lignes entières, en ne formatant qu'une fois chaque valeur. On peut ne dessiner qu'un sous-arbre (`root=(niveau, idx)`) sur quelques niveaux (`depth`), et couper les lignes trop larges (`max_width`), seuls les noeuds du début des niveaux larges étant alors formatés.
+
+# %%
+from rationnels.bintree import write_bintree
+write_bintree(SBpairs(12), root=(2, 1), depth=4, r=2, fmt=lambda pair: '{}/{}'.format(*pair))
+write_bintree(SBpairs(12), root=(3, 2), depth=6, max_width=120, fmt=lambda pair: '{}/{}'.format(*pair))
+tree16 = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False)
+print('16 niveaux: {:.2f}s'.format(timeit(lambda: write_bintree(SBpairs(16), tree16, fmt=lambda pair: '{},{}'.format(*pair)), number=1)))
+tree16.close()
+print(os.path.getsize(tree16.name), 'octets')
+os.remove(tree16.name)
+
 # %% [markdown]
 # And if we combine the second results `stern_levels(m,a=0,b=1)[1]` and `stern_levels(m,a=1,b=0)[1]`
 # we'll get the "projection", as an ordered sequence of all the fractions of the `m` levels tree just above.
@@ -516,6 +400,41 @@ print_bintree(CWpairs(5),fmt=lambda pair:str(Fraction(*pair)))
 # %%
 print(stern_levels(5)[1])
 
+# %% [markdown]
+# ## Niveaux sous forme de tableaux numpy
+# `stern_levels` construit chaque niveau élément par élément avec une boucle Python, et `SBpairs`, `CWpairs` assemblent ensuite des listes de tuples: au delà d'une vingtaine de niveaux (des millions de noeuds) c'est lent et trés gourmand en mémoire.
+# Or la liste `l` de `stern_levels` passe d'une étape à la suivante en intercalant entre deux termes consécutifs leur somme: avec des tableaux numpy, les termes de `l` vont aux indices pairs de la nouvelle liste et les sommes `l[:-1] + l[1:]` aux indices impairs.
+# De plus les termes insérés à l'étape `k` restent ensuite à leur place relative: dans la liste finale de $2^m+1$ termes, les numérateurs du niveau `k` sont ceux d'indices $2^{m-1-k}, 3 \cdot 2^{m-1-k}, 5 \cdot 2^{m-1-k}, \ldots$, c'est à dire la tranche `l[2**(m-1-k)::2**(m-k)]`.
+# Les tableaux sont de type `np.uint64` tant que les termes, majorés par $(a+b)$ fois un nombre de Fibonacci, tiennent sur 64 bits, et de type `object` (entiers Python) sinon.
+
+# %%
+from rationnels.sternseq import stern_dtype
+from rationnels.levels import stern_row, stern_arrays, SBarrays, CWarrays
+
+# %%
+for nums, dens in SBarrays(4):
+    print(nums, dens)
+for nums, dens in CWarrays(4):
+    print(nums, dens)
+
+# %% [markdown]
+# Comparaison avec la version de `stern_levels` construisant des listes, pour 20 niveaux (plus d'un million de noeuds):
+
+# %%
+print('stern_levels: {:.2e}s   stern_arrays: {:.2e}s'.format(
+    timeit(lambda: stern_levels(20), number=1), timeit(lambda: stern_arrays(20), number=1)))
+print(all((lvl == np.array(lvl_list)).all() for lvl, lvl_list in zip(stern_arrays(12)[0], stern_levels(12)[0])))
+
+# %% [markdown]
+# `stern_levels`, `SBpairs` et `CWpairs` sont redéfinies à partir des tableaux; elles retournent toujours des listes d'entiers Python et des listes de paires:
+
+# %%
+from rationnels.levels import stern_levels, SBpairs, CWpairs
+
+# %%
+print(SBpairs(4))
+print(CWpairs(4))
+
 # %% [markdown]
 # #  Arbre de Stern-Brocot ou de Calkin-Wilf comme représentations des fractions positives irréductibles   
 # Comme nous l'avons vu dans le chapitre **Arbres Binaires** nous pouvons utiliser les lettres L et R pour se déplacer sur la branche gauche ou droite d'un noeud et à partir de la racine atteindre n'importe quel noeud, une chaîne de L et de R identifiant de manière unique une place dans l'arbre. Nous pouvons utiliser cette démarche pour atteindre une fraction précise dans l'un des deux arbres que nous avons construit.  
@@ -551,38 +470,7 @@ print(stern_levels(5)[1])
 # `path2mat(S)`   pour le produit matriciel des matrices élémentaires L, R dans le chemin S représentant un noeud de l'arbre. 
 
 # %%
-""" Specific 2x2 matrices in the Stern-Brocot context"""
-L = np.array([[1,1],[0,1]])  # left move, left root's son
-R = np.array([[1,0],[1,1]])  # right move, right root's son
-I = np.eye(2,dtype=int)      #identity, root
-
-def powmat(M: np.array, n: int) -> np.array:
-    """ return the n-th power of a matrix M 
-    
-    Args: 
-        M: (np.array) a square matrix pxp
-        n: (int) exponent
-    Returns:
-        the n-th power of M
-    """    
-    assert n >= 0, "{} is not a positive or null integer".format(n)
-    if n == 0:
-        return np.eye(M.shape[0],dtype=int)
-    return M @ powmat(M,n-1)
-
-def matprod(mats: List[np.array], n: int = 2)-> np.array:
-    """ mats is a list of matrices pxp. By defaut n == 2
-    
-    Args:
-        mats: a list of square matrices pxp
-    Returns:
-        the matrix (np.array) product of all the matrices in the list in the same order
-    """
-    if len(mats) == 0:
-        return np.eye(n,dtype=int)
-    if len(mats) == 1:
-        return mats[0]
-    return mats[0] @ matprod(mats[1:])
+from rationnels.matrices import L, R, I, LR_mats, powmat, matprod
 
 def path2mat(S: str) -> np.array:
     """return the matrix product corresponding to a path string in a Stern-Brocot binary tree 
@@ -592,7 +480,7 @@ def path2mat(S: str) -> np.array:
     Returns:
         the corresponding product matrix (np.array)
     """
-    return matprod([eval(chr) for chr in S])
+    return matprod([LR_mats[chr] for chr in S])
 
 print('I = ')
 print(I)
@@ -647,7 +535,6 @@ print(M@[1,1])
 print([1,1]@L@R@L@L)
 print([1,1]@M)
 
-
 # %% [markdown]
 # #  Fraction représentée par un chemin  
 # Remarquons aussi que la matrice transposée L.T de L est justement R et donc que la transposée R.T de R est L.
@@ -665,7 +552,6 @@ print((L@R@L@L).T == R@R@L@R)
 print(R@R@L@R)
 print(M.T@[1,1])
 
-
 # %% [markdown]
 # Nous pouvons ainsi définir une fonction `SBfrac(S)` qui retourne la valeur de la fraction qui se trouve à la place définie par le chemin `S` dans l'arbre de Stern-Brocot:
 
@@ -680,7 +566,7 @@ def SBfrac(S: str) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn'
     Example:
         SBfrac('LRLL') -> Fraction(4, 7)
     """
-    M = matprod([eval(chr) for chr in S])
+    M = matprod([LR_mats[chr] for chr in S])
     den, num = M@[1,1]
     return Fraction(num, den)
 
@@ -704,7 +590,7 @@ def CWfrac(S: str) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn'
     Example:
         CWfrac('LRLL') -> Fraction(3, 7)
     """
-    M = matprod([eval(chr) for chr in S])
+    M = matprod([LR_mats[chr] for chr in S])
     num,dem = [1,1]@M
     return Fraction(num,dem)
 
@@ -929,6 +815,301 @@ def SBpath(frac: Union[Tuple[int, int], str]) -> str:
 # %%
 print(SBpath(3/8) == CWpath(3/8)[::-1] == 'LLRL')
 
+# %% [markdown]
+# ## Chemins compressés (run-length encoding)
+# Les fonctions `CWpath` et `SBpath` ci-dessus effectuent une soustraction par caractère du chemin: pour la fraction `1/10**9` il faudrait un milliard de pas!
+# Or une suite de soustractions `num -= den` répétées `q` fois n'est rien d'autre que la division euclidienne `divmod(num, den)`: le chemin d'une fraction est formé de "plages" de `L` et de `R` dont les longueurs sont les quotients partiels de l'algorithme d'Euclide, c'est à dire les termes du développement en fraction continue de `num/den` (le dernier terme étant diminué de 1).
+# Nous représentons donc un chemin de manière compacte par la liste de ses plages `[(chr, k), ...]`, par exemple `'LLRL'` par `[('L', 2), ('R', 1), ('L', 1)]`, et le nombre d'opérations devient proportionnel au nombre de quotients et non plus à la taille du numérateur.
+
+# %%
+from rationnels.paths import frac2pair, SBpath_rle, CWpath_rle, rle2path, path2rle
+
+# %%
+print(SBpath_rle(3/8), CWpath_rle(3/8))
+print(rle2path(SBpath_rle(3/8)) == SBpath(3/8) and path2rle('LLRL') == SBpath_rle(3/8))
+
+# %% [markdown]
+# Les fonctions `SBpath` et `CWpath` deviennent alors le simple développement des plages:
+
+# %%
+from rationnels.paths import SBpath, CWpath
+
+# %%
+print(SBpath(3/8) == CWpath(3/8)[::-1] == 'LLRL')
+print(SBpath_rle((1, 10**9)))
+
+# %% [markdown]
+# Même pour des fractions dont le numérateur et le dénominateur ont des milliers de chiffres, comme le quotient de deux nombres de Fibonacci consécutifs, le chemin compressé est obtenu instantanément:
+
+# %%
+fib_a, fib_b, big = 1, 1, 10**10000
+while fib_b < big:
+    fib_a, fib_b = fib_b, fib_a + fib_b
+fib_runs = SBpath_rle((fib_b, fib_a))
+print(len(fib_runs), sum(k for _, k in fib_runs))
+
+# %% [markdown]
+# ## Évaluation exacte d'un chemin compressé
+# Les matrices `L`, `R` et `I` sont des `np.array` d'entiers machine (`int64`): dés que le chemin dépasse quelques dizaines de caractères les coefficients de la matrice produit dépassent $2^{63}$ et `matprod` retourne silencieusement un résultat faux.
+# Or les puissances de `L` et de `R` s'écrivent directement:
+# $$L^k = \begin{bmatrix} 1 & k \\ 0 & 1 \end{bmatrix} \quad  \textrm{   et   } \quad R^k = \begin{bmatrix} 1 & 0 \\ k & 1 \end{bmatrix}$$
+# et la multiplication à droite de $M = \begin{bmatrix} a & b \\ c & d \end{bmatrix}$ par $L^k$ ou $R^k$ ne modifie qu'une colonne:
+# $$M L^k = \begin{bmatrix} a & b + ka \\ c & d + kc \end{bmatrix} \quad  \textrm{   et   } \quad M R^k = \begin{bmatrix} a + kb & b \\ c + kd & d \end{bmatrix}$$
+# Avec les chemins compressés, une plage de `k` caractères coûte donc deux multiplications d'entiers Python, qui sont de précision arbitraire.
+# La fonction `rle2mat(runs)` retourne les coefficients `(a, b, c, d)` de la matrice produit, avec les entiers Python ou, si le module optionnel `gmpy2` est installé, avec des entiers `gmpy2.mpz` plus rapides pour les trés grands nombres.
+
+# %%
+from rationnels.paths import rle2mat
+
+# %%
+rle2mat(path2rle('LRLL'))
+
+# %% [markdown]
+# `path2mat`, `SBfrac` et `CWfrac` sont redéfinies à partir de `rle2mat`: elles acceptent aussi bien un chemin `S` qu'un chemin compressé, et `path2mat` retourne un `np.array` de `dtype=object` dont les coefficients sont des entiers Python.
+
+# %%
+def path2mat(S: Union[str, List[Tuple[str, int]]], backend: str = 'int') -> np.array:
+    """return the exact matrix product corresponding to a path string in a Stern-Brocot binary tree
+
+    Args:
+        S: (str) a node's path string or its run-length encoded path
+        backend: (str) 'int' for Python integers or 'gmpy2' for gmpy2.mpz integers
+    Returns:
+        the corresponding product matrix (np.array of dtype object)
+    """
+    runs = path2rle(S) if isinstance(S, str) else S
+    a, b, c, d = rle2mat(runs, backend)
+    return np.array([[a, b], [c, d]], dtype=object)
+
+def SBfrac(S: Union[str, List[Tuple[str, int]]]) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the Stern-Brocot node value as the fraction corresponding to the string path S
+
+    Args:
+        S: (str) a Stern-Brocot node path string or its run-length encoded path
+    Returns:
+        the Fraction value of the corresponding node
+    Example:
+        SBfrac('LRLL') -> Fraction(4, 7)
+    """
+    runs = path2rle(S) if isinstance(S, str) else S
+    a, b, c, d = rle2mat(runs)
+    return Fraction(c + d, a + b)
+
+def CWfrac(S: Union[str, List[Tuple[str, int]]]) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the Calkin-Wilf node value as the fraction corresponding to the string path S
+
+    Args:
+        S: (str) a Calkin-Wilf node path string or its run-length encoded path
+    Returns:
+        the Fraction value of the corresponding node
+    Example:
+        CWfrac('LRLL') -> Fraction(3, 8)
+    """
+    runs = path2rle(S) if isinstance(S, str) else S
+    a, b, c, d = rle2mat(runs)
+    return Fraction(a + c, b + d)
+
+# %%
+print(path2mat('LRLL'))
+print(SBfrac('LRLL'), CWfrac('LRLL'), SBfrac(SBpath_rle((fib_b, fib_a))) == Fraction(fib_b, fib_a))
+
+# %% [markdown]
+# Comparons avec le calcul `matprod([LR_mats[chr] for chr in S])` sur le chemin `'LR'*400` de longueur 800, dont les fractions sont des quotients de deux nombres de Fibonacci: les entiers `int64` ont débordé sans aucun message d'erreur.
+
+# %%
+S_fib = 'LR'*400
+print(matprod([LR_mats[chr] for chr in S_fib]))
+print(path2mat(S_fib))
+print('matprod: {:.2e}s   rle2mat: {:.2e}s'.format(
+    timeit(lambda: matprod([LR_mats[chr] for chr in S_fib]), number=10)/10,
+    timeit(lambda: rle2mat(path2rle(S_fib)), number=10)/10))
+
+# %% [markdown]
+# Et un chemin de 100000 caractères (`'LR'*50000`, soit 100000 plages de longueur 1, le pire cas pour la compression) est évalué exactement en une fraction de seconde:
+
+# %%
+runs_100k = path2rle('LR'*50000)
+print('rle2mat: {:.2e}s'.format(timeit(lambda: rle2mat(runs_100k), number=1)))
+try:
+    print('gmpy2: {:.2e}s'.format(timeit(lambda: rle2mat(runs_100k, backend='gmpy2'), number=1)))
+except ImportError:
+    print('gmpy2 is not installed')
+print(SBfrac(runs_100k).numerator.bit_length(), 'bits')
+
+# %% [markdown]
+# ## Produit de matrices sans récursion
+# La première version de `matprod` était récursive: `mats[0] @ matprod(mats[1:])` copie la liste à chaque appel (soit $O(n^2)$ copies pour $n$ matrices) et dépasse la limite de récursion de Python vers 1000 matrices; de même `powmat(M,n)` effectuait `n` appels récursifs.
+# `matprod` multiplie maintenant les matrices deux par deux, niveau par niveau comme dans un arbre binaire équilibré, et `powmat` utilise l'exponentiation rapide (élévations au carré successives).
+# Ci-dessous la comparaison avec l'ancienne version récursive sur le produit des matrices `L` et `R` d'un chemin, c'est à dire le calcul de l'ancienne fonction `path2mat`, pour des chemins de longueur $10^2$ à $10^6$ (avec des matrices `int64`, seuls les temps de calcul sont significatifs ici):
+
+# %%
+def matprod_rec(mats: List[np.array], n: int = 2)-> np.array:
+    """ the first recursive version of matprod, kept for comparison """
+    if len(mats) == 0:
+        return np.eye(n,dtype=int)
+    if len(mats) == 1:
+        return mats[0]
+    return mats[0] @ matprod_rec(mats[1:])
+
+import sys
+
+for size in [10**2, 8*10**2, 10**3, 10**4, 10**5, 10**6]:
+    S = ''.join(np.random.choice(['L', 'R'], size))
+    mats = [LR_mats[chr] for chr in S]
+    if len(mats) < sys.getrecursionlimit() - 100:
+        t_rec = '{:.2e}s'.format(timeit(lambda: matprod_rec(mats), number=1))
+    else:
+        # the recursion limit would be reached, after len(mats)*sys.getrecursionlimit() list copies
+        t_rec = 'RecursionError'
+    print('length {:>7}: matprod_rec: {:<14} matprod: {:.2e}s'.format(size, t_rec, timeit(lambda: matprod(mats), number=1)))
+
+# %%
+print(powmat(L, 1000), (matprod(1000*[L]) == powmat(L, 1000)).all())
+
+# %% [markdown]
+# ## Interprétation d'un chemin par table
+# Pour des chemins courts, comme ceux d'un niveau de l'arbre donnés par `paths_level(k)`, le coût est dans l'interprétation caractère par caractère du chemin.
+# Nous construisons une fois pour toutes la table `path_table` des coefficients `(a, b, c, d)` de la matrice de chaque chemin d'au plus `PATH_CHUNK = 8` caractères, écrits avec `'L'` et `'R'` ou avec les bits `'0'` et `'1'` (les substitutions `L -> 0` et `R -> 1` de `level_idx`).
+# Un chemin est alors lu par tranches de 8 caractères, chaque tranche coûtant une consultation de la table et le produit de deux matrices 2x2 écrit directement sur les entiers, sans `np.array` intermédiaire.
+
+# %%
+from rationnels.paths import PATH_CHUNK, build_path_table, path_table, path2coefs
+
+# %%
+print(path2coefs('LRLL'), path2coefs('0100'), path2coefs('LRLLRRLRLLR') == rle2mat(path2rle('LRLLRRLRLLR')))
+
+# %% [markdown]
+# `path2mat`, `SBfrac` et `CWfrac` utilisent `path2coefs` pour les chemins écrits sous forme de chaîne et `rle2mat` pour les chemins compressés:
+
+# %%
+from rationnels.matrices import path2mat
+from rationnels.paths import SBfrac, CWfrac
+
+# %% [markdown]
+# Comparaison avec la première version de `SBfrac` (un `eval` par caractère et le produit récursif des matrices) sur les $2^{16}$ chemins du niveau 16 (la première version est chronométrée sur un chemin sur 16 seulement):
+
+# %%
+def SBfrac_eval(S: str) -> Tuple[int, int]:
+    """ the first version of SBfrac, kept for comparison """
+    M = matprod_rec([eval(chr) for chr in S])
+    den, num = M@[1,1]
+    return Fraction(num, den)
+
+paths_16 = paths_level(16)
+# all the paths have the same length: SBfrac_eval is timed on one path out of 16 only
+t_eval = 16*timeit(lambda: [SBfrac_eval(S) for S in paths_16[::16]], number=1)
+t_table = timeit(lambda: [SBfrac(S) for S in paths_16], number=1)
+print('SBfrac_eval: {:.2f}s   SBfrac: {:.2f}s   speedup: {:.0f}x'.format(t_eval, t_table, t_eval/t_table))
+print([SBfrac_eval(S) for S in paths_16[::4096]] == [SBfrac(S) for S in paths_16[::4096]])
+
+# %% [markdown]
+# ## Accès direct à la n-ième fraction
+# Numérotons les noeuds d'un arbre binaire en largeur d'abord à partir de 1 pour la racine: le noeud `(level, idx)` a pour numéro $n = 2^{level} + idx$.
+# L'écriture binaire de `n` est alors `'1'` suivi des `level` bits de `idx`, c'est à dire du chemin du noeud avec les substitutions `L -> 0` et `R -> 1` de `level_idx` et `path_str`.
+# La n-ième fraction de l'arbre de Calkin-Wilf (ou de Stern-Brocot) est donc `CWfrac` (ou `SBfrac`) de la chaîne de bits `bin(n)[3:]`, calculée en $O(\log n)$ sans construire les niveaux précédents.
+# Réciproquement le numéro d'une fraction est obtenu à partir de son chemin compressé, une plage `('L', k)` ajoutant `k` bits `0` et une plage `('R', k)` ajoutant `k` bits `1`.
+
+# %%
+from rationnels.paths import cw_nth, sb_nth, rle2index, cw_index, sb_index
+
+# %%
+print([str(cw_nth(n)) for n in range(1, 16)])
+print([str(sb_nth(n)) for n in range(1, 16)])
+print(cw_nth(10**18), sb_nth(10**18), cw_index(cw_nth(10**18)) == sb_index(sb_nth(10**18)) == 10**18)
+
+# %% [markdown]
+# ## Enumération de tous les rationnels positifs
+# Plutôt que de construire des niveaux dont la taille double à chaque étape, nous pouvons énumérer les fractions une par une.
+# Moshe Newman a remarqué que la fraction suivant $x$ dans l'ordre en largeur d'abord de l'arbre de Calkin-Wilf est:
+# $$x \mapsto \frac{1}{2\lfloor x \rfloor - x + 1}$$
+# soit pour $x = n/d$ la fraction $d/((2\lfloor n/d \rfloor + 1)d - n)$: il suffit de garder la fraction courante.
+# Comme la n-ième fraction de Calkin-Wilf est $s(n)/s(n+1)$ où $s$ est la suite de Stern, cette règle s'écrit aussi $s(n) + s(n+2) = (2\nu(n+1) + 1)s(n+1)$ où $\nu(n)$ est l'exposant de 2 dans $n$ (le nombre de bits `0` terminant `bin(n)`).
+# Pour l'arbre de Stern-Brocot, le noeud `(k, i)` est $s(j)/s(2^{k+1} - j)$ avec $j = 2i + 1$ (les numérateurs du niveau `k` sont les sommes de deux termes consécutifs de la liste `l` de `stern_levels` et les dénominateurs les mêmes en ordre inverse): nous avançons de deux pas dans la suite de Stern pour le numérateur et reculons de deux pas pour le dénominateur, en gardant seulement deux paires de termes consécutifs.
+
+# %%
+from rationnels.enumeration import stern_pair, iter_cw, iter_sb, iter_rationals
+
+# %%
+print(list(islice(iter_rationals(), 15)))
+print(list(islice(iter_rationals(order='sb'), 15)))
+print(list(islice(iter_rationals('3/2'), 4)), next(iter_rationals(10**18)) == frac2pair(cw_nth(10**18)))
+print(next(iter_rationals(2**20, order='sb', chunk=8)))
+
+# %% [markdown]
+# ## La suite de Stern à la demande
+# `stern_levels(m)[1]` ne donne la suite de Stern que comme sous-produit de la construction de l'arbre, et toujours en entier: ses $2^m-1$ premiers termes.
+# Un terme isolé $s(n)$ se calcule en $O(\log n)$ à partir de l'écriture binaire de `n`: en lisant les bits de `n` à partir du bit de poids faible, la paire $(a, b)$ initialisée à $(1, 0)$ devient $(a, a + b)$ pour un bit `1` et $(a + b, b)$ pour un bit `0`, et $s(n) = b$ (c'est la fonction `fusc` d'E.Dijkstra).
+# Pour une plage de termes $s(lo), \ldots, s(hi-1)$ les relations $s(2n) = s(n)$ et $s(2n+1) = s(n) + s(n+1)$ permettent de la remplir à partir de la plage deux fois plus courte $s(lo//2), \ldots, s(hi//2)$, avec des opérations sur des tableaux numpy: le coût est proportionnel à la longueur de la plage et pas à `hi`.
+# Enfin `stern_block(i)` garde en mémoire (cache `lru_cache`) les blocs alignés $s(i \cdot 2^{16}), \ldots, s((i+1) \cdot 2^{16} - 1)$ déjà calculés, réutilisés par `stern_range(lo, hi, cache=True)`.
+
+# %%
+from rationnels.sternseq import STERN_BLOCK, stern, stern_range, stern_block
+
+# %%
+print(stern(11), stern_range(8, 16), (stern_range(0, 2**10 + 1) == np.array([0] + stern_levels(10)[1] + [1])).all())
+print('stern_range(10**12, 10**12 + 10**6): {:.2e}s'.format(timeit(lambda: stern_range(10**12, 10**12 + 10**6), number=1)))
+
+# %% [markdown]
+# ### Niveaux profonds sur disque
+# Les niveaux 30 à 40 (des milliards de noeuds) ne tiennent pas en mémoire. `write_levels` écrit chaque niveau, bloc par bloc, dans un fichier `.npy` de ses seuls numérateurs, puisque les dénominateurs sont les numérateurs renversés (`SBdens = l[::-1]`, et de même dans l'arbre de Calkin-Wilf). Les numérateurs du niveau $k$ sont $s(2i+1) = s(i) + s(i+1)$ pour Stern-Brocot et $s(2^k + i)$ pour Calkin-Wilf, calculés avec `stern_range`. `LevelStore` relit les niveaux comme des `np.memmap` (la disposition de `bin_levels`) : `store[k, idx]` lit le noeud `(k, idx)` sans rien copier.
+
+# %%
+import shutil
+from rationnels.store import write_levels, LevelStore
+store_dir = tempfile.mkdtemp()
+print('niveaux 0 à 22: {:.2f}s'.format(timeit(lambda: write_levels(store_dir, 23), number=1)))
+store = LevelStore(store_dir)
+print(len(store), store[3], store.dens(3), store[3, 2], store[22, 10**6])
+print(store[22, 10**6] == SBfrac(path_str(22, 10**6)).as_integer_ratio())
+del store
+shutil.rmtree(store_dir)
+
+# %% [markdown]
+# ## Conversions par lots
+# Pour convertir des millions de fractions ou de chemins, les fonctions `SBpath`, `CWpath`, `SBfrac` et `CWfrac` appelées une fois par élément analysent chaque fois leur argument (`type(frac) is tuple`, `Fraction(frac)`) et font toutes leurs opérations en Python.
+# Les versions "par lots" `SBpath_many`, `CWpath_many`, `SBfrac_many` et `CWfrac_many` traitent tous les éléments ensemble, pas à pas, avec des tableaux numpy:
+# * pour les chemins, chaque pas de l'algorithme d'Euclide de `SBpath_rle` est une division euclidienne sur les tableaux des numérateurs et des dénominateurs, les fractions arrivées à la racine (`num == den`) étant retirées des tableaux. Seule la construction des chaînes (ou des listes de plages) résultats reste faite élément par élément.
+# * pour les fractions, les chemins sont rangés dans un tableau d'octets (un chemin par ligne) et chaque caractère met à jour les tableaux des coefficients `a, b, c, d` de toutes les matrices à la fois. Le résultat est la paire de tableaux (numérateurs, dénominateurs), sans construire de `Fraction`.
+#
+# Pour de trés grands lots, le paramètre `processes` répartit les calculs par blocs de `chunk` éléments sur plusieurs processus.
+
+# %%
+from rationnels.batch import (pairs2arrays, fan_out, euclid_many, SBpath_many, CWpath_many, path2coefs_many,
+                              SBfrac_many, CWfrac_many)
+
+# %%
+print(SBpath_many([(3, 8), (5, 2)]), CWpath_many([(3, 8), (5, 2)]), SBpath_many(np.array([[3, 8], [5, 2]]), rle=True))
+print(SBfrac_many(['LRLL', 'RRL']), CWfrac_many(['LRLL', 'RRL']))
+
+# %% [markdown]
+# Comparaison avec les appels élément par élément, sur $10^5$ fractions au hasard et sur les $2^{16}$ chemins du niveau 16:
+
+# %%
+rand_pairs = np.random.randint(1, 10**9, size=(10**5, 2))
+rand_pairs //= np.gcd(rand_pairs[:, 0], rand_pairs[:, 1])[:, None]
+list_pairs = [tuple(pair) for pair in rand_pairs.tolist()]
+print('SBpath: {:.2f}s   SBpath_many: {:.2f}s'.format(
+    timeit(lambda: [SBpath(pair) for pair in list_pairs], number=1), timeit(lambda: SBpath_many(rand_pairs), number=1)))
+print('SBfrac: {:.2f}s   SBfrac_many: {:.2f}s'.format(
+    timeit(lambda: [SBfrac(S) for S in paths_16], number=1), timeit(lambda: SBfrac_many(paths_16), number=1)))
+
+# %% [markdown]
+# ## Chemins sous forme de bits
+# Un chemin représenté par une chaîne de caractères `'L'` et `'R'` occupe (au moins) un octet par pas, et les conversions `level_idx`, `path_str` passent par `str_translate`, `np.binary_repr` et `int(..., 2)`.
+# La classe `Path` représente un chemin par la paire d'entiers `(level, idx)` de `level_idx`: les `level` bits de `idx` sont les pas du chemin, le premier pas étant le bit de poids fort.
+# Elle garde aussi l'entier `rev` des bits dans l'ordre inverse, de sorte que:
+# * ajouter un pas (`append`) ou retirer le dernier (`father`, `prefix`) sont de simples décalages de bits,
+# * le chemin renversé (`reverse`), qui fait passer de l'arbre de Stern-Brocot à celui de Calkin-Wilf, échange seulement `idx` et `rev`.
+
+# %%
+from rationnels.paths import Path
+
+# %%
+P = Path.from_str('RRL')
+print(repr(P), P.level_idx() == level_idx('RRL'), P.append('R'), P.father(), P.reverse(), P.index())
+print(Path.from_frac('3/8'), Path.from_frac('3/8').SBfrac(), Path.from_frac('3/8', 'cw'), Path.from_frac('3/8', 'cw').CWfrac())
+print(Path(*level_idx('LRLL')) == Path.from_str('LRLL') == Path.from_rle(path2rle('LRLL')), str(Path(3, 6)) == path_str(3, 6))
+
 # %% [markdown]
 # # Approximation d'un nombre réel  par une fraction  
 # Nous pouvons utiliser ce dernier algorithme pour obtenir une approximation d'un nombre réel $x$ par un chemin de l'arbre de Stern-Brocot de longueur $n$ et la fraction correspondante:
@@ -987,8 +1168,6 @@ def SBrealfrac(x: float, n: Union[int, slice]) -> Tuple[int, int]:
     SBpath = SBrealpath(x,n)
     return [SBfrac(SBpath[:k]) for k in range(n)]
 
-
-
 # %%
 print(SBrealfrac(e,20))
 
@@ -999,27 +1178,7 @@ print(SBrealfrac(e,slice(5,21,5)))
 # Ou une version retournant une liste 'pretty print' de chaînes de caractères formatés:
 
 # %% {"code_folding": [0]}
-def prettySBrealfrac(x, n: Union[int, slice] = 10, prec: str ='.10f') -> List[str]: 
-    """ return a list of n successive fractions approximating the real number x
-    
-    Args:
-        x: (float) the float representation of the real number x
-        n: (int) number of successive rational approximations of x
-           or a slice defining the subset of desired rational approximations of x
-        prec: a string describing the desired float precision of the result
-    Returns:
-        a list of n formated strings each string describing an approximation of x and consists of:
-        - position of each selected approximation in the list of max length (n.stop when n is a slice)
-        - the fraction approximation
-        - the float value of this fraction with the precision defined by prec
-    """
-
-    fracs = SBrealfrac(x,n)
-    fmt = '{}:{}={:'+prec+'}'
-    if isinstance(n, slice):
-        return [fmt.format(n.start+n.step*k,frac,frac.numerator/frac.denominator) 
-                for (k,frac) in enumerate(fracs)]
-    return [fmt.format(k,frac,frac.numerator/frac.denominator) for (k,frac) in enumerate(fracs)]
+from rationnels.approx import prettySBrealfrac
 
 # %%
 print(prettySBrealfrac(e,slice(12,40,2)))
@@ -1034,70 +1193,79 @@ SB_pi
 # %%
 print(prettySBrealfrac(pi,slice(21,401,20)))
 
+# %% [markdown]
+# ## Approximation exacte par les fractions continues
+# `SBrealpath` calcule `x/(1-x)` et `x - 1` sur des flottants: chaque pas ajoute une erreur d'arrondi, amplifiée par les pas suivants, et au bout d'une quinzaine de plages le chemin n'est plus celui de $x$. De plus `SBrealfrac` recalcule `SBfrac(SBpath[:k])` pour chaque préfixe: $O(n^2)$ produits de matrices pour `n` fractions.
+# Or, comme pour les chemins compressés, les longueurs des plages du chemin de $x$ sont les termes de son développement en fraction continue $x = a_0 + \cfrac{1}{a_1 + \cfrac{1}{a_2 + \cdots}}$: le chemin est $R^{a_0} L^{a_1} R^{a_2} \cdots$.
+# Le module `rationnels.approx` calcule ces termes exactement, avec des entiers:
+# * `cf_terms(x)` pour un rationnel: `Fraction`, paire, chaîne `'3/8'` ou `'3.14159'`, ou flottant (sa valeur binaire exacte),
+# * `quadratic_terms(P, D, Q)` pour l'irrationnel quadratique $(P + \sqrt{D})/Q$, `e_terms()` pour $e = [2; 1, 2, 1, 1, 4, 1, 1, 6, \ldots]$,
+# * `digit_terms(digits)` pour un réel donné par ses chiffres, même un flot infini, et `interval_terms(lo, hi)` pour un réel donné par un encadrement, comme celui de $\pi$ à $10^{-n}$ près donné par `pi_bounds(n)` (série de Chudnovsky): seuls les termes communs à tous les réels de l'encadrement sont produits. L'algorithme d'Euclide y est fait à la manière de Lehmer, sur les premiers bits des nombres.
+#
+# Tous ces termes peuvent aussi être donnés directement comme `x` à `SBrealpath`, `SBrealfrac` et `prettySBrealfrac`, redéfinies à partir des plages `SBrealruns(x)`: les noeuds du chemin (`SBrealnodes`) comme les réduites $p_k/q_k$ (`cf_convergents`) sont obtenus chacun à partir des précédents, en un nombre constant d'opérations sur des entiers.
+
+# %%
+SBrealfrac_float = SBrealfrac
+from rationnels.approx import (cf_terms, quadratic_terms, e_terms, homographic_terms, digit_terms, LEHMER_BITS,
+                               shared_terms, interval_terms, pi_bounds, cf_convergents, SBrealruns, SBrealpath_rle,
+                               SBrealpath, SBrealnodes, SBrealfrac)
+
+# %%
+print(list(cf_terms('3/8')), list(islice(quadratic_terms(1, 5, 2), 8)), list(islice(e_terms(), 12)))
+print(list(digit_terms('3.14159265358979')), list(cf_terms(pi)))
+print(SBrealpath(e_terms(), 20) == SB_e20, SBrealfrac(quadratic_terms(0, 2), 8))
+
+# %% [markdown]
+# Le chemin de longueur 400 de $\pi$ calculé sur des flottants diffère du chemin exact dés le $k^{ième}$ caractère:
+
+# %%
+pi_lo, pi_hi = pi_bounds(10**5)
+SB_pi_exact = SBrealpath(interval_terms(pi_lo, pi_hi), 400)
+print(next(k for k in range(400) if SB_pi[k] != SB_pi_exact[k]), SBrealpath(pi, 400) == SB_pi_exact)
+print(prettySBrealfrac(interval_terms(pi_lo, pi_hi), slice(21,401,20))[-3:])
+
+# %% [markdown]
+# Avec $10^5$ décimales de $\pi$ nous obtenons plus de 97000 termes de sa fraction continue, puis toutes les réduites correspondantes, en temps linéaire (en nombre d'opérations sur les entiers); de même pour les $10^5$ premières réduites de $e$ et les $10^5$ premiers noeuds du chemin de $\pi$. `SBrealfrac` n'a plus besoin que d'un pas par fraction:
+
+# %%
+t_terms = timeit(lambda: list(interval_terms(pi_lo, pi_hi)), number=1)
+pi_terms = list(interval_terms(pi_lo, pi_hi))
+t_cvg = timeit(lambda: deque(cf_convergents(pi_terms), maxlen=1), number=1)
+p_pi, q_pi = deque(cf_convergents(pi_terms), maxlen=1)[0]
+print('pi: {} terms in {:.2f}s, convergents in {:.2f}s, last denominator: {} bits'.format(
+    len(pi_terms), t_terms, t_cvg, q_pi.bit_length()))
+print('e: 10**5 convergents in {:.2f}s'.format(timeit(lambda: deque(islice(cf_convergents(e_terms()), 10**5), maxlen=1), number=1)))
+print('pi: 10**5 nodes in {:.2f}s'.format(timeit(lambda: deque(islice(SBrealnodes(pi_terms), 10**5), maxlen=1), number=1)))
+print('SBrealfrac_float(pi, 400): {:.2e}s   SBrealfrac(pi, 400): {:.2e}s'.format(
+    timeit(lambda: SBrealfrac_float(pi, 400), number=1), timeit(lambda: SBrealfrac(pi, 400), number=1)))
+
+# %% [markdown]
+# `iter_SBrealfrac` engendre les nœuds choisis un par un en gardant la matrice du nœud courant : dans une suite de `L` ou de `R` du chemin, on saute directement au prochain nœud du slice, sans passer par les autres. Avec `eps`, l'itération s'arrête au premier nœud dont l'erreur est inférieure à `eps` (majorée par l'intervalle du sous-arbre du nœud). Les chaînes de `iter_prettySBrealfrac` ne sont formatées qu'au fur et à mesure.
+
+# %%
+from rationnels.approx import iter_SBrealfrac, iter_prettySBrealfrac
+print(list(iter_SBrealfrac(quadratic_terms(0, 2), 0, eps=1e-30)))
+print('sqrt(2) à 1e-30 près: {:.1f}µs'.format(
+    1e6*timeit(lambda: list(iter_SBrealfrac(quadratic_terms(0, 2), 0, eps=1e-30)), number=1000)/1000))
+for k, frac, val in islice(iter_SBrealfrac(pi_terms, slice(10**4, None, 10**4)), 3):
+    print(k, frac.denominator.bit_length(), 'bits', val)
+print(list(iter_prettySBrealfrac(pi, slice(21, 101, 20), prec='.15f')))
+
+# %% [markdown]
+# La meilleure approximation de $x$ parmi les fractions de dénominateur au plus $N$ (comme `Fraction.limit_denominator`) et la fraction la plus simple d'un intervalle se trouvent en descendant l'arbre de Stern-Brocot par suites de `L` ou de `R` : chaque suite est coupée directement là où le dénominateur dépasserait la borne, en $O(\log N)$ étapes. Le script `benchmarks/best_approx.py` compare `sb_best_approx` à `Fraction.limit_denominator` sur un million de fractions.
+
+# %%
+from rationnels.approx import sb_best_approx, sb_simplest_in
+print([sb_best_approx(pi_terms, N) for N in (10, 100, 1000, 10**5)])
+# les deux candidats sont à égale distance de sqrt(2) à 2e-24 près : le flottant 2**0.5 donne l'autre
+print(sb_best_approx(quadratic_terms(0, 2), 10**6), Fraction(2**0.5).limit_denominator(10**6))
+print(sb_simplest_in('3.14155', '3.14165'), sb_simplest_in('1/3', '1/2'), sb_simplest_in('1/3', '1/2', closed=False))
+
 # %% [markdown]
 # # L'arbre de Stern-Brocot dans $\mathbb{N^2}$
 
 # %% {"code_folding": [0]}
-# click to read the code
-def gridticks(ax,xmajticks=(0,11,5),xminticks=None,ymajticks=None,yminticks=None,alphamaj=0.5,alphamin=0.2):
-    """ plot a grid: see matplotlib.axes.Axes.set_xticks,matplotlib.axes.Axes.grid
-    """
-    if ymajticks == None:
-        ymajticks = xmajticks
-    if yminticks == None:
-        yminticks = xminticks
-    xmajor_ticks = np.arange(*xmajticks)
-    ymajor_ticks = np.arange(*ymajticks)
-    ax.set_xticks(xmajor_ticks)
-    ax.set_yticks(ymajor_ticks)
-    if xminticks != None:
-        xminor_ticks = np.arange(*xminticks)
-        ax.set_xticks(xminor_ticks, minor=True)
-        ax.grid(which='minor', alpha=alphamin)
-    if yminticks != None:
-        yminor_ticks = np.arange(*yminticks)
-        ax.set_yticks(yminor_ticks, minor=True)
-        ax.grid(which='minor', alpha=alphamin)
-    ax.grid(which='major', alpha=alphamaj)
-
-def plot_points(ax, pts: np.array, lw: float = 1.2, colors:List[str] = ['red'], marker: str = 'o') -> None:
-    """ plot a list of points: see matplotlib plot, fig.add_subplot
-    Args:
-        ax: axes as result of fig.add_subplot(X,X,X)
-        pts: a np.array of points (x:float,y:float)
-        lw: (float) line width
-        colors: a list of matplot_lib colors, here string of named colors, 
-                coloring the points and cycling according to the length of colors
-        marker: (str) a one char string, see matplotlib.markers
-    Returns: None
-    """
-    ptsT = pts.T
-    x_points, y_points = ptsT
-    size = len(x_points)
-    for i in range(size):
-        ax.plot(x_points[i], y_points[i], color=colors[i%len(colors)], marker=marker)
-
-def plot_pt2pts(ax, pt: Tuple[float,float], pts: np.array, 
-                lw: float = 1.2, colors=['green'], ls: str = '-') -> None:
-    """ Plot lines from pt to each point in pts
-    
-    Args: 
-        ax: axes as result of fig.add_subplot(X,X,X)
-        pt: (float,float) a point
-        pts: a np.array of points (x:float,y:float)
-        lw: (float) line width
-        colors: a list of matplot_lib colors, here string of named colors, 
-                coloring the points and cycling according to the length of colors
-        ls: (str) linestyle  one or two chars string,
-            https://matplotlib.org/1.5.3/api/pyplot_api.html#matplotlib.pyplot.plot
-    """
-    ptsT = pts.T
-    x_points, y_points = ptsT
-    size = len(x_points)
-    for i in range(size):
-        ax.plot([pt[0], x_points[i]], 
-                 [pt[1], y_points[i]], 
-                 color=colors[i%len(colors)], linestyle=ls, linewidth=lw)
+from rationnels.plotting import gridticks, plot_points, plot_pt2pts
 
 # %% [markdown]
 # Il est intéressant de remarquer que dans $\mathbb{N^2}$ les paires `(n,d)` correspondant aux fractions `n/d` de l'arbre de Stern-Brocot, que ces paires donc, forment elles aussi un arbre binaire.  
@@ -1138,23 +1306,48 @@ gridticks(sub4,xmajticks=(0,xmax+1,1))
 sub4.set_xlabel('Calkin-Wilf: CWpairs(7)')
 plt.show()
 
+# %% [markdown]
+# Les boucles ci-dessus créent un objet matplotlib par point et par arc : plusieurs milliers pour sept niveaux, et le tracé prend plusieurs secondes.  
+# `plot_tree` trace tous les arcs d'un arbre donné par ses niveaux sous forme de tableaux (`SBarrays`, `CWarrays`) en une seule `LineCollection`, et les noeuds en un seul nuage de points (`scatter`) par niveau : on peut alors tracer 14 niveaux (16383 noeuds).
+
+# %% {"code_folding": [0]}
+from rationnels.plotting import plot_tree, tree_segments
+
+# %%
+segments, level = tree_segments(SBarrays(3))
+print(segments.shape, level)
+
+# %% {"code_folding": [0]}
+#click to see  the code 
+xmax = 21
+plt.rcParams["figure.figsize"] =  [14.0, 6.0]
+fig = plt.figure()
+sub1 = fig.add_subplot(1,2, 1)
+plot_tree(sub1, SBarrays(7))
+gridticks(sub1,xmajticks=(0,xmax+1,1))
+sub1.set_xlabel('Stern-Brocot: plot_tree(SBarrays(7))')
+sub4 = fig.add_subplot(1,2, 2)
+plot_tree(sub4, CWarrays(7))
+gridticks(sub4,xmajticks=(0,xmax+1,1))
+sub4.set_xlabel('Calkin-Wilf: plot_tree(CWarrays(7))')
+plt.show()
+
+# %%
+def draw_tree(levels):
+    fig = plt.figure()
+    ax = fig.add_subplot(1,1, 1)
+    plot_tree(ax, levels, lw=0.5, s=2)
+    fig.canvas.draw()
+    plt.close(fig)
+
+print('14 niveaux (Stern-Brocot): {:.2f} s'.format(timeit(lambda: draw_tree(SBarrays(14)), number=1)))
+
 # %% [markdown]
 # Dans une grille de taille donnée, on peut placer tous les couples d'entiers copremiers présents dans cette grille
 # We can put more nodes in the grid, plotting all the relatively prime integer's pairs present in the grid 
 
 # %% {"code_folding": []}
-def rel_prime(a: int, b: int) -> bool:
-    """ return True if a and b are relatively prime
-    
-    Args:
-        a: int
-        b: int
-    Returns:
-        True or False
-    """
-    if a == b == 1:
-        return False
-    return gcd(a,b) == 1
+from rationnels.lattice import rel_prime
 
 # %%
 rel_prime(3,8)
@@ -1173,28 +1366,41 @@ for lin in range(1,xmax+1):
 gridticks(sub,xmajticks=(0,xmax+1,1))
 sub.set_xlabel('Stern-Brocot: coprimes pairs')
 
+# %% [markdown]
+# Plutôt que de tester `rel_prime` case par case, `iter_coprimes` produit les couples copremiers d'un rectangle par blocs de lignes, sous forme de tableaux numpy : dans la ligne `y` on raye les multiples de chaque facteur premier `p` de `y` (crible des plus petits facteurs premiers), sans calculer de pgcd. De même `iter_farey(N)` engendre la suite de Farey d'ordre $N$, les fractions de $[0, 1]$ de dénominateur au plus $N$ dans l'ordre croissant, en $O(1)$ par terme : après $a/b$ et $c/d$ vient $(kc - a)/(kd - b)$ où $k = \lfloor (N + b)/d \rfloor$.  
+# Leurs nombres se calculent sans les énumérer, avec les cribles de l'indicatrice d'Euler et de la fonction de Möbius : $|F_N| = 1 + \sum_{k \le N} \varphi(k)$ et le nombre de couples copremiers de $[1, X] \times [1, Y]$ est $\sum_{d} \mu(d) \lfloor X/d \rfloor \lfloor Y/d \rfloor$.
+
+# %%
+from rationnels.enumeration import iter_farey
+from rationnels.coprimes import iter_coprimes, farey_length, coprime_count
+print(list(iter_farey(5)), farey_length(5))
+xs, ys = next(iter_coprimes(xmax))
+# rel_prime exclut le couple (1, 1)
+print(len(xs), coprime_count(xmax), sum(rel_prime(col, lin) for lin in range(1, xmax+1) for col in range(1, xmax+1)))
+print('|F_N| pour N = 10**6: {} en {:.2f}s'.format(farey_length(10**6), timeit(lambda: farey_length(10**6), number=1)))
+print('{} couples copremiers dans 10**4 x 10**4 en {:.2f}s (compte: {})'.format(
+    sum(len(x) for x, _ in iter_coprimes(10**4)), timeit(lambda: deque(iter_coprimes(10**4), maxlen=0), number=1),
+    coprime_count(10**4)))
+
+# %% [markdown]
+# `rel_prime_many` teste la primalité relative de tableaux entiers de couples avec `np.gcd`. Avec `cache=True`, les cribles d'un intervalle borné sont gardés (jusqu'à la puissance de 2 suivante) : le nombre de fractions réduites de dénominateur au plus $N$ ou la primalité relative d'une case de la grille deviennent de simples lectures dans un tableau.
+
+# %%
+from rationnels.coprimes import rel_prime_many, farey_lengths
+a, b = np.random.randint(1, 4000, 10**6), np.random.randint(1, 4000, 10**6)
+t_sieve = timeit(lambda: rel_prime_many(a, b, cache=True), number=1)
+print('10**6 couples: rel_prime {:.2f}s, rel_prime_many {:.3f}s, avec le cache {:.3f}s (crible: {:.2f}s)'.format(
+    timeit(lambda: [rel_prime(x, y) for x, y in zip(a.tolist(), b.tolist())], number=1),
+    timeit(lambda: rel_prime_many(a, b), number=1), timeit(lambda: rel_prime_many(a, b, cache=True), number=1), t_sieve))
+print(farey_lengths([1, 10, 100, 10**6]))
+
 # %% [markdown]
 # et visualiser un plus grand nombre de branches dans la grille, en dessinant tous les arcs liant les noeud visibles 
 # aux noeuds de leur père.  
 # On définit facilement une fonction `SBfather(frac)` retournant la fraction que porte le père d'un noeud `(n,d)`:
 
 # %% {"code_folding": [0]}
-def SBfather(frac: Union[Tuple[int, int], str]) -> Tuple[int, int]: 
-    # frac: Union[Tuple[int, int], Fraction[int, int], str] 
-    # -> Union[Tuple[int, int], Fraction[int, int]] type hint doesn't recognize Fraction
-    """ find the father node of a Stern-Brocot node from the pair or fraction value or string fraction value
-    
-    Args:
-        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8) 
-        or a string as '3/8' or a fraction as Fraction(3,8)
-    Returns:
-        the pair value of the father of frac if the frac parameter value was a pair
-        the fraction value of the father of frac if the frac parameter value was a fraction or a string fraction
-    """
-    father = SBfrac(SBpath(frac)[:-1])
-    if type(frac) is tuple:
-        return father.numerator,father.denominator
-    return father
+from rationnels.lattice import SBfather
 
 # %%
 SBfather((3,8))
@@ -1207,59 +1413,63 @@ SBfather('3/8')
 # or again with more branches plotting the branches linking a node to his left and right sons. 
 
 # %% {"code_folding": [0]}
-def SBsons(frac: Union[Tuple[int, int], str]) -> Tuple[Tuple[int, int],Tuple[int, int]]: 
-    # frac: Union[Tuple[int, int], Fraction[int, int], str] 
-    # -> Union[Tuple[int, int], Fraction[int, int]] type hint doesn't recognize Fraction
-    """ find the (left son, right son) nodes pair of a Stern-Brocot tree node
-    
-    Args:
-        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8) 
-        or a string as '3/8' or a fraction as Fraction(3,8)
-    Returns:
-        a pair of pair's values for the sons of frac if the frac parameter value was a pair
-        a pair of fraction values for the sons of frac if the frac parameter value was a fraction or a string
-    """
-    path = SBpath(frac)
-    sons = [SBfrac(path + 'L'),SBfrac(path + 'R' )]
-    if type(frac) is tuple:
-        return ((sons[0].numerator,sons[0].denominator),(sons[1].numerator,sons[1].denominator))
-    return sons
+from rationnels.lattice import SBsons
 
 # %%
 SBsons((2, 5))
 
+# %% [markdown]
+# Le père, les fils et le frère d'un noeud `n/d` se calculent sans son chemin, à partir de ses deux plus proches ancêtres `c/a < n/d < d'/b`, à gauche et à droite, dont il est le médiant : `a` est l'inverse de `n` modulo `d` (algorithme d'Euclide étendu, en $O(\log d)$). Le père est le plus profond des deux ancêtres, les fils sont les médiants du noeud avec ses ancêtres. Les versions `_many` de `rationnels.batch` font de même sur des tableaux de paires, toutes les divisions d'une étape à la fois.
+
+# %%
+from rationnels.lattice import SBancestors, SBsibling
+from rationnels.batch import SBfather_many
+print(SBancestors((3, 8)), SBsibling((3, 8)), SBancestors('5/1'))
+grid_pairs = np.stack(next(iter_coprimes(1000, chunk=10**6)), axis=1)
+print('{} pères: {:.2f}s'.format(len(grid_pairs), timeit(lambda: SBfather_many(grid_pairs), number=1)))
+
+# %% [markdown]
+# Les classes `SBNode` et `CWNode` représentent un noeud par sa fraction et ne calculent son chemin, son couple `(level, idx)`, ses ancêtres encadrants et son jumeau (le noeud de même chemin dans l'autre arbre) qu'à la première demande, en les gardant. Les noeuds rendus par `father`, `sons` et `sibling` sont construits à partir de ce que le noeud sait déjà : un parcours de l'arbre ne recalcule rien.
+
+# %%
+from rationnels.nodes import SBNode, CWNode
+node = SBNode((3, 8))
+print(node.path, node.level_idx(), node.bounds, node.father(), node.sons(), node.sibling(), node.twin(), CWNode((3, 8)).father())
+# un couple non réduit est le même noeud que sa forme réduite
+for Node in (SBNode, CWNode):
+    assert Node((6, 4)) == Node((3, 2)) and Node((6, 4)).father() == Node((3, 2)).father()
+    assert Node((6, 4)).sons() == Node((3, 2)).sons() and Node((6, 4)).path == Node((3, 2)).path
+assert SBNode((6, 4)).bounds == SBNode((3, 2)).bounds
+
+def sb_walk(depth):
+    # parcours en largeur des niveaux 0..depth-1 de l'arbre de Stern-Brocot, chemins compris
+    level = [SBNode.from_path('')]
+    for _ in range(depth - 1):
+        level = [son for node in level for son in node.sons()]
+    return level
+
+print([str(node.path) for node in sb_walk(3)])
+print('niveau 16 par les noeuds: {:.2f}s, par les chemins: {:.2f}s'.format(
+    timeit(lambda: [node.level_idx() for node in sb_walk(17)], number=1),
+    timeit(lambda: [level_idx(SBpath(frac)) for frac in SBpairs(17)[-1]], number=1)))
+
+# %% [markdown]
+# Pour lister un sous-arbre ou les fractions d'un intervalle $[lo, hi]$ sans construire tout l'arbre avec `SBpairs(m)` : `sb_subtree(chemin, profondeur)` parcourt en largeur le sous-arbre d'un noeud, chaque noeud étant le médiant de ses bornes, et `sb_range(lo, hi, max_level, max_den)` part de l'ancêtre commun de `lo` et `hi` (le plus long préfixe commun de leurs chemins, la fraction la plus simple de l'intervalle) et ne descend que dans les sous-arbres qui rencontrent l'intervalle, en donnant les fractions dans l'ordre croissant. Le coût est proportionnel au nombre de fractions produites, pas à $2^m$.
+
+# %%
+from rationnels.enumeration import sb_subtree, sb_range
+print(list(sb_subtree('LR', 3)))
+print(list(sb_range('1/3', '1/2', max_level=4)))
+print(list(sb_range('3/10', '1/2', max_den=8)))
+print('{} fractions de [333/106, 22/7] de dénominateur au plus 10**4 en {:.3f}s'.format(
+    sum(1 for _ in sb_range('333/106', '22/7', max_den=10**4)),
+    timeit(lambda: deque(sb_range('333/106', '22/7', max_den=10**4), maxlen=0), number=1)))
+
 # %% [markdown]
 # Dans le cas où les noeuds ne sont pas dans le rectangle défini par la grille il faut couper les arcs correspondants (clipping).
 
 # %% {"code_folding": [0]}
-def xylinefrom(*pts: np.array) -> Tuple[Tuple[float,float],Tuple[float,float]]:
-    """ compute 2 pairs (x0,x1),(y0,y1) to be plotted by matlib.plot
-    
-    Args:
-        pts : a np.array of 2 or 3 points in the plane
-        the 2 pts pts[0] and pts[1] verifying:
-           0 < pts[0][0] < pts[1][0]
-           0 < pts[0][1] < pts[1][1]
-        if present, the third point defines a clipping
-        window (0,xmax=pts[2][0]),(0,ymax=pts[2][1])
-        to the segment defined by pts[0]to pts[1].
-    Returns:
-        two pairs (x0,x1),(y0,y1) defining the segment
-        ready to be plotted by matlib.plot
-    """
-    xs = [pt[0] for pt in pts]
-    ys = [pt[1] for pt in pts]
-    if len(pts) == 2:
-        return xs,ys
-    else:
-        m = (ys[1]-ys[0])/(xs[1]-xs[0])
-        if xs[1] > xs[2]:
-            xs[1] = xs[2]
-            ys[1] = ys[0] + m*(xs[1]-xs[0])
-        if ys[1] > ys[2]:
-            ys[1] = ys[2]
-            xs[1] = xs[0] + (xs[1]-xs[0])/m  
-    return xs[:2],ys[:2]   
+from rationnels.plotting import xylinefrom
 
 # %% {"code_folding": [0]}
 #click to see the plot's code 
@@ -1309,5 +1519,90 @@ gridticks(sub3,xmajticks=(0,xmax+1,1))
 sub3.set_xlabel('Stern-Brocot: coprimes pairs and SBsons')
 plt.show()
 
+# %% [markdown]
+# `xylinefrom` accepte aussi des tableaux de points : tous les arcs sont coupés en une fois, puis tracés en une seule `LineCollection` par `plot_segments`.
+
+# %% {"code_folding": [0]}
+#click to see the plot's code 
+from rationnels.plotting import plot_segments
+from rationnels.coprimes import iter_coprimes
+from rationnels.batch import SBsons_many
+
+xmax = 22
+plt.rcParams["figure.figsize"] =  [7.0, 6.0]
+fig = plt.figure()
+sub3 = fig.add_subplot(1,1, 1)
+xs, ys = np.concatenate([np.column_stack(b) for b in iter_coprimes(xmax)]).T
+below = xs > ys
+pts = np.column_stack((xs[below], ys[below]))
+(lnums, ldens), (rnums, rdens) = SBsons_many(pts)
+for son in (np.column_stack((lnums, ldens)), np.column_stack((rnums, rdens))):
+    xpair, ypair = xylinefrom(pts, son, (xmax, xmax))
+    plot_segments(sub3, np.column_stack((xpair[0], ypair[0])), np.column_stack((xpair[1], ypair[1])))
+    plot_segments(sub3, np.column_stack((ypair[0], xpair[0])), np.column_stack((ypair[1], xpair[1])))
+sub3.scatter(xs, ys, color='red', zorder=2)
+gridticks(sub3,xmajticks=(0,xmax+1,1))
+sub3.set_xlabel('Stern-Brocot: coprimes pairs and SBsons (arrays)')
+plt.show()
+
+# %% [markdown]
+# Pour de grandes grilles (jusqu'à $N = 10^4$, soit $6\,10^7$ noeuds), on ne trace plus d'objets matplotlib : on calcule des images numpy.  
+# `coprime_density` donne la proportion de couples copremiers dans chaque pixel (en moyenne $6/\pi^2$), `edge_density` la longueur des arcs père-fils qui traversent chaque pixel : les pères et les fils sont calculés niveau par niveau, en tableaux, dans l'arbre restreint à la grille.  
+# `save_png` écrit directement un fichier PNG, sans figure : utilisable sur une machine sans affichage.
+
+# %% {"code_folding": [0]}
+from rationnels.raster import coprime_mask, coprime_density, edge_density, save_png
+
+# %%
+print(coprime_mask(6).astype(int)[::-1])
+
+# %% {"code_folding": [0]}
+#click to see the plot's code 
+N = 2000
+images = {}
+for name, f in (('coprime_density', lambda: coprime_density(N, 512)),
+                ('edge_density father', lambda: edge_density(N, 512)),
+                ('edge_density sons', lambda: edge_density(N, 512, 'sons'))):
+    t = timeit(lambda: images.__setitem__(name, f()), number=1)
+    print('{:<20} N = {}: {:.2f} s'.format(name, N, t))
+png_dir = tempfile.mkdtemp()
+for name, image in images.items():
+    save_png(image, os.path.join(png_dir, name.replace(' ', '_') + '.png'), log=name != 'coprime_density')
+print(sorted(os.listdir(png_dir)))
+
+plt.rcParams["figure.figsize"] =  [15.0, 5.0]
+fig = plt.figure()
+for i, (name, image) in enumerate(images.items()):
+    sub = fig.add_subplot(1, 3, i+1)
+    sub.imshow(np.log1p(image) if i else image, origin='lower', cmap='gray_r', extent=(0, N+1, 0, N+1))
+    sub.set_xlabel(name)
+plt.show()
+
+# %% [markdown]
+# # Où passe le temps ?
+# Dans un bloc `with profiled() as prof:`, les appels des fonctions publiques du paquet sont comptés et chronométrés, ainsi que quelques étapes des boucles internes : multiplications de matrices, consultations de `path_table`, divisions d'Euclide (et soustractions qu'elles remplacent), caractères des chemins construits, fractions `Fraction` créées.  
+# Hors d'un tel bloc, rien n'est instrumenté : les fonctions s'exécutent sans aucun surcoût.
+
+# %% {"code_folding": [0]}
+from rationnels.instrument import profiled
+
+# %%
+with profiled() as prof:
+    for n in range(1, 2000):
+        CWfrac(CWpath((n, 2*n + 1)))
+    SBrealfrac(quadratic_terms(0, 2), 200)
+    matprod([L, R]*50)
+print(prof.summary(limit=8))
+
+# %% [markdown]
+# À la sortie du bloc, les fonctions d'origine sont remises partout, même dans les modules importés pendant le bloc :
+
+# %%
+from rationnels import lattice, paths
+with profiled():
+    SBfather((3, 8))
+assert lattice.frac2pair is paths.frac2pair
+print(lattice.frac2pair is paths.frac2pair)
+
 # %%
 
@@ -0,0 +1,57 @@
+""" sb_best_approx against fractions.Fraction.limit_denominator
+
+Both functions are timed on the same random fractions (numerators and denominators of up to --digits
+digits, bounds on the denominators of up to --digits digits), and their results are compared: the script
+exits with status 1 if they differ on any input.
+
+Usage:
+    python benchmarks/best_approx.py [--n 1000000] [--digits 12] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from fractions import Fraction
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rationnels.approx import sb_best_approx  # noqa: E402
+
+
+def random_inputs(n: int, digits: int, seed: int) -> List[Tuple[Fraction, int]]:
+    """ return n random pairs (x, max_den), the sizes of the integers being uniform in 1..digits digits """
+    rng = random.Random(seed)
+
+    def rand_int() -> int:
+        return rng.randint(1, 10**rng.randint(1, digits))
+
+    return [(Fraction(rand_int(), rand_int()), rand_int()) for _ in range(n)]
+
+
+def time_all(f: Callable[[Fraction, int], Fraction], inputs: List[Tuple[Fraction, int]]) -> Tuple[float, List]:
+    """ return the time of f on all the inputs and the list of its results """
+    t = time.perf_counter()
+    results = [f(x, max_den) for x, max_den in inputs]
+    return time.perf_counter() - t, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=10**6, help='number of inputs')
+    parser.add_argument('--digits', type=int, default=12, help='largest number of digits of the integers')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random inputs')
+    args = parser.parse_args()
+    inputs = random_inputs(args.n, args.digits, args.seed)
+    t_sb, sb = time_all(sb_best_approx, inputs)
+    t_ld, ld = time_all(Fraction.limit_denominator, inputs)
+    mismatches = sum(r1 != r2 for r1, r2 in zip(sb, ld))
+    for name, t in (('sb_best_approx', t_sb), ('Fraction.limit_denominator', t_ld)):
+        print('{:<28} {:>8.2f} s  {:>7.2f} µs per call'.format(name, t, 1e6*t/args.n))
+    print('{} inputs, {} mismatches'.format(args.n, mismatches))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+""" Import-time budget of the rationnels package
+
+Each import is timed in a fresh interpreter (the median of several runs), and the script exits
+with status 1 if an import exceeds its budget or loads a module it should not load.
+
+Usage:
+    python benchmarks/import_time.py [--runs 7]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from statistics import median
+from typing import List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (import statement, budget in seconds or None for a measure only, modules which must not be loaded)
+BUDGETS: List[Tuple[str, Optional[float], List[str]]] = [
+    ('import rationnels', 0.050, ['numpy', 'matplotlib']),
+    ('from rationnels import SBpath, CWpath, SBfrac, CWfrac, Path', 0.050, ['numpy', 'matplotlib']),
+    ('from rationnels import iter_rationals, SBrealfrac, SBfather', 0.050, ['numpy', 'matplotlib']),
+    ('from rationnels import SBarrays, stern_range, SBpath_many', None, ['matplotlib']),
+    ('from rationnels import plotting', None, ['matplotlib']),
+]
+
+TIMER = """
+import sys, time
+t = time.perf_counter()
+{statement}
+t = time.perf_counter() - t
+print(t, ' '.join(m for m in {forbidden!r} if m in sys.modules))
+"""
+
+
+def time_import(statement: str, forbidden: List[str]) -> Tuple[float, List[str]]:
+    """ return the time of an import statement in a fresh interpreter and the forbidden modules it loaded
+
+    Args:
+        statement: (str) the import statement
+        forbidden: the names of the modules which must not be loaded
+    Returns:
+        the pair (time in seconds, list of the forbidden modules found in sys.modules)
+    """
+    out = subprocess.run([sys.executable, '-c', TIMER.format(statement=statement, forbidden=forbidden)],
+                         cwd=ROOT, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+    return float(out[0]), out[1:]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7, help='number of fresh interpreters per import')
+    args = parser.parse_args()
+    failed = False
+    for statement, budget, forbidden in BUDGETS:
+        results = [time_import(statement, forbidden) for _ in range(args.runs)]
+        t = median(t for t, _ in results)
+        loaded = sorted({m for _, mods in results for m in mods})
+        ok = (budget is None or t < budget) and not loaded
+        failed |= not ok
+        print('{:<4} {:>7.1f} ms  (budget {:>6})  {}{}'.format(
+            'ok' if ok else 'FAIL', 1e3*t, '-' if budget is None else '{:.0f} ms'.format(1e3*budget),
+            statement, '  loads ' + ', '.join(loaded) if loaded else ''))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+""" Benchmark suite of the public functions of rationnels, with scaling curves saved as JSON
+
+Each case times one function over a sweep of its size parameter (levels 5..24, path lengths 10..10**6,
+numbers of 10..10**5 digits): the inputs are built before timing from a seeded random generator, each
+point is run enough times to last --min-time seconds, and the best of --repeat runs is kept. A sweep stops
+when the next point would take more than --max-time seconds (the remaining points are saved as skipped),
+so the whole suite runs offline in a few minutes. With --compare, the results are compared to a previous
+JSON file and the script exits with status 1 if a point is slower than --threshold times the old one.
+
+Usage:
+    python benchmarks/suite.py [--output results.json] [--filter REGEX] [--quick] [--list]
+                               [--min-time 0.2] [--max-time 5] [--repeat 5] [--seed 0]
+                               [--compare old.json] [--threshold 1.5]
+"""
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import rationnels  # noqa: E402
+
+LEVELS = list(range(5, 25))
+PATH_LENGTHS = [10, 100, 10**3, 10**4, 10**5, 10**6]
+DIGITS = [10, 100, 10**3, 10**4, 10**5]
+
+
+class Case(NamedTuple):
+    """ a benchmark: setup(value, rng) builds the inputs of the point value of the sweep
+        and returns the function of no argument to time
+    """
+    name: str
+    param: str
+    values: List[int]
+    setup: Callable[[int, random.Random], Callable[[], Any]]
+    requires: Tuple[str, ...] = ()
+
+
+def random_path(n: int, rng: random.Random) -> str:
+    """ a random path string of length n """
+    return ''.join(rng.choice('LR') for _ in range(n))
+
+
+def random_frac(digits: int, rng: random.Random) -> Tuple[int, int]:
+    """ a random irreducible pair (numerator, denominator) of integers of digits digits """
+    while True:
+        num, den = (rng.randrange(10**(digits - 1), 10**digits) for _ in range(2))
+        if rationnels.rel_prime(num, den):
+            return num, den
+
+
+def random_decimal(digits: int, rng: random.Random) -> str:
+    """ a random decimal string '3.xxx' of digits digits, built from random characters (no int -> str conversion,
+        limited to 4300 digits on Python >= 3.11)
+    """
+    return '3.' + ''.join(rng.choice('0123456789') for _ in range(digits - 1))
+
+
+def quiet(f: Callable[..., Any], *args: Any) -> Callable[[], Any]:
+    """ f(*args) with its standard output thrown away """
+    def run() -> Any:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return f(*args)
+    return run
+
+
+def figure_of(draw: Callable[[Any], Any]) -> Callable[[], None]:
+    """ draw(ax) on a new Agg figure, rendered then closed (the time of matplotlib included) """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    def run() -> None:
+        fig = plt.figure()
+        draw(fig.add_subplot(1, 1, 1))
+        fig.canvas.draw()
+        plt.close(fig)
+    return run
+
+
+def plot_loops(levels: List[List[Tuple[int, int]]]) -> Callable[[Any], None]:
+    """ the loops of the notebook's tree figures: one plot_pt2pts and plot_points per node """
+    from rationnels.plotting import plot_points, plot_pt2pts
+    import numpy as np
+
+    def draw(ax: Any) -> None:
+        for k in range(len(levels) - 1):
+            for i, pt in enumerate(levels[k]):
+                pts = np.array([levels[k+1][2*i], levels[k+1][2*i+1]])
+                plot_pt2pts(ax, np.array(pt), pts)
+                plot_points(ax, pts)
+    return draw
+
+
+def xylinefrom_arrays(n: int, rng: random.Random) -> Callable[[], Any]:
+    """ the clipping of n random segments of [0, 1]² to [0, 0.5]² """
+    from rationnels.plotting import xylinefrom
+    import numpy as np
+    r = np.random.default_rng(rng.randrange(2**32))
+    p0 = r.random((n, 2))/2
+    p1 = p0 + r.random((n, 2))
+    return lambda: xylinefrom(p0, p1, (0.5, 0.5))
+
+
+def cases() -> List[Case]:
+    """ the cases of the suite """
+    from rationnels import (stern_levels, SBpairs, CWpairs, SBfrac, CWfrac, SBpath, CWpath, SBrealfrac,
+                            quadratic_terms, SBfather, SBsons, bin_levels, print_bintree, write_bintree,
+                            SBarrays)
+    return [
+        Case('stern_levels', 'levels', LEVELS, lambda m, rng: lambda: stern_levels(m)),
+        Case('SBpairs', 'levels', LEVELS, lambda m, rng: lambda: SBpairs(m)),
+        Case('CWpairs', 'levels', LEVELS, lambda m, rng: lambda: CWpairs(m)),
+        Case('SBarrays', 'levels', LEVELS, lambda m, rng: lambda: SBarrays(m)),
+        Case('SBfrac', 'path_length', PATH_LENGTHS, lambda n, rng: (lambda S: lambda: SBfrac(S))(random_path(n, rng))),
+        Case('CWfrac', 'path_length', PATH_LENGTHS, lambda n, rng: (lambda S: lambda: CWfrac(S))(random_path(n, rng))),
+        Case('SBpath', 'digits', DIGITS, lambda d, rng: (lambda x: lambda: SBpath(x))(random_frac(d, rng))),
+        Case('CWpath', 'digits', DIGITS, lambda d, rng: (lambda x: lambda: CWpath(x))(random_frac(d, rng))),
+        Case('SBrealfrac[sqrt2]', 'nodes', PATH_LENGTHS[:5],
+             lambda n, rng: lambda: SBrealfrac(quadratic_terms(0, 2), n)),
+        Case('SBrealfrac[decimal]', 'digits', DIGITS,
+             lambda d, rng: (lambda x: lambda: SBrealfrac(x, 100))(random_decimal(d, rng))),
+        Case('SBfather', 'digits', DIGITS, lambda d, rng: (lambda x: lambda: SBfather(x))(random_frac(d, rng))),
+        Case('SBsons', 'digits', DIGITS, lambda d, rng: (lambda x: lambda: SBsons(x))(random_frac(d, rng))),
+        Case('print_bintree', 'levels', LEVELS[:12],
+             lambda m, rng: quiet(print_bintree, bin_levels(list(range(2**m - 1))))),
+        Case('write_bintree', 'levels', LEVELS,
+             lambda m, rng: (lambda lvls: lambda: write_bintree(lvls, io.StringIO()))(bin_levels(list(range(2**m - 1))))),
+        Case('plot_points+plot_pt2pts', 'levels', LEVELS[:6],
+             lambda m, rng: figure_of(plot_loops(SBpairs(m))), ('matplotlib',)),
+        Case('plot_tree', 'levels', LEVELS[:12],
+             lambda m, rng: (lambda lvls: figure_of(lambda ax: rationnels.plotting.plot_tree(ax, lvls)))(SBarrays(m)),
+             ('matplotlib',)),
+        Case('xylinefrom[arrays]', 'segments', PATH_LENGTHS, xylinefrom_arrays),
+        Case('coprime_density', 'N', [100, 1000, 10**4],
+             lambda N, rng: lambda: rationnels.coprime_density(N)),
+        Case('edge_density', 'N', [100, 1000, 10**4],
+             lambda N, rng: lambda: rationnels.edge_density(N)),
+    ]
+
+
+def measure(f: Callable[[], Any], min_time: float, max_time: float, repeat: int) -> Dict[str, Any]:
+    """ time f: a first call, then repeat runs of number calls lasting about min_time (one run only if
+        the first call is longer than max_time/repeat)
+
+    Returns:
+        the dict of the times per call in seconds: first, best, median, and the number of calls per run
+    """
+    t = time.perf_counter()
+    f()
+    first = time.perf_counter() - t
+    number = max(1, min(10**6, int(min_time/first) if first > 0 else 10**6))
+    runs = repeat if first*number*repeat < max_time else 1
+    times = sorted(timeit.Timer(f).timeit(number)/number for _ in range(runs))
+    return {'first': first, 'best': times[0], 'median': times[len(times)//2], 'number': number,
+            'repeat': runs}
+
+
+def run_case(case: Case, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """ run the sweep of a case, stopping when the next point would last more than args.max_time """
+    results = []
+    values = case.values[:3] if args.quick else case.values
+    missing = [m for m in case.requires if importlib.util.find_spec(m) is None]
+    previous, last = None, None
+    for value in values:
+        result = {'case': case.name, 'param': case.param, 'value': value}
+        if missing:
+            result.update(status='skipped', reason='{} is not installed'.format(', '.join(missing)))
+        elif last is not None and last*max(1.0, last/previous if previous else 1.0) > args.max_time:
+            result.update(status='skipped', reason='over --max-time {} s'.format(args.max_time))
+        else:
+            try:
+                rng = random.Random('{}-{}-{}'.format(args.seed, case.name, value))
+                result.update(measure(case.setup(value, rng), args.min_time, args.max_time, args.repeat))
+                result['status'] = 'ok'
+                previous, last = last, result['first']
+            except Exception as error:
+                # a failing point (as a limit of the int <-> str conversions) is recorded, the sweep goes on
+                result.update(status='error', reason=repr(error))
+                last = float('inf')
+        results.append(result)
+        print('{:<24} {:>11}={:<8} {}'.format(case.name, case.param, value, format_result(result)), flush=True)
+    return results
+
+
+def format_time(t: float) -> str:
+    """ a time in seconds as '12.3 µs' """
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if t >= scale:
+            return '{:.3g} {}'.format(t/scale, unit)
+    return '{:.3g} ns'.format(t*1e9)
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    if result['status'] != 'ok':
+        return '{} ({})'.format(result['status'], result['reason'])
+    return '{:>10}  (median {}, {} x {})'.format(format_time(result['best']), format_time(result['median']),
+                                                 result['repeat'], result['number'])
+
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    """ the versions and the machine, to compare the results of the same deployment """
+    def version(module: str) -> Optional[str]:
+        try:
+            return __import__(module).__version__
+        except ImportError:
+            return None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'numpy': version('numpy'), 'matplotlib': version('matplotlib'),
+            'gmpy2': version('gmpy2'), 'platform': platform.platform(), 'machine': platform.machine(),
+            'processor': platform.processor(), 'cpus': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('compare', 'list')}}
+
+
+def compare(results: List[Dict[str, Any]], old_file: str, threshold: float) -> bool:
+    """ print the ratios new/old of the best times of the points measured in both files
+
+    Returns:
+        True if a ratio is more than threshold
+    """
+    with open(old_file) as f:
+        old = {(r['case'], r['value']): r for r in json.load(f)['results'] if r['status'] == 'ok'}
+    regressed = False
+    print('\ncompared to {}:'.format(old_file))
+    for r in results:
+        o = old.get((r['case'], r['value']))
+        if r['status'] != 'ok' or o is None:
+            continue
+        ratio = r['best']/o['best']
+        slower = ratio > threshold
+        regressed |= slower
+        print('{:<4} {:<24} {:>11}={:<8} {:>10} -> {:>10}  x{:.2f}'.format(
+            'SLOW' if slower else 'ok', r['case'], r['param'], r['value'], format_time(o['best']),
+            format_time(r['best']), ratio))
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='benchmark_results.json', help='the JSON file of the results')
+    parser.add_argument('--filter', default='', help='regular expression selecting the cases by name')
+    parser.add_argument('--quick', action='store_true', help='only the first 3 points of each sweep')
+    parser.add_argument('--list', action='store_true', help='list the cases and their sweeps, and exit')
+    parser.add_argument('--min-time', type=float, default=0.2, help='least duration of a run in seconds')
+    parser.add_argument('--max-time', type=float, default=5.0,
+                        help='longest duration of a point in seconds, a sweep stops beyond')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs of a point, the best is kept')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random inputs')
+    parser.add_argument('--compare', help='a previous JSON file of results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='slowdown ratio over which a point is a regression (with --compare)')
+    args = parser.parse_args()
+    selected = [case for case in cases() if re.search(args.filter, case.name)]
+    if args.list:
+        for case in selected:
+            print('{:<24} {:>11} in {}'.format(case.name, case.param, case.values))
+        return 0
+    results = [result for case in selected for result in run_case(case, args)]
+    with open(args.output, 'w') as f:
+        json.dump({'meta': metadata(args), 'results': results}, f, indent=1)
+    print('{} points saved in {}'.format(len(results), args.output))
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+""" Counting the positive rationals with the Stern-Brocot and Calkin-Wilf trees
+
+The algorithms of the notebook CompterLesRationnelsAvecSternBrocotEtCalkin-Wilf, without the demos.
+Importing the package has no side effect and imports none of its submodules: each name is
+looked up in its submodule on first access, so that `from rationnels import SBpath` only loads
+the pure Python modules (no numpy, no matplotlib). The plotting helpers are in the submodule
+rationnels.plotting, which is only imported on demand.
+
+Submodules:
+    bintree:     binary trees as lists of levels, path strings (pure Python)
+    paths:       Stern-Brocot and Calkin-Wilf paths and fractions, the Path class (pure Python)
+    enumeration: enumeration of all the positive rationals, Farey sequences (pure Python)
+    approx:      approximation of a real number (pure Python)
+    nodes:       the nodes of the trees as values caching their path and bounds (pure Python)
+    lattice:     the Stern-Brocot tree in N², coprime pairs, neighbours of a node (pure Python)
+    coprimes:    coprime pairs of a box and Farey counts by sieves (numpy)
+    sternseq:    the Stern sequence (numpy)
+    levels:      the levels of the trees as arrays (numpy)
+    store:       deep levels of the trees on disk, read as memory maps (numpy)
+    matrices:    the 2x2 matrices L, R of the paths (numpy)
+    batch:       batch conversions and neighbours on arrays (numpy)
+    instrument:  opt-in counters and timers of the public functions, profiled() blocks (pure Python)
+    raster:      images of the coprime pairs and of the tree edges in N², saved as PNG (numpy)
+    plotting:    plotting helpers on matplotlib axes (numpy)
+"""
+from importlib import import_module
+from typing import Any, List
+
+_submodules = {
+    'bintree': ['bin_levels', 'print_bintree', 'write_bintree', 'paths_level', 'ints2bin', 'rev_ints', 'str_translate',
+                'level_idx', 'path_str'],
+    'paths': ['frac2pair', 'SBpath_rle', 'CWpath_rle', 'rle2path', 'path2rle', 'SBpath', 'CWpath', 'rle2mat',
+              'PATH_CHUNK', 'build_path_table', 'path_table', 'path2coefs', 'SBfrac', 'CWfrac',
+              'cw_nth', 'sb_nth', 'rle2index', 'cw_index', 'sb_index', 'Path'],
+    'enumeration': ['stern_pair', 'iter_cw', 'iter_sb', 'iter_rationals', 'iter_farey', 'sb_subtree', 'sb_range'],
+    'approx': ['cf_terms', 'quadratic_terms', 'e_terms', 'homographic_terms', 'digit_terms', 'LEHMER_BITS',
+               'shared_terms', 'interval_terms', 'pi_bounds', 'cf_convergents', 'SBrealruns', 'SBrealpath_rle',
+               'SBrealpath', 'SBrealnodes', 'iter_SBrealfrac', 'SBrealfrac', 'iter_prettySBrealfrac',
+               'prettySBrealfrac', 'sb_best_approx', 'sb_simplest_in'],
+    'nodes': ['SBNode', 'CWNode'],
+    'lattice': ['rel_prime', 'SBancestors', 'SBfather', 'SBsons', 'SBsibling'],
+    'coprimes': ['primes', 'totients', 'mobius', 'SIEVE_MIN', 'COPRIME_TABLE_MAX', 'sieve_table', 'farey_length',
+                 'farey_lengths', 'coprime_count', 'rel_prime_many', 'smallest_factors', 'iter_coprimes'],
+    'sternseq': ['stern_dtype', 'STERN_BLOCK', 'stern', 'stern_range', 'stern_block'],
+    'levels': ['stern_row', 'stern_arrays', 'SBarrays', 'CWarrays', 'stern_levels', 'SBpairs', 'CWpairs'],
+    'store': ['STORE_BLOCK', 'level_dtype', 'level_path', 'level_block', 'write_levels', 'LevelStore'],
+    'matrices': ['L', 'R', 'I', 'LR_mats', 'powmat', 'matprod', 'path2mat'],
+    'batch': ['pairs2arrays', 'fan_out', 'euclid_many', 'SBpath_many', 'CWpath_many', 'path2coefs_many',
+              'SBfrac_many', 'CWfrac_many', 'sb_bounds_many', 'SBancestors_many', 'SBfather_many', 'SBsons_many',
+              'SBsibling_many'],
+    'instrument': ['STEPS', 'Profile', 'profiled'],
+    'raster': ['coprime_mask', 'coprime_density', 'edge_density', 'save_png'],
+}
+# name -> submodule defining it
+_origins = {name: module for module, names in _submodules.items() for name in names}
+
+__all__ = list(_origins)
+
+
+def __getattr__(name: str) -> Any:
+    """ import on first access the submodule defining name (or the submodule name itself, as plotting) """
+    if name in _submodules or name == 'plotting':
+        return import_module('.' + name, __name__)
+    if name not in _origins:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(import_module('.' + _origins[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__ + list(_submodules) + ['plotting'])
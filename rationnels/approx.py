@@ -0,0 +1,550 @@
+""" Approximation of a real number by the fractions of its Stern-Brocot path
+
+The real number x is given exactly, by a rational (int, Fraction, pair, string or float, taken at its exact
+binary value) or by the terms a0, a1, a2, ... of its continued fraction x = a0 + 1/(a1 + 1/(a2 + ...)),
+which are also the lengths of the runs R**a0 L**a1 R**a2 ... of its Stern-Brocot path.
+"""
+from collections.abc import Iterable
+from itertools import chain
+from fractions import Fraction
+from math import gcd, isqrt
+from typing import Any, List, Union, Optional, Tuple, Iterator
+
+from .paths import _digits2int, frac2pair
+
+
+def cf_terms(x: Any) -> Iterator[int]:
+    """ generate exactly the terms a0, a1, a2, ... of the continued fraction of a positive number x
+
+    Args:
+        x: a rational as an int, a tuple (numerator: int, denominator: int) as (3,8), a string as '3/8'
+           or '3.14159', a Fraction or a float (its exact binary value),
+           or an iterable of terms as quadratic_terms(0, 2), e_terms(), digit_terms('3.14159')
+    Yields:
+        the terms of the continued fraction, a finite sequence for a rational
+    Example:
+        list(cf_terms('3/8')) -> [0, 2, 1, 2]
+    """
+    if isinstance(x, Iterable) and not isinstance(x, (str, tuple)):
+        yield from x
+        return
+    num, den = frac2pair(x)
+    assert num > 0 and den > 0, "{} is not a positive number".format(x)
+    yield from interval_terms((num, den), (num, den))
+
+
+def quadratic_terms(P: int, D: int, Q: int = 1) -> Iterator[int]:
+    """ generate the continued fraction terms of the quadratic irrational (P + sqrt(D))/Q, with integers only
+
+    Args:
+        P: (int)
+        D: (int) D > 0, not a perfect square
+        Q: (int) Q != 0
+    Yields:
+        the terms of the continued fraction (an infinite and eventually periodic sequence)
+    Example:
+        quadratic_terms(1, 5, 2) -> 1, 1, 1, ... the golden ratio
+        quadratic_terms(0, 2) -> 1, 2, 2, 2, ... sqrt(2)
+    """
+    assert isqrt(D)**2 != D, "{} is a perfect square".format(D)
+    if (D - P*P) % Q != 0:
+        # (P + sqrt(D))/Q == (P*|Q| + sqrt(D*Q*Q))/(Q*|Q|), where Q*|Q| divides D*Q*Q - (P*|Q|)**2
+        P, D, Q = P*abs(Q), D*Q*Q, Q*abs(Q)
+    r = isqrt(D)
+    while True:
+        # floor((P + sqrt(D))/Q), sqrt(D) being strictly between r and r+1
+        a = (P + r + (Q < 0)) // Q
+        yield a
+        P = a*Q - P
+        Q = (D - P*P) // Q
+
+
+def e_terms() -> Iterator[int]:
+    """ generate the continued fraction terms of e: 2, 1, 2, 1, 1, 4, 1, 1, 6, ... """
+    yield 2
+    k = 2
+    while True:
+        yield from (1, k, 1)
+        k += 2
+
+
+def homographic_terms(a: int, b: int, c: int, d: int, digits: Optional[Iterator[int]] = None,
+                      base: int = 10) -> Iterator[int]:
+    """ generate the continued fraction terms of x = (a*t + b)/(c*t + d) where the real number t in [0, 1]
+        is given by its digits 0.t1t2t3... in base: a term is yielded as soon as it is the same for all the
+        values of t left by the digits read, and the digits are read only when needed
+
+    Args:
+        a, b, c, d: (int) the coefficients of the homographic function
+        digits: an iterator of the digits t1, t2, t3, ... of t, possibly infinite, None for no digit
+        base: (int) the base of the digits
+    Yields:
+        the terms shared by all the values of x when the digits run out (no term if the iterator is infinite
+        and x is rational: the terms of a rational are found only from a finite number of digits)
+    """
+    digits = iter(()) if digits is None else digits
+    while True:
+        # x is between b/d (t = 0) and (a+b)/(c+d) (t = 1) if c*t + d does not vanish on [0, 1]
+        if (d > 0 and c + d > 0) or (d < 0 and c + d < 0):
+            q = b // d
+            if q == (a + b) // (c + d):
+                yield q
+                # x -> 1/(x - q)
+                a, b, c, d = c, d, a - q*c, b - q*d
+                continue
+        t = next(digits, None)
+        if t is None:
+            return
+        # t -> (t + t')/base
+        a, b, c, d = a, a*t + b*base, c, c*t + d*base
+
+
+def digit_terms(digits: Union[str, Iterable], base: int = 10) -> Iterator[int]:
+    """ generate the continued fraction terms of a real number from its digits, possibly an infinite stream:
+        only the terms shared by all the numbers beginning with these digits are yielded
+
+    Args:
+        digits: a string as '3.14159' or an iterable of int, the integer part followed by the digits after the point
+        base: (int) the base of the digits, 10 by default
+    Yields:
+        the terms of the continued fraction
+    Example:
+        list(digit_terms('3.14159')) -> [3, 7] (3.14159 == [3; 7, 15, 1, 25, 1, 7, 4] and 3.1416 == [3; 7, 16, 11])
+    """
+    if isinstance(digits, str):
+        intpart, _, decimals = digits.partition('.')
+        num, den = _digits2int(intpart + decimals, base), base**len(decimals)
+        return interval_terms((num, den), (num + 1, den))
+    digits = iter(digits)
+    return homographic_terms(1, next(digits), 0, 1, digits, base)
+
+
+LEHMER_BITS = 256
+
+
+def shared_terms(pairs: List[Tuple[int, int]]) -> Tuple[List[int], Tuple[int, int, int, int], List[Tuple[int, int]]]:
+    """ the Euclidean algorithm on several fractions at once, as long as they have the same quotients
+
+    Args:
+        pairs: a list of pairs (numerator, denominator), with non negative numerators and denominators
+    Returns:
+        the tuple (terms, (e, f, g, h), pairs) where terms is the list of the common first terms
+        of the continued fractions, each pair (p, q) being changed into the pair of its remainders
+        (e*p + f*q, g*p + h*q) in the returned list pairs
+    """
+    terms, (e, f, g, h) = [], (1, 0, 0, 1)
+    while all(den > 0 for _, den in pairs):
+        a = pairs[0][0] // pairs[0][1]
+        if any(num // den != a for num, den in pairs[1:]):
+            break
+        terms.append(a)
+        pairs = [(den, num - a*den) for num, den in pairs]
+        e, f, g, h = g, h, e - a*g, f - a*h
+    return terms, (e, f, g, h), pairs
+
+
+def interval_terms(lo: Union[Tuple[int, int], str], hi: Union[Tuple[int, int], str]) -> Iterator[int]:
+    # lo, hi: Union[Tuple[int, int], Fraction[int, int], str]
+    """ generate the continued fraction terms shared by all the real numbers of the interval [lo, hi]:
+        the Euclidean algorithm on both bounds (Lehmer's version: the terms are found on the
+        LEHMER_BITS leading bits of the numbers and applied to the whole numbers at once)
+
+    Args:
+        lo: the lower bound, as a tuple (numerator: int, denominator: int), a string or a Fraction
+        hi: the upper bound, as a tuple (numerator: int, denominator: int), a string or a Fraction
+    Yields:
+        the terms of the continued fraction of any real number of the interval,
+        all the terms of the fraction if lo == hi
+    Example:
+        list(interval_terms(*pi_bounds(10)))[:8] -> [3, 7, 15, 1, 292, 1, 1, 1]
+    """
+    (p, q), (r, s) = frac2pair(lo), frac2pair(hi)
+    while q > 0 and s > 0:
+        h = min(q.bit_length(), s.bit_length()) - LEHMER_BITS
+        if h <= 0:
+            yield from shared_terms([(p, q), (r, s)])[0]
+            return
+        # p/q is between p1/(q1+1) and (p1+1)/q1 where p1, q1 are the leading bits of p, q (and so for r/s):
+        # the terms shared by these 4 fractions are terms of all the numbers between them
+        p1, q1, r1, s1 = p >> h, q >> h, r >> h, s >> h
+        terms, (e, f, g, k), _ = shared_terms([(p1, q1 + 1), (p1 + 1, q1), (r1, s1 + 1), (r1 + 1, s1)])
+        if terms:
+            yield from terms
+            p, q, r, s = e*p + f*q, g*p + k*q, e*r + f*s, g*r + k*s
+        else:
+            a = p // q
+            if a != r // s:
+                return
+            yield a
+            p, q, r, s = q, p - a*q, s, r - a*s
+
+
+def pi_bounds(n: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """ return an interval [lo, hi] of width less than 10**-n containing pi, computed with integers
+        by the Chudnovsky series and binary splitting
+
+    Args:
+        n: (int) the number of decimals
+    Returns:
+        the pair of fractions (lo, hi) as tuples (numerator, denominator)
+    """
+    def split(i: int, j: int) -> Tuple[int, int, int]:
+        """ the numerator, denominator and sum factors of the terms i to j-1 of the series """
+        if j - i == 1:
+            p = 1 if i == 0 else (6*i - 5)*(2*i - 1)*(6*i - 1)
+            q = 1 if i == 0 else i*i*i*10939058860032000
+            t = p*(13591409 + 545140134*i)
+            return p, q, -t if i & 1 else t
+        m = (i + j) // 2
+        p1, q1, t1 = split(i, m)
+        p2, q2, t2 = split(m, j)
+        return p1*p2, q1*q2, q2*t1 + p1*t2
+    # each term of the series gives more than 14 decimals: N is pi*one with 10 guard digits,
+    # the truncation of the series and the integer roundings being less than 10 units of N
+    _, q, t = split(0, n // 14 + 2)
+    one = 10**(n + 10)
+    N = (q*426880*isqrt(10005*one*one)) // t
+    return (N - 10, one), (N + 10, one)
+
+
+def cf_convergents(x: Any) -> Iterator[Tuple[int, int]]:
+    """ generate the convergents p/q of the continued fraction of x, each one from the two previous ones:
+        p(k) = a(k)*p(k-1) + p(k-2), q(k) = a(k)*q(k-1) + q(k-2)
+
+    Args:
+        x: a positive number given exactly, as in cf_terms
+    Yields:
+        the pairs (numerator, denominator) of the convergents
+    Example:
+        list(cf_convergents('3/8')) -> [(0, 1), (1, 2), (1, 3), (3, 8)]
+    """
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    for a in cf_terms(x):
+        p0, q0, p1, q1 = p1, q1, a*p1 + p0, a*q1 + q0
+        yield p1, q1
+
+
+def SBrealruns(x: Any) -> Iterator[Tuple[str, int]]:
+    """ generate the runs of the Stern-Brocot path of x: R**a0 L**a1 R**a2 ... where a0, a1, a2, ...
+        are the terms of the continued fraction of x, the last term of a rational being diminished by 1
+
+    Args:
+        x: a positive number given exactly, as in cf_terms
+    Yields:
+        the runs (chr, k) where chr is 'L' or 'R' and k > 0 its number of repetitions
+    Example:
+        list(SBrealruns('3/8')) -> [('L', 2), ('R', 1), ('L', 1)]
+    """
+    terms = cf_terms(x)
+    chr, k = 'R', next(terms)
+    # one term ahead: the last term of a finite sequence is diminished by 1
+    for a in terms:
+        if k > 0:
+            yield chr, k
+        chr, k = 'L' if chr == 'R' else 'R', a
+    if k > 1:
+        yield chr, k - 1
+
+
+def SBrealpath_rle(x: Any, n: int) -> List[Tuple[str, int]]:
+    """ return the run-length encoded Stern-Brocot path of x, truncated to n characters
+
+    Args:
+        x: a positive number given exactly, as in cf_terms
+        n: (int) length of the desired path
+    Returns:
+        the list of runs [(chr, k), ...] of the first n characters of the path of x
+        (all of them if x is a rational with a shorter path)
+    Example:
+        SBrealpath_rle(quadratic_terms(1, 5, 2), 5) -> [('R', 1), ('L', 1), ('R', 1), ('L', 1), ('R', 1)]
+    """
+    runs = []
+    for chr, k in SBrealruns(x):
+        if n <= 0:
+            break
+        runs.append((chr, min(k, n)))
+        n -= k
+    return runs
+
+
+def SBrealpath(x: Any, n: int) -> str:
+    """ return the path string of length n beginning the Stern-Brocot path of x, computed exactly
+
+    Args:
+        x: a positive number given exactly, as in cf_terms: Fraction, pair, string, float (its exact
+           binary value), or the terms of its continued fraction as e_terms(), digit_terms(...)
+        n: (int) length of the desired path string
+    Returns:
+        a path string of length n (or the whole path of a rational x if it is shorter)
+    Example:
+        SBrealpath(e_terms(), 10) -> 'RRLRRLRLLL'
+    """
+    return ''.join([chr*k for chr, k in SBrealpath_rle(x, n)])
+
+
+def SBrealnodes(x: Any) -> Iterator[Tuple[int, int]]:
+    """ generate the nodes of the Stern-Brocot path of x from the root, as pairs (numerator, denominator):
+        the matrix of the path is updated by each character, in O(1) integer operations
+
+    Args:
+        x: a positive number given exactly, as in cf_terms
+    Yields:
+        the pairs (numerator, denominator) of the fractions SBfrac(SBrealpath(x, k)) for k = 0, 1, 2, ...
+    """
+    a, b, c, d = 1, 0, 0, 1
+    yield c + d, a + b
+    for chr, k in SBrealruns(x):
+        for _ in range(k):
+            if chr == 'L':
+                b += a
+                d += c
+            else:
+                a += b
+                c += d
+            yield c + d, a + b
+
+
+def iter_SBrealfrac(x: Any, n: Union[None, int, slice] = None,
+                    eps: Optional[float] = None) -> Iterator[Tuple[int, Any, float]]:
+    """ generate the selected nodes of the Stern-Brocot path of x, keeping the matrix [[a, b], [c, d]]
+        of the current node: within a run of the path, the next selected node is reached at once
+        with the closed forms of L**k and R**k (see rle2mat)
+
+    Args:
+        x: a positive number given exactly, as in SBrealpath
+        n: (int) the nodes 0, 1, ..., n-1, or a slice of the nodes (with non negative start and stop,
+           and a positive step), by default all the nodes
+        eps: if not None, the iteration stops at the first node p/q whose error bound is less than eps,
+             which is yielded even if n does not select it: x being in the subtree of the node, between
+             c/a and d/b, |x - p/q| <= 1/(min(a, b)*(a + b)). The stop is conservative (x is not evaluated):
+             an earlier node may already be within eps of x, the yielded one always is
+    Yields:
+        the triples (k, fraction, float) for the selected nodes, k being the node's path length
+    Example:
+        list(iter_SBrealfrac('3/8', slice(1, None, 2))) -> [(1, Fraction(1, 2), 0.5), (3, Fraction(2, 5), 0.4)]
+        list(iter_SBrealfrac(quadratic_terms(0, 2), 0, eps=1e-6)) -> [(18, Fraction(3363, 2378), 1.414213...)]
+    """
+    n = slice(None) if n is None else n if isinstance(n, slice) else slice(n)
+    start, stop, step = n.start or 0, n.stop, n.step or 1
+    assert start >= 0 and (stop is None or stop >= 0) and step > 0, "{} is not a valid selection".format(n)
+    eps = None if eps is None else Fraction(eps)
+
+    def node(k: int, a: int, b: int, c: int, d: int) -> Tuple[int, Any, float]:
+        return k, Fraction(c + d, a + b), (c + d)/(a + b)
+
+    def move(chr: str, j: int, a: int, b: int, c: int, d: int) -> Tuple[int, int, int, int]:
+        """ the matrix after j more characters chr """
+        return (a, b + j*a, c, d + j*c) if chr == 'L' else (a + j*b, b, c + j*d, d)
+
+    def close(a: int, b: int) -> bool:
+        """ True if the error bound 1/(min(a, b)*(a + b)) is less than eps """
+        return min(a, b)*(a + b)*eps.numerator > eps.denominator
+
+    a, b, c, d = 1, 0, 0, 1
+    k, nxt = 0, start        # the current node's path length, and the next selected node
+    done = -1                # the last yielded node
+    if nxt == 0 and stop != 0:
+        yield node(0, a, b, c, d)
+        done, nxt = 0, nxt + step
+    for chr, m in SBrealruns(x):
+        # the first node of the run within eps, by dichotomy
+        j_eps = None
+        if eps is not None and close(*move(chr, m, a, b, c, d)[:2]):
+            lo, j_eps = 0, m
+            while j_eps - lo > 1:
+                mid = (lo + j_eps) // 2
+                lo, j_eps = (lo, mid) if close(*move(chr, mid, a, b, c, d)[:2]) else (mid, j_eps)
+        last = m if j_eps is None else j_eps
+        while nxt <= k + last and (stop is None or nxt < stop):
+            yield node(nxt, *move(chr, nxt - k, a, b, c, d))
+            done, nxt = nxt, nxt + step
+        if j_eps is not None:
+            if done != k + j_eps:
+                yield node(k + j_eps, *move(chr, j_eps, a, b, c, d))
+            return
+        if eps is None and stop is not None and nxt >= stop:
+            return
+        a, b, c, d = move(chr, m, a, b, c, d)
+        k += m
+    if eps is not None and done != k:
+        # the last node of a rational x is x
+        yield node(k, a, b, c, d)
+
+
+def SBrealfrac(x: Any, n: Union[int, slice], eps: Optional[float] = None) -> Tuple[int, int]:
+    # -> Fraction[int, int] type hint doesn't recognize Fraction:
+    """ return a list of n successive fractions approximating the real number x, computed exactly
+        and incrementally (see iter_SBrealfrac)
+
+    Args:
+        x: a positive number given exactly, as in SBrealpath
+        n: (int) number of successive rational approximations of x
+           or a slice defining the subset of desired rational approximations of x
+        eps: if not None, stop at the first fraction p/q whose error bound is less than eps, which ensures
+             |x - p/q| < eps (the bound being conservative, see iter_SBrealfrac)
+    Returns:
+        a list of n fractions approximating x (fewer if x is a rational with a shorter path)
+    """
+    return [frac for _, frac, _ in iter_SBrealfrac(x, n, eps)]
+
+
+def iter_prettySBrealfrac(x: Any, n: Union[None, int, slice] = 10, prec: str = '.10f',
+                          eps: Optional[float] = None) -> Iterator[str]:
+    """ generate the formated strings of prettySBrealfrac one by one, each one when it is needed
+
+    Args:
+        x, n, eps: as in iter_SBrealfrac
+        prec: a string describing the desired float precision of the result
+    Yields:
+        the strings 'k:fraction=float'
+    """
+    fmt = '{}:{}={:'+prec+'}'
+    for k, frac, val in iter_SBrealfrac(x, n, eps):
+        yield fmt.format(k, frac, val)
+
+
+def prettySBrealfrac(x, n: Union[int, slice] = 10, prec: str ='.10f', eps: Optional[float] = None) -> List[str]:
+    """ return a list of n successive fractions approximating the real number x
+
+    Args:
+        x: a positive number given exactly, as in SBrealpath
+        n: (int) number of successive rational approximations of x
+           or a slice defining the subset of desired rational approximations of x
+        prec: a string describing the desired float precision of the result
+        eps: if not None, stop at the first fraction p/q whose error bound is less than eps, which ensures
+             |x - p/q| < eps (the bound being conservative, see iter_SBrealfrac)
+    Returns:
+        a list of n formated strings each string describing an approximation of x and consists of:
+        - position of each selected approximation in the list of max length (n.stop when n is a slice)
+        - the fraction approximation
+        - the float value of this fraction with the precision defined by prec
+    """
+    return list(iter_prettySBrealfrac(x, n, prec, eps))
+
+
+def _cmp_runs(runs1: Iterable, runs2: Iterable) -> int:
+    """ compare two numbers given by their (possibly infinite) run-length encoded Stern-Brocot paths:
+        the first differing character decides, the end of a path being between L and R
+
+    Returns:
+        -1, 0 or 1 as the first number is less than, equal to or greater than the second one
+    """
+    order = {'L': -1, None: 0, 'R': 1}
+    runs1, runs2 = iter(runs1), iter(runs2)
+    (chr1, k1), (chr2, k2) = next(runs1, (None, 0)), next(runs2, (None, 0))
+    while chr1 == chr2:
+        if chr1 is None:
+            return 0
+        k = min(k1, k2)
+        k1, k2 = k1 - k, k2 - k
+        if k1 == 0:
+            chr1, k1 = next(runs1, (None, 0))
+        if k2 == 0:
+            chr2, k2 = next(runs2, (None, 0))
+    return -1 if order[chr1] < order[chr2] else 1
+
+
+def _euclid_runs(num: int, den: int) -> Iterator[Tuple[str, int]]:
+    """ generate lazily the runs of SBpath_rle((num, den)) """
+    while num != den:
+        if num > den:
+            k, num = divmod(num, den)
+            if num == 0:
+                k, num = k - 1, den
+            yield 'R', k
+        else:
+            k, den = divmod(den, num)
+            if den == 0:
+                k, den = k - 1, num
+            yield 'L', k
+
+
+def sb_best_approx(x: Any, max_den: int) -> Tuple[int, int]:
+    # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the fraction closest to x among the fractions of denominator at most max_den, as
+        Fraction.limit_denominator: the Stern-Brocot path of x is descended run by run, each run being
+        cut at once where the denominator of the node would exceed max_den, in O(log(max_den)) steps
+
+    Args:
+        x: a positive number given exactly, as in cf_terms (a rational or the terms of its continued fraction)
+        max_den: (int) the largest denominator allowed, max_den >= 1
+    Returns:
+        the Fraction p/q, q <= max_den, the closest to x (the one of smaller denominator in case of a tie)
+    Example:
+        sb_best_approx(interval_terms(*pi_bounds(10)), 1000) -> Fraction(355, 113)
+        sb_best_approx(quadratic_terms(0, 2), 100) -> Fraction(140, 99)
+    """
+    assert max_den >= 1, "the largest denominator {} is not positive".format(max_den)
+    rational = not isinstance(x, Iterable) or isinstance(x, (str, tuple))
+    if rational:
+        # Euclid's algorithm directly, x being compared at the end with integers only
+        p, q = frac2pair(x)
+        assert p > 0 and q > 0, "{} is not a positive number".format(x)
+        g = gcd(p, q)
+        p, q = p // g, q // g
+        if q <= max_den:
+            return Fraction(p, q)
+        runs = _euclid_runs(p, q)
+    else:
+        runs = SBrealruns(x)
+    a, b, c, d = 1, 0, 0, 1
+    for chr, m in runs:
+        # the node after j more characters chr has the denominator a + b + j*(a if chr == 'L' else b)
+        step = a if chr == 'L' else b
+        j = m if step == 0 else min(m, (max_den - a - b) // step)
+        a, b, c, d = (a, b + j*a, c, d + j*c) if chr == 'L' else (a + j*b, b, c + j*d, d)
+        if j < m:
+            break
+    else:
+        # x is a rational whose denominator is at most max_den
+        return Fraction(c + d, a + b)
+    # x is strictly between the node N and its bound B on the side chr, the closest fractions of denominator
+    # at most max_den: compare x with their midpoint, from the node N (see SBrealfrac for the paths' matrices)
+    num, den = c + d, a + b
+    bnum, bden = (c, a) if chr == 'L' else (d, b)
+    mid_num, mid_den = num*bden + bnum*den, 2*den*bden
+    if rational:
+        x_side = (p*mid_den > q*mid_num) - (p*mid_den < q*mid_num)
+    else:
+        mid = (a*mid_num - c*mid_den, d*mid_den - b*mid_num)
+        x_side = _cmp_runs(chain([(chr, m - j)], runs), SBrealruns(mid))
+    closer_to_bound = x_side <= 0 if chr == 'L' else x_side >= 0
+    return Fraction(bnum, bden) if closer_to_bound else Fraction(num, den)
+
+
+def sb_simplest_in(lo: Union[Tuple[int, int], str], hi: Union[Tuple[int, int], str],
+                   closed: bool = True) -> Tuple[int, int]:
+    # lo, hi: Union[Tuple[int, int], Fraction[int, int], str], -> Fraction[int, int]
+    """ return the simplest fraction of an interval, the one of smallest denominator (and numerator): the
+        first node of the Stern-Brocot tree in the interval, reached by runs, in O(log) steps
+
+    Args:
+        lo, hi: the bounds 0 <= lo < hi of the interval, rationals as in frac2pair
+        closed: (bool) True for the closed interval [lo, hi], False for the open interval ]lo, hi[
+    Returns:
+        the Fraction of the interval with the smallest denominator, 0 for a closed interval [0, hi]
+        (0/1 is not a node of the tree)
+    Example:
+        sb_simplest_in('3.14155', '3.14165') -> Fraction(355, 113)
+        sb_simplest_in('1/3', '1/2', closed=False) -> Fraction(2, 5)
+    """
+    p1, q1 = frac2pair(lo)
+    p2, q2 = frac2pair(hi)
+    assert 0 <= p1*q2 < p2*q1, "[{}, {}] is not an interval of positive numbers".format(lo, hi)
+    if p1 == 0 and closed:
+        return Fraction(0)
+    a, b, c, d = 1, 0, 0, 1
+    while True:
+        num, den = c + d, a + b
+        # the node N_j after j more characters R is (num + j*d)/(den + j*b), and after j characters L
+        # (num + j*c)/(den + j*a): N_j < lo while j < t, N_j > hi while j < u (<= instead of < if not closed)
+        t = Fraction(p1*den - num*q1, d*q1 - p1*b)
+        u = Fraction(num*q2 - p2*den, p2*a - c*q2)
+        if t > 0 or t == 0 and not closed:
+            j = -(-t.numerator // t.denominator) if closed else t.numerator // t.denominator + 1
+            a, c = a + j*b, c + j*d
+        elif u > 0 or u == 0 and not closed:
+            j = -(-u.numerator // u.denominator) if closed else u.numerator // u.denominator + 1
+            b, d = b + j*a, d + j*c
+        else:
+            return Fraction(num, den)
@@ -0,0 +1,299 @@
+""" Batch versions of SBpath, CWpath, SBfrac and CWfrac working on numpy arrays,
+    optionally fanned out to a pool of processes, and of the neighbours of the nodes of rationnels.lattice
+"""
+from functools import partial
+from itertools import islice
+from operator import mul
+from typing import Any, List, Union, Optional, Tuple, Callable
+
+import numpy as np
+
+from .paths import rle2path
+from .sternseq import stern_dtype
+
+
+def pairs2arrays(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[np.array, np.array]:
+    """ return the arrays of numerators and denominators of a batch of fractions
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of pairs (numerator, denominator)
+    Returns:
+        the pair of np.array (numerators, denominators), of an integer dtype or of dtype object for large integers
+    """
+    pairs = np.asarray(pairs if isinstance(pairs, np.ndarray) else list(pairs))
+    if pairs.dtype.kind not in 'iuO':
+        pairs = pairs.astype(object)
+    pairs = pairs.reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def fan_out(func: Callable, items: Any, processes: int, chunk: int) -> List[Any]:
+    """ apply func to the successive blocks of chunk items in a pool of processes
+
+    Args:
+        func: the function applied to each block
+        items: a sliceable sequence of items (list or np.array)
+        processes: (int) the number of worker processes
+        chunk: (int) the number of items in each block
+    Returns:
+        the list of the results of func for each block, in the same order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    blocks = [items[i:i+chunk] for i in range(0, len(items), chunk)]
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(func, blocks))
+
+
+def euclid_many(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[List[bool], List[int], List[int]]:
+    """ the Euclidean algorithm of SBpath_rle on a batch of fractions,
+        all the Euclidean divisions of a step being done at once on arrays
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of pairs (numerator, denominator), all positive
+    Returns:
+        the tuple of lists (first, counts, quotients): first[i] is True if the path of the ith fraction begins with 'R',
+        counts[i] is its number of runs, and quotients the lengths of the runs of all the fractions one after the other,
+        the runs of a fraction being alternately 'R' and 'L' or 'L' and 'R'
+    """
+    nums, dens = pairs2arrays(pairs)
+    assert (nums > 0).all() and (dens > 0).all(), "numerators and denominators must be positive"
+    first = (nums > dens).tolist()
+    # only the fractions which have not yet reached the root (idx) are kept in the arrays
+    idx = np.flatnonzero(nums != dens)
+    nums, dens = nums[idx], dens[idx]
+    steps, quotients = [], []
+    while len(idx) > 0:
+        right = nums > dens
+        big, small = np.where(right, nums, dens), np.where(right, dens, nums)
+        q = big // small
+        r = big - q*small
+        exact = r == 0
+        q[exact] -= 1
+        r[exact] = small[exact]
+        steps.append(idx)
+        quotients.append(q)
+        nums, dens = np.where(right, r, nums), np.where(right, dens, r)
+        todo = ~exact
+        idx, nums, dens = idx[todo], nums[todo], dens[todo]
+    if not steps:
+        return first, [0]*len(first), []
+    # sorting the quotients by fraction (stable sort: in the order of the steps)
+    steps = np.concatenate(steps)
+    order = np.argsort(steps, kind='stable')
+    return first, np.bincount(steps, minlength=len(first)).tolist(), np.concatenate(quotients)[order].tolist()
+
+
+def SBpath_many(pairs: Union[np.array, List[Tuple[int, int]]], rle: bool = False,
+                processes: Optional[int] = None, chunk: int = 10**5) -> List[Any]:
+    """ batch version of SBpath: find the Stern-Brocot paths of a batch of fractions
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of pairs (numerator, denominator), all positive
+        rle: (bool) if True return the run-length encoded paths instead of the path strings
+        processes: (int) if not None, the number of worker processes the batch is divided between
+        chunk: (int) the number of fractions sent to each worker process at once
+    Returns:
+        the list of the paths (str, or lists of runs [(chr, k), ...] if rle is True)
+    Example:
+        SBpath_many([(3, 8), (5, 2)]) -> ['LLRL', 'RRL']
+        SBpath_many([(3, 8), (5, 2)], rle=True) -> [[('L', 2), ('R', 1), ('L', 1)], [('R', 2), ('L', 1)]]
+    """
+    if processes is not None:
+        pairs = np.asarray(pairs if isinstance(pairs, np.ndarray) else list(pairs))
+        blocks = fan_out(partial(SBpath_many, rle=rle), pairs, processes, chunk)
+        return [path for block in blocks for path in block]
+    first, counts, quotients = euclid_many(pairs)
+    n = max(counts, default=0)//2 + 1
+    RL, LR = ('R', 'L')*n, ('L', 'R')*n
+    # each path takes its counts[i] runs from the iterator qs
+    qs = iter(quotients)
+    if rle:
+        return [list(zip(islice(RL if right else LR, count), qs)) for right, count in zip(first, counts)]
+    return [''.join(map(mul, islice(RL if right else LR, count), qs)) for right, count in zip(first, counts)]
+
+
+def CWpath_many(pairs: Union[np.array, List[Tuple[int, int]]], rle: bool = False,
+                processes: Optional[int] = None, chunk: int = 10**5) -> List[Any]:
+    """ batch version of CWpath: find the Calkin-Wilf paths of a batch of fractions
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of pairs (numerator, denominator), all positive
+        rle: (bool) if True return the run-length encoded paths instead of the path strings
+        processes: (int) if not None, the number of worker processes the batch is divided between
+        chunk: (int) the number of fractions sent to each worker process at once
+    Returns:
+        the list of the paths (str, or lists of runs if rle is True)
+    Example:
+        CWpath_many([(3, 8), (5, 2)]) -> ['LRLL', 'LRR']
+    """
+    return [path[::-1] for path in SBpath_many(pairs, rle, processes, chunk)]
+
+
+def path2coefs_many(paths: List[str]) -> Tuple[np.array, np.array, np.array, np.array]:
+    """ batch version of path2coefs: the coefficients (a, b, c, d) of the matrices of a batch of paths,
+        each character updating the arrays of coefficients of all the paths at once
+
+    Args:
+        paths: a list of path strings of 'L' and 'R' or bits strings of '0' and '1'
+    Returns:
+        the tuple of the 4 np.array a, b, c, d of the coefficients
+    """
+    n = len(paths)
+    width = max(map(len, paths), default=0)
+    dtype = stern_dtype(width)
+    if n == 0:
+        return tuple(np.empty(0, dtype) for _ in range(4))
+    # one path per line, padded with zero bytes
+    chrs = np.array(paths, dtype='S{}'.format(max(width, 1))).view(np.uint8).reshape(n, -1)
+    a, b, c, d = np.ones(n, dtype), np.zeros(n, dtype), np.zeros(n, dtype), np.ones(n, dtype)
+    for t in range(width):
+        left = (chrs[:, t] == ord('L')) | (chrs[:, t] == ord('0'))
+        right = (chrs[:, t] == ord('R')) | (chrs[:, t] == ord('1'))
+        b[left] += a[left]
+        d[left] += c[left]
+        a[right] += b[right]
+        c[right] += d[right]
+    return a, b, c, d
+
+
+def SBfrac_many(paths: List[Union[str, List[Tuple[str, int]]]],
+                processes: Optional[int] = None, chunk: int = 10**5) -> Tuple[np.array, np.array]:
+    """ batch version of SBfrac: the Stern-Brocot fractions of a batch of paths
+
+    Args:
+        paths: a list of path strings (or bits strings), or of run-length encoded paths
+        processes: (int) if not None, the number of worker processes the batch is divided between
+        chunk: (int) the number of paths sent to each worker process at once
+    Returns:
+        the pair of np.array (numerators, denominators)
+    Example:
+        SBfrac_many(['LRLL', 'RRL']) -> (array([4, 5], dtype=uint64), array([7, 2], dtype=uint64))
+    """
+    if processes is not None:
+        blocks = fan_out(SBfrac_many, list(paths), processes, chunk)
+        return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+    a, b, c, d = path2coefs_many([p if isinstance(p, str) else rle2path(p) for p in paths])
+    return c + d, a + b
+
+
+def CWfrac_many(paths: List[Union[str, List[Tuple[str, int]]]],
+                processes: Optional[int] = None, chunk: int = 10**5) -> Tuple[np.array, np.array]:
+    """ batch version of CWfrac: the Calkin-Wilf fractions of a batch of paths
+
+    Args:
+        paths: a list of path strings (or bits strings), or of run-length encoded paths
+        processes: (int) if not None, the number of worker processes the batch is divided between
+        chunk: (int) the number of paths sent to each worker process at once
+    Returns:
+        the pair of np.array (numerators, denominators)
+    Example:
+        CWfrac_many(['LRLL', 'RRL']) -> (array([3, 3], dtype=uint64), array([8, 4], dtype=uint64))
+    """
+    if processes is not None:
+        blocks = fan_out(CWfrac_many, list(paths), processes, chunk)
+        return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+    a, b, c, d = path2coefs_many([p if isinstance(p, str) else rle2path(p) for p in paths])
+    return a + c, b + d
+
+
+def sb_bounds_many(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[np.array, np.array, np.array, np.array]:
+    """ batch version of the nearest ancestors c/a < num/den < d/b of Stern-Brocot nodes (see lattice._sb_bounds):
+        a is the inverse of num modulo den and c = (num*a - 1)/den, both found by the extended Euclidean
+        algorithm on all the nodes at once (in int64, or with Python integers from 2**62)
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of relatively prime pairs (numerator, denominator),
+               all positive
+    Returns:
+        the tuple of the 4 np.array c, a, d, b, the left bound being 0/1 on the left border
+        and the right bound 1/0 on the right border
+    """
+    nums, dens = pairs2arrays(pairs)
+    assert (nums > 0).all() and (dens > 0).all(), "numerators and denominators must be positive"
+    if nums.dtype.kind != 'O' and max(int(nums.max(initial=0)), int(dens.max(initial=0))) >= 2**62:
+        # the sons num + c of such nodes would not fit in int64
+        nums, dens = nums.astype(object), dens.astype(object)
+    elif nums.dtype.kind == 'u':
+        nums, dens = nums.astype(np.int64), dens.astype(np.int64)
+    # r == s*den + t*num for (r0, s0, t0) and (r1, s1, t1), until r1 == 0 and r0 == gcd(num, den) == 1:
+    # the Bezout coefficients are bounded by num and den, so that nothing overflows
+    r0, r1 = dens, nums % dens
+    s0, s1 = np.ones_like(nums), -(nums // dens)
+    t0, t1 = np.zeros_like(nums), np.ones_like(nums)
+    todo = r1 != 0
+    while todo.any():
+        q = r0 // np.where(todo, r1, 1)
+        r0, r1 = np.where(todo, r1, r0), np.where(todo, r0 - q*r1, r1)
+        s0, s1 = np.where(todo, s1, s0), np.where(todo, s0 - q*s1, s1)
+        t0, t1 = np.where(todo, t1, t0), np.where(todo, t0 - q*t1, t1)
+        todo = r1 != 0
+    # num*t0 - 1 == -s0*den: a = t0 + k*den in 1..den, c = (num*a - 1)/den = -s0 + k*num
+    k = (dens - t0) // dens
+    a = t0 + k*dens
+    c = k*nums - s0
+    return c, a, nums - c, dens - a
+
+
+def SBancestors_many(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[Tuple[np.array, np.array],
+                                                                           Tuple[np.array, np.array]]:
+    """ batch version of SBancestors: the nearest left and right ancestors of a batch of Stern-Brocot nodes
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of relatively prime pairs (numerator, denominator)
+    Returns:
+        the pair ((numerators, denominators) of the left ancestors, (numerators, denominators) of the right ones),
+        the missing ancestors being 0/1 on the left and 1/0 on the right
+    Example:
+        SBancestors_many([(3, 8), (5, 2)]) -> ((array([1, 2]), array([3, 1])), (array([2, 3]), array([5, 1])))
+    """
+    c, a, d, b = sb_bounds_many(pairs)
+    return (c, a), (d, b)
+
+
+def SBfather_many(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[np.array, np.array]:
+    """ batch version of SBfather: the fathers of a batch of Stern-Brocot nodes (the root being its own father)
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of relatively prime pairs (numerator, denominator)
+    Returns:
+        the pair of np.array (numerators, denominators)
+    Example:
+        SBfather_many([(3, 8), (5, 2)]) -> (array([2, 3]), array([5, 1]))
+    """
+    c, a, d, b = sb_bounds_many(pairs)
+    root = (c == 0) & (b == 0)
+    left = c + a > d + b
+    return np.where(root, 1, np.where(left, c, d)), np.where(root, 1, np.where(left, a, b))
+
+
+def SBsons_many(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[Tuple[np.array, np.array],
+                                                                      Tuple[np.array, np.array]]:
+    """ batch version of SBsons: the left and right sons of a batch of Stern-Brocot nodes
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of relatively prime pairs (numerator, denominator)
+    Returns:
+        the pair ((numerators, denominators) of the left sons, (numerators, denominators) of the right sons)
+    Example:
+        SBsons_many([(2, 5)]) -> ((array([3]), array([8])), (array([3]), array([7])))
+    """
+    c, a, d, b = sb_bounds_many(pairs)
+    nums, dens = c + d, a + b
+    return (nums + c, dens + a), (nums + d, dens + b)
+
+
+def SBsibling_many(pairs: Union[np.array, List[Tuple[int, int]]]) -> Tuple[np.array, np.array]:
+    """ batch version of SBsibling: the siblings of a batch of Stern-Brocot nodes (the root being its own sibling)
+
+    Args:
+        pairs: a np.array of shape (n, 2) or an iterable of relatively prime pairs (numerator, denominator)
+    Returns:
+        the pair of np.array (numerators, denominators)
+    Example:
+        SBsibling_many([(3, 8), (5, 2)]) -> (array([3, 4]), array([7, 1]))
+    """
+    c, a, d, b = sb_bounds_many(pairs)
+    root = (c == 0) & (b == 0)
+    left = c + a > d + b
+    return (np.where(root, 1, np.where(left, 2*c - d, 2*d - c)),
+            np.where(root, 1, np.where(left, 2*a - b, 2*b - a)))
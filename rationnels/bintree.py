@@ -0,0 +1,211 @@
+""" Binary trees as lists of levels, and the paths of their nodes as strings of 'L' and 'R' """
+import sys
+from itertools import product, repeat
+from typing import Any, Iterable, List, Optional, TextIO, Tuple, Callable
+
+
+def bin_levels(lst: List[Any]) -> List[List[Any]]:
+    """ divide a list in blocks (lists) corresponding to the first levels of a binary tree
+    
+    Args: 
+        lst:  a list
+    Returns:
+        a list of levels: [lvls[0],...,lvls[k],..., lvls[-1]]] 
+        length(lvls[0]) == 1, lvls[0][0] is the root of the binary tree
+        for each level k > 0, len(lvls[k]) == 2*len(lvls[k-1]), 
+        but for the last level, len(lvls[-1]) <= 2*len(lvls[-2]) depending on len(lst)
+    Example:
+        if lst = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
+        bin_levels(lst) -> [[1], [2, 3], [4, 5, 6, 7], [8, 9, 10, 11, 12, 13, 14, 15]]
+    """
+    n = len(lst)
+    lvls = []
+    m = 1
+    while 2*m <= n:
+        lvls.append(lst[m-1:2*m-1])
+        m = 2*m
+    lvls.append(lst[m-1:n+1])
+    return lvls
+
+
+def print_bintree(lvls : List[List[Any]],r: int = 1, fmt: Callable[[Any],str] = str) -> None:
+    """ pretty print of a binary tree defined by lvls as in the result 
+        of the bin_levels function (see write_bintree for large trees)
+        
+    Args:
+        lvls: binary tree as a list of levels: [lvls[0],...,lvls[k],..., lvls[-1]]] 
+              length(lvls[0]) == 1, lvls[0][0] is the root of the binary tree
+              for each level k > 0, len(lvls[k]) == 2*len(lvls[k-1]), 
+              but for the last level, len(lvls[-1]) <= 2*len(lvls[-2]) 
+        r:    (int) w = 2*r+1 is the width of printed label for each node.
+              default: r=1 => 3 characters for each node's label
+        fmt:  a function defining the print format of each node. 
+              default: the function str
+    Returns:
+        None: this function is just for printing the first levels of a binary tree 
+    """
+    write_bintree(lvls, sys.stdout, r, fmt)
+
+
+def write_bintree(lvls: List[List[Any]], file: Optional[TextIO] = None, r: int = 1, fmt: Callable[[Any], str] = str,
+                  root: Tuple[int, int] = (0, 0), depth: Optional[int] = None, max_width: Optional[int] = None,
+                  chunk: int = 2**16) -> None:
+    """ write the drawing of print_bintree to a file-like object, line by line and by chunks of characters:
+        no line is built as a whole, and each label is formatted once for each distinct value
+
+    Args:
+        lvls: binary tree as a list of levels, as in print_bintree (lists, arrays or memory maps)
+        file: a file-like object with a write method, sys.stdout by default
+        r:    (int) w = 2*r+1 is the width of printed label for each node
+        fmt:  a function defining the print format of each node, default: the function str
+        root: the pair (level, idx) of the root of the drawn subtree, the root of the tree by default
+        depth: (int) the number of levels drawn from root, all the levels by default
+        max_width: (int) if not None, the lines are cut after max_width characters, ending with '...':
+                   only the nodes of the beginning of the wide levels are formatted
+        chunk: (int) the number of characters written at once
+    Returns:
+        None
+    Example:
+        with open('tree.txt', 'w') as f: write_bintree(SBpairs(16), f, fmt=lambda p: '{},{}'.format(*p))
+        write_bintree(SBpairs(12), root=(2, 1), depth=4, max_width=120)
+    """
+    if file is None:
+        file = sys.stdout
+    k0, i0 = root
+    n = len(lvls) - k0 if depth is None else min(depth, len(lvls) - k0)
+    w = 2*r+1
+    labels = {}
+
+    def label(el: Any) -> str:
+        """ the centered label of el, cached by (type, value) when el is hashable """
+        try:
+            key = (type(el), el)
+            if key not in labels:
+                labels[key] = '{:^{}}'.format(fmt(el), w)
+            return labels[key]
+        except TypeError:
+            return '{:^{}}'.format(fmt(el), w)
+
+    def write_line(pieces: Iterable[str]) -> None:
+        """ write the concatenation of pieces and a newline, by chunks, cut after max_width characters """
+        # buf holds the last size characters of the line (col characters so far): the ones after the column
+        # max_width - 3 are kept in buf, to be replaced by '...' if the line is cut
+        buf, size, col = [], 0, 0
+        for piece in pieces:
+            if max_width is not None and col + len(piece) > max_width:
+                text = ''.join(buf) + piece
+                buf = [text[:max(0, max_width - 3 - (col - size))] + '...']
+                break
+            buf.append(piece)
+            size += len(piece)
+            col += len(piece)
+            if size >= chunk:
+                text = ''.join(buf)
+                keep = 0 if max_width is None else min(size, max(0, col - (max_width - 3)))
+                file.write(text[:size - keep])
+                buf, size = [text[size - keep:]], keep
+        buf.append('\n')
+        file.write(''.join(buf))
+
+    for k in range(n):
+        # the nodes of the subtree in the level k0 + k
+        nodes = lvls[k0 + k][i0 << k:(i0 + 1) << k]
+        # lbn: the half-distance between two nodes at this level, lu: the length of horizontal branches
+        lbn = w*(2**(n-1-k)-1)
+        lu = lbn//2
+        write_line(repeat((lbn+r)*' ' + '|' + (lbn+3*r+1)*' ', len(nodes)))
+        before, after = (lu+(k!=(n-1)))*' ' + lu*'_', lu*'_' + (lu+(k!=(n-1))+2*r+1)*' '
+        write_line(before + label(el) + after for el in nodes)
+
+
+def paths_level(k: int) -> List[str]:
+    """ return the path strings describing the kth level of a binary tree:
+    
+    Args: 
+        k: an integer
+    Returns:
+        a list of strings, defining the ordered list of the level's nodes
+    Examples:
+        [''] for the root at level k = 0
+        ['L', 'R'] for the left and right sons of the root at the first level k = 1,
+        ['LL', 'LR', 'RL', 'RR'] at level k = 2 for the respective left and right sons of level 1 nodes
+        """
+    return [''.join(t) for t in product(('L','R'),repeat=k)]
+
+
+def ints2bin(ints: List[int], nbits: Optional[int] = None) -> List[str]:
+    """ return the list of the binary representations on nbits of all integers in the list ints.
+    
+    Args:
+        ints: a list of integers 
+        nbits: an integer, the fixed length for all the bits string representing the integers in ints.
+        If nbits == None then for each integer in ints the binary representation is the string of minimal length
+    Returns:
+        The list of the binary representation of the integers in ints
+    Example:
+        ints2bin([1,2],nbits=3) ->  ['001', '010']
+        ints2bin([1,2]) ->  ['1', '10']
+    """
+    return [format(k, 'b').zfill(nbits or 0) for k in ints]
+
+
+def rev_ints(ints: List[int], nbits: Optional[int] = None) -> List[int]:
+    """return the list of integers resulting of the reversing of the binary repr of the integers in  ints
+    
+    Args:
+        ints: a list of integers 
+        nbits: an integer, the fixed length for all the bits string representing the integers in ints.
+        If nbits == None then for each integer in ints the binary representation is the string of minimal length   
+    Returns:
+        the list of integers resulting of the reversing of the binary repr of the integers in  ints
+    Example:
+        rev_ints([1,2],nbits=3) -> [4, 2] (['001', '010'] -> ['100', '010'])
+        rev_ints([1,2]) -> [1, 1] (['1', '10'] -> ['1', '1'])
+    """
+    return [int(bits[::-1],2) for bits in ints2bin(ints,nbits)]
+
+
+def str_translate(s: str, fromchrs: str = '01', tochrs: str = '10') -> str:
+    """substitute in the string s the characters in fromchrs to those in tochrs and return the resulting string
+    
+    Args:
+        s: a string
+        fromchrs: a string listing all the characters to be changed
+        tochrs: a string listing the corresponding substitutes
+    Returns:
+        the string resulting from the substitutions in s.
+    Examples:
+       str_transl('1101') -> '0010'
+       str_transl('LLRL','LR','01') -> '0010'
+    """
+    if s == '':
+        return tochrs[0]
+    return s.translate(dict(list(zip((map(ord,fromchrs)),tochrs))))
+
+
+def level_idx(path_string: str) -> Tuple[int, int]:
+    """ returns a pair of integers(level_number,idx) identifying the positition  
+        idx of a node in the list representing the level in a binary tree.
+    
+    Args:
+        path_string: a string of 'L' and 'R',describing the left and right from the root moves to reach a node
+    Returns:
+        a tuple of 2 integers: the node's level number and his index position in the corresponding list
+    Example:
+        level_idx('RRL') -> (3, 6)
+        """
+    return len(path_string), int(str_translate(path_string,'LR','01'), 2)
+
+
+def path_str(level: int, idx: int) -> str:
+    """ returns the path string of the node defined by level and idx
+    
+    Args:
+        level: (int) node's level number of the node the pair of integers(level,idx) identifies the positition idx of a node 
+        idx: (int) node's index in the list representing the level
+    Returns:
+        the node's corresponding path string
+    Example:
+        path_str(3,6) == 'RRL' 
+    """
+    return str_translate(format(idx, 'b').zfill(level),'01','LR')
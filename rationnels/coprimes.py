@@ -0,0 +1,235 @@
+""" The coprime pairs of a box of N², the nodes of the Stern-Brocot tree in N², as numpy arrays,
+    and their numbers computed without enumerating them, by the sieves of Euler's totient and of Möbius
+
+The sieves of bounded ranges can be memoized (cache=True): a range is sieved once to the next power of two,
+and the counts and the coprimality tests become lookups in the read-only arrays of sieve_table.
+"""
+from functools import lru_cache
+from typing import Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+def primes(n: int) -> np.array:
+    """ return the primes p <= n, by the sieve of Eratosthenes
+
+    Args:
+        n: (int) n >= 0
+    Returns:
+        the np.array of the primes in increasing order
+    Example:
+        primes(10) -> array([2, 3, 5, 7])
+    """
+    sieve = np.ones(n + 1, dtype=bool)
+    sieve[:2] = False
+    for p in range(2, int(n**0.5) + 1):
+        if sieve[p]:
+            sieve[p*p::p] = False
+    return np.flatnonzero(sieve)
+
+
+def totients(n: int) -> np.array:
+    """ return Euler's totients phi(0), phi(1), ..., phi(n), phi(k) being the number of integers in 1..k
+        relatively prime to k: phi(k) = k*prod(1 - 1/p) for the primes p dividing k
+
+    Args:
+        n: (int) n >= 0
+    Returns:
+        the np.array of int64 of the n+1 totients (phi(0) == 0)
+    Example:
+        totients(10) -> array([0, 1, 1, 2, 2, 4, 2, 6, 4, 6, 4])
+    """
+    phi = np.arange(n + 1, dtype=np.int64)
+    for p in primes(n):
+        phi[p::p] -= phi[p::p] // p
+    return phi
+
+
+def mobius(n: int) -> np.array:
+    """ return the values mu(0), mu(1), ..., mu(n) of the Möbius function: mu(k) is 0 if k has a square factor,
+        else (-1)**(number of prime factors of k)
+
+    Args:
+        n: (int) n >= 0
+    Returns:
+        the np.array of int8 of the n+1 values (mu(0) == 0)
+    Example:
+        mobius(10) -> array([0, 1, -1, -1, 0, -1, 1, -1, 0, 0, 1])
+    """
+    mu = np.ones(n + 1, dtype=np.int8)
+    mu[0] = 0
+    for p in primes(n):
+        mu[p::p] *= -1
+        mu[p*p::p*p] = 0
+    return mu
+
+
+SIEVE_MIN = 2**10
+COPRIME_TABLE_MAX = 2**12
+
+
+def _sieve_size(n: int) -> int:
+    """ the size of the sieve covering 0, 1, ..., n: the smallest power of two larger than n, at least SIEVE_MIN """
+    return max(SIEVE_MIN, 1 << n.bit_length())
+
+
+@lru_cache(maxsize=16)
+def _sieve(kind: str, size: int) -> np.array:
+    """ the read-only table of kind for 0, 1, ..., size - 1 (see sieve_table) """
+    if kind == 'totients':
+        table = totients(size - 1)
+    elif kind == 'mobius':
+        table = mobius(size - 1)
+    elif kind == 'farey':
+        table = np.cumsum(totients(size - 1))
+        table[1:] += 1
+    else:
+        table = np.zeros((size, size), dtype=bool)
+        for xs, ys in iter_coprimes(size - 1):
+            table[ys, xs] = True
+        table[1, 1] = False
+    table.flags.writeable = False
+    return table
+
+
+def sieve_table(kind: str, n: int) -> np.array:
+    """ return a memoized sieve covering 0, 1, ..., n, sieved to the next power of two (at least SIEVE_MIN),
+        so that the calls for the ranges of the same size share it: the returned array is read-only
+
+    Args:
+        kind: (str) 'totients' (phi(k)), 'mobius' (mu(k)), 'farey' (|F_k|, 0 for k == 0)
+              or 'coprime' (the table of rel_prime(x, y) for x, y < size, size <= COPRIME_TABLE_MAX)
+        n: (int) the largest k, or the largest x and y for 'coprime'
+    Returns:
+        the np.array of at least n+1 values, or of at least (n+1)x(n+1) booleans for 'coprime'
+    Example:
+        sieve_table('farey', 5)[5] -> 11
+    """
+    assert kind in ('totients', 'mobius', 'farey', 'coprime'), "{} is not a known sieve".format(kind)
+    size = _sieve_size(n)
+    assert kind != 'coprime' or size <= COPRIME_TABLE_MAX, "the coprime table is limited to {}".format(COPRIME_TABLE_MAX)
+    return _sieve(kind, size)
+
+
+def farey_length(N: int, cache: bool = False) -> int:
+    """ return the number of terms |F_N| = 1 + phi(1) + ... + phi(N) of the Farey sequence of order N,
+        without enumerating it
+
+    Args:
+        N: (int) the order N >= 1
+        cache: (bool) if True, look it up in the memoized sieve_table('farey', N)
+    Returns:
+        the number of fractions of [0, 1] of denominator at most N
+    Example:
+        farey_length(4) -> 7
+    """
+    if cache:
+        return int(sieve_table('farey', N)[N])
+    return 1 + int(totients(N)[1:].sum())
+
+
+def farey_lengths(Ns: Any) -> np.array:
+    """ return the numbers of terms |F_N| of the Farey sequences of an array of orders N, by lookups in the
+        memoized sieve_table('farey', max(Ns))
+
+    Args:
+        Ns: a np.array (or an array-like) of orders N >= 1
+    Returns:
+        the np.array of int64 of the |F_N|, of the shape of Ns
+    Example:
+        farey_lengths([1, 4, 5]) -> array([ 2,  7, 11])
+    """
+    Ns = np.asarray(Ns)
+    return sieve_table('farey', int(Ns.max(initial=0)))[Ns]
+
+
+def coprime_count(X: int, Y: Optional[int] = None, cache: bool = False) -> int:
+    """ return the number of coprime pairs (x, y), 1 <= x <= X, 1 <= y <= Y, without enumerating them:
+        sum(mu(d)*(X//d)*(Y//d)) for 1 <= d <= min(X, Y), by Möbius inversion
+
+    Args:
+        X: (int) the largest x
+        Y: (int) the largest y, X by default
+        cache: (bool) if True, take the values of mu in the memoized sieve_table('mobius', min(X, Y))
+    Returns:
+        the number of coprime pairs of the box, (1, 1) included
+    Example:
+        coprime_count(4) -> 11, coprime_count(4, 1) -> 4
+    """
+    Y = X if Y is None else Y
+    n = min(X, Y)
+    mu = sieve_table('mobius', n) if cache else mobius(n)
+    d = np.arange(1, n + 1, dtype=np.int64)
+    return int((mu[1:n+1]*(X // d)*(Y // d)).sum())
+
+
+def rel_prime_many(a: Any, b: Any, cache: bool = False) -> np.array:
+    """ vectorized rel_prime: True where a and b are relatively prime, by np.gcd on whole arrays,
+        (1, 1) excluded as in rel_prime
+
+    Args:
+        a: a np.array (or an array-like, or an int) of positive integers (asserted, on both paths)
+        b: a np.array (or an array-like, or an int) of positive integers, broadcastable with a
+        cache: (bool) if True and all the integers are less than COPRIME_TABLE_MAX, look them up in the
+               memoized sieve_table('coprime', ...) instead of computing the gcds
+    Returns:
+        the np.array of booleans of the broadcast shape of a and b
+    Example:
+        rel_prime_many([3, 4, 1], [8, 6, 1]) -> array([ True, False, False])
+    """
+    a, b = np.asarray(a), np.asarray(b)
+    # the sieved table has no row 0 for the pairs (0, 1) and would be indexed from its end by negative integers
+    assert a.min(initial=1) >= 1 and b.min(initial=1) >= 1, "the integers are not all positive"
+    n = int(max(a.max(initial=0), b.max(initial=0)))
+    if cache and _sieve_size(n) <= COPRIME_TABLE_MAX:
+        return sieve_table('coprime', n)[a, b]
+    return (np.gcd(a, b) == 1) & ~((a == 1) & (b == 1))
+
+
+def smallest_factors(n: int) -> np.array:
+    """ return the smallest prime factors of 0, 1, ..., n (0 for 0 and 1), by the sieve of Eratosthenes
+
+    Args:
+        n: (int) n >= 0
+    Returns:
+        the np.array of int64 of the n+1 smallest prime factors
+    Example:
+        smallest_factors(10) -> array([0, 0, 2, 3, 2, 5, 2, 7, 2, 3, 2])
+    """
+    spf = np.zeros(n + 1, dtype=np.int64)
+    for p in primes(int(n**0.5)):
+        multiples = spf[p*p::p]
+        multiples[multiples == 0] = p
+    rest = np.flatnonzero(spf == 0)
+    spf[rest] = rest
+    spf[:2] = 0
+    return spf
+
+
+def iter_coprimes(X: int, Y: Optional[int] = None, chunk: int = 2**20) -> Iterator[Tuple[np.array, np.array]]:
+    """ generate the coprime pairs (x, y), 1 <= x <= X, 1 <= y <= Y, by blocks of lines y of the box:
+        the multiples of each prime factor p of y are struck out of the line y, in O(X/p) (no gcd is computed)
+
+    Args:
+        X: (int) the largest x (numerators)
+        Y: (int) the largest y (denominators), X by default
+        chunk: (int) the number of cells of the box in a block (a block has at least one line)
+    Yields:
+        the pairs of np.array (x, y) of the coprime pairs of each block, line by line
+    Example:
+        next(iter_coprimes(3)) -> (array([1, 2, 3, 1, 3, 1, 2]), array([1, 1, 1, 2, 2, 3, 3]))
+    """
+    Y = X if Y is None else Y
+    lines = max(1, chunk // max(X, 1))
+    spf = smallest_factors(Y)
+    for y0 in range(1, Y + 1, lines):
+        y1 = min(y0 + lines, Y + 1)
+        coprime = np.ones((y1 - y0, X), dtype=bool)
+        for i, y in enumerate(range(y0, y1)):
+            while y > 1:
+                p = int(spf[y])
+                coprime[i, p-1::p] = False
+                while y % p == 0:
+                    y //= p
+        ys, xs = np.nonzero(coprime)
+        yield xs + 1, ys + y0
@@ -0,0 +1,223 @@
+""" Enumeration of all the positive rationals in the breadth-first order of the Calkin-Wilf
+    or of the Stern-Brocot tree, one fraction at a time, of the Farey sequences, and of the fractions
+    of a subtree or of an interval of the Stern-Brocot tree
+"""
+from itertools import islice
+from numbers import Integral
+from operator import index
+from typing import List, Union, Optional, Tuple, Iterator
+
+from .paths import frac2pair, SBpath_rle, path2rle, rle2mat, cw_nth, cw_index, sb_index, Path
+
+
+def stern_pair(n: int) -> Tuple[int, int]:
+    """ return the pair (s(n), s(n+1)) of consecutive terms of the Stern sequence in O(log n)
+
+    Args:
+        n: (int) n >= 0
+    Returns:
+        the pair (s(n), s(n+1)), the numerator and denominator of cw_nth(n) if n > 0
+    Example:
+        stern_pair(5) -> (3, 2)
+    """
+    if n == 0:
+        return 0, 1
+    frac = cw_nth(n)
+    return frac.numerator, frac.denominator
+
+
+def iter_cw(n: int = 1) -> Iterator[Tuple[int, int]]:
+    """ generate the Calkin-Wilf sequence of pairs (numerator, denominator) from the n-th one,
+        using Newman's successor x -> 1/(2*floor(x) - x + 1)
+
+    Args:
+        n: (int) n >= 1, the breadth-first number of the first node (see cw_nth)
+    Yields:
+        the pairs (numerator, denominator) of the nodes n, n+1, n+2, ...
+    """
+    num, den = stern_pair(n)
+    while True:
+        yield num, den
+        num, den = den, (2*(num // den) + 1)*den - num
+
+
+def iter_sb(n: int = 1) -> Iterator[Tuple[int, int]]:
+    """ generate the Stern-Brocot tree's pairs (numerator, denominator) in breadth-first order from the n-th one,
+        node (k, i) being s(j)/s(2**(k+1) - j) where j = 2*i + 1 and s is the Stern sequence
+
+    Args:
+        n: (int) n >= 1, the breadth-first number of the first node (see sb_nth)
+    Yields:
+        the pairs (numerator, denominator) of the nodes n, n+1, n+2, ...
+    """
+    assert n >= 1, "{} is not a positive integer".format(n)
+    k = n.bit_length() - 1
+    top = 1 << (k+1)
+    j = 2*(n - (1 << k)) + 1
+    a0, a1 = stern_pair(j)              # s(j), s(j+1)
+    b0, b1 = stern_pair(top - j - 1)    # s(top-j-1), s(top-j)
+    while True:
+        yield a0, b1
+        if j == top - 1:
+            # first node of the next level: s(1)/s(2**(k+2) - 1) == 1/(k+2)
+            k += 1
+            top <<= 1
+            j = 1
+            a0, a1, b0, b1 = 1, 1, k, k + 1
+        else:
+            # 2*nu + 1 where nu is the exponent of 2 in j+1 and in top-j-1
+            r = 2*((j + 1) & -(j + 1)).bit_length() - 1
+            a0 = r*a1 - a0
+            a1 = a0 - a1
+            b1 = r*b0 - b1
+            b0 = b1 - b0
+            j += 2
+
+
+def iter_rationals(start: Union[int, Tuple[int, int], str] = 1, order: str = 'cw',
+                   chunk: Optional[int] = None, dtype: Optional[type] = None) -> Iterator:
+    # start: Union[int, Tuple[int, int], Fraction[int, int], str]
+    """ generate all the positive rationals, in the breadth-first order of the Calkin-Wilf
+        or of the Stern-Brocot tree, keeping only O(1) integers between two steps
+
+    Args:
+        start: (int) the breadth-first number n >= 1 of the first node (see cw_nth, sb_nth)
+               or the first fraction as a tuple (3,8), a string '3/8' or a Fraction(3,8)
+        order: (str) 'cw' for the Calkin-Wilf tree, 'sb' for the Stern-Brocot tree
+        chunk: (int) if None the pairs are yielded one by one,
+               else a pair of arrays (numerators, denominators) is yielded for each block of chunk nodes
+        dtype: dtype of the arrays when chunk is not None, np.uint64 (the default) or object
+    Yields:
+        the pairs (numerator, denominator), or pairs of np.array of chunk numerators and denominators
+    Example:
+        list(islice(iter_rationals('3/2'), 4)) -> [(3, 2), (2, 3), (3, 1), (1, 4)]
+    """
+    assert order in ('cw', 'sb'), "{} is not a known order".format(order)
+    if isinstance(start, Integral):
+        # a numpy integer as a Python int, so that the steps never overflow
+        start = index(start)
+    else:
+        start = cw_index(start) if order == 'cw' else sb_index(start)
+    pairs = iter_cw(start) if order == 'cw' else iter_sb(start)
+    if chunk is None:
+        yield from pairs
+        return
+    import numpy as np
+    if dtype is None:
+        dtype = np.uint64
+    while True:
+        nums, dens = zip(*islice(pairs, chunk))
+        yield np.array(nums, dtype=dtype), np.array(dens, dtype=dtype)
+
+
+def iter_farey(N: int, chunk: Optional[int] = None, dtype: Optional[type] = None) -> Iterator:
+    """ generate the Farey sequence of order N, the fractions of [0, 1] of denominators at most N in increasing
+        order, in O(1) per term: the term after a/b, c/d is (k*c - a)/(k*d - b) where k = (N + b)//d
+
+    Args:
+        N: (int) the order N >= 1
+        chunk: (int) if None the pairs are yielded one by one,
+               else a pair of arrays (numerators, denominators) is yielded for each block of chunk fractions
+               (the last one may be shorter)
+        dtype: dtype of the arrays when chunk is not None, np.int64 (the default) or object
+    Yields:
+        the pairs (numerator, denominator) from (0, 1) to (1, 1), or pairs of np.array of numerators and denominators
+    Example:
+        list(iter_farey(4)) -> [(0, 1), (1, 4), (1, 3), (1, 2), (2, 3), (3, 4), (1, 1)]
+    """
+    assert N >= 1, "{} is not a positive integer".format(N)
+    if chunk is not None:
+        import numpy as np
+        pairs = iter_farey(N)
+        while True:
+            block = list(islice(pairs, chunk))
+            if not block:
+                return
+            nums, dens = zip(*block)
+            yield np.array(nums, dtype=dtype or np.int64), np.array(dens, dtype=dtype or np.int64)
+    a, b, c, d = 0, 1, 1, N
+    yield a, b
+    while c <= d:
+        yield c, d
+        k = (N + b) // d
+        a, b, c, d = c, d, k*c - a, k*d - b
+
+
+def sb_subtree(root_path: Union[str, Path] = '', depth: int = 1) -> Iterator[Tuple[int, int]]:
+    """ generate the first depth levels of the subtree of the Stern-Brocot tree rooted at a node, in breadth-first
+        order: each node is the mediant of its bounds, so only the current level is kept
+
+    Args:
+        root_path: the path string (or the Path) of the subtree's root
+        depth: (int) the number of levels of the subtree, depth >= 1
+    Yields:
+        the pairs (numerator, denominator), 2**k pairs for the level k of the subtree
+    Example:
+        list(sb_subtree('L', 2)) -> [(1, 2), (1, 3), (2, 3)]
+    """
+    a, b, c, d = rle2mat(path2rle(str(root_path)))
+    # the bounds (c, a, d, b) of the nodes of the level
+    level = [(c, a, d, b)]
+    for k in range(depth):
+        yield from ((c + d, a + b) for c, a, d, b in level)
+        if k < depth - 1:
+            level = [bounds for c, a, d, b in level for bounds in ((c, a, c + d, a + b), (c + d, a + b, d, b))]
+
+
+def _common_runs(runs1: List[Tuple[str, int]], runs2: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """ the runs of the longest common prefix of two run-length encoded paths """
+    common = []
+    for (chr1, k1), (chr2, k2) in zip(runs1, runs2):
+        if chr1 != chr2:
+            break
+        common.append((chr1, min(k1, k2)))
+        if k1 != k2:
+            break
+    return common
+
+
+def sb_range(lo: Union[Tuple[int, int], str], hi: Union[Tuple[int, int], str], max_level: Optional[int] = None,
+             max_den: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    # lo, hi: Union[Tuple[int, int], Fraction[int, int], str]
+    """ generate in increasing order the fractions of the interval [lo, hi] of the Stern-Brocot tree's nodes
+        of level at most max_level and/or of denominator at most max_den: the search starts at the common
+        ancestor of lo and hi (the longest common prefix of their paths), the simplest fraction of the interval,
+        and descends only into the subtrees meeting the interval, so its cost is O(output + depth)
+
+    Args:
+        lo, hi: the bounds 0 < lo <= hi of the interval, fractions as in frac2pair
+        max_level: (int) if not None, the deepest level (the root 1/1 is at level 0)
+        max_den: (int) if not None, the largest denominator
+    Yields:
+        the pairs (numerator, denominator) of the fractions of [lo, hi], in increasing order
+    Example:
+        list(sb_range('1/3', '1/2', max_level=3)) -> [(1, 3), (2, 5), (1, 2)]
+    """
+    assert max_level is not None or max_den is not None, "the enumeration needs max_level or max_den"
+    max_level = float('inf') if max_level is None else max_level
+    max_den = float('inf') if max_den is None else max_den
+    p1, q1 = frac2pair(lo)
+    p2, q2 = frac2pair(hi)
+    assert 0 < p1*q2 <= p2*q1, "[{}, {}] is not an interval of positive numbers".format(lo, hi)
+    common = _common_runs(SBpath_rle((p1, q1)), SBpath_rle((p2, q2)))
+    a, b, c, d = rle2mat(common)
+    level = sum(k for _, k in common)
+    if level > max_level or a + b > max_den:
+        return
+    # in-order traversal with an explicit stack of nodes (c, a, d, b, level), num/den being in [lo, hi] or
+    # the interval ]c/a, d/b[ of the subtree meeting [lo, hi]: the left subtree is visited if lo < num/den
+    stack = []
+    node = (c, a, d, b, level)
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            c, a, d, b, level = node
+            num, den = c + d, a + b
+            left = p1*den < num*q1 and level < max_level and a + den <= max_den
+            node = (c, a, num, den, level + 1) if left else None
+        c, a, d, b, level = stack.pop()
+        num, den = c + d, a + b
+        if p1*den <= num*q1 and num*q2 <= p2*den:
+            yield num, den
+        right = num*q2 < p2*den and level < max_level and den + b <= max_den
+        node = (num, den, d, b, level + 1) if right else None
@@ -0,0 +1,215 @@
+""" Opt-in instrumentation of the public functions: calls, times and steps counted inside a with block
+
+Nothing is instrumented outside of a block `with profiled() as prof:`, so that the functions run unchanged,
+without any overhead, when the instrumentation is off. On entering the block, all the submodules of rationnels
+(but plotting) are imported, then each module-level reference to one of their public functions (in these
+submodules and in any loaded module, as after `from rationnels import SBpath`) is replaced by a wrapper
+counting its calls and their time, and the name Fraction of the submodules by a counting constructor.
+Everything is restored on exit, and a wrapper kept elsewhere meanwhile only calls its function.
+
+The steps of the hot paths are counted by the wrappers from the arguments and the results of the calls,
+not inside the loops: the matrix multiplies of matprod and powmat, the path_table lookups of path2coefs,
+the Euclid divisions of SBpath_rle and the subtraction steps they stand for (the path length), the characters
+of the path strings built by rle2path, and the Fraction constructions.
+The times are inclusive (SBpath includes SBpath_rle and rle2path) and measured in the current process only
+(not in the worker processes of the batch functions).
+"""
+import inspect
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from fractions import Fraction
+from functools import wraps
+from importlib import import_module
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import paths
+
+# function name -> steps(args, kwargs, result) -> the pairs (step, count) of a call
+STEPS: Dict[str, Callable[[tuple, dict, Any], List[Tuple[str, int]]]] = {
+    'matprod': lambda args, kwargs, result: [('matrix multiplies', max(len(args[0]) - 1, 0))],
+    'powmat': lambda args, kwargs, result: [('matrix multiplies',
+                                             bin(args[1]).count('1') + max(args[1].bit_length() - 1, 0))],
+    'path2coefs': lambda args, kwargs, result: [('path_table lookups', -(-len(args[0]) // paths.PATH_CHUNK))],
+    'rle2mat': lambda args, kwargs, result: [('run products', len(args[0]))],
+    'SBpath_rle': lambda args, kwargs, result: [('Euclid divisions', len(result)),
+                                                ('subtraction steps', sum(k for _, k in result))],
+    'rle2path': lambda args, kwargs, result: [('path characters built', len(result))],
+}
+
+
+class Profile:
+    """ the calls, times and steps counted in a profiled() block
+
+    Attributes:
+        calls: the dict function name -> number of calls
+        times: the dict function name -> total time of the calls in seconds (inclusive)
+        steps: the dict step name -> count
+        elapsed: (float) the duration of the block in seconds (so far, while it is running)
+    Example:
+        with profiled() as prof:
+            SBfrac(SBpath((3, 8)))
+        prof.calls['SBpath_rle'] -> 1, prof.steps['subtraction steps'] -> 4
+    """
+    __slots__ = ('calls', 'times', 'steps', '_start', '_stop')
+
+    def __init__(self) -> None:
+        self.calls = defaultdict(int)
+        self.times = defaultdict(float)
+        self.steps = defaultdict(int)
+        self._start = self._stop = None
+
+    @property
+    def elapsed(self) -> float:
+        if self._start is None:
+            return 0.0
+        return (time.perf_counter() if self._stop is None else self._stop) - self._start
+
+    def count(self, step: str, n: int = 1) -> None:
+        """ add n to the counter of step """
+        self.steps[step] += n
+
+    def as_dict(self) -> Dict[str, Any]:
+        """ the counters as a dict of plain dicts, ready for json.dump """
+        return {'elapsed': self.elapsed, 'calls': dict(self.calls), 'times': dict(self.times),
+                'steps': dict(self.steps)}
+
+    def summary(self, limit: Optional[int] = None) -> str:
+        """ the report of the functions by decreasing total time, then of the steps
+
+        Args:
+            limit: (int) the largest number of functions reported, all by default
+        Returns:
+            the report as a multi-line string
+        """
+        elapsed = self.elapsed
+        lines = ['{:<24} {:>10} {:>12} {:>12} {:>7}'.format('function', 'calls', 'total', 'per call', '%')]
+        for name in sorted(self.times, key=self.times.get, reverse=True)[:limit]:
+            t, n = self.times[name], self.calls[name]
+            lines.append('{:<24} {:>10} {:>10.3f} s {:>9.3f} µs {:>6.1f}%'.format(
+                name, n, t, 1e6*t/n, 100*t/elapsed if elapsed else 0.0))
+        if self.steps:
+            lines.append('')
+            lines.append('{:<24} {:>10}'.format('step', 'count'))
+            lines.extend('{:<24} {:>10}'.format(step, n) for step, n in sorted(self.steps.items()))
+        lines.append('block: {:.3f} s'.format(elapsed))
+        return '\n'.join(lines)
+
+    def __str__(self) -> str:
+        return self.summary()
+
+
+_active: Optional[Profile] = None
+
+
+def _wrap(name: str, f: Callable, prof: Profile) -> Callable:
+    """ f counting its calls, time and steps in prof (the time of a generator is the time of its next calls) """
+    steps = STEPS.get(name)
+    calls, times = prof.calls, prof.times
+    if inspect.isgeneratorfunction(f):
+        @wraps(f)
+        def generator(*args, **kwargs):
+            if _active is not prof:
+                yield from f(*args, **kwargs)
+                return
+            calls[name] += 1
+            items = f(*args, **kwargs)
+            while True:
+                t = time.perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    times[name] += time.perf_counter() - t
+                    return
+                times[name] += time.perf_counter() - t
+                yield item
+        return generator
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if _active is not prof:
+            return f(*args, **kwargs)
+        t = time.perf_counter()
+        result = f(*args, **kwargs)
+        times[name] += time.perf_counter() - t
+        calls[name] += 1
+        if steps is not None:
+            for step, n in steps(args, kwargs, result):
+                prof.steps[step] += n
+        return result
+    return wrapper
+
+
+def _counting_fraction(prof: Profile) -> Callable[..., Fraction]:
+    """ a constructor of Fraction counting the constructions in prof """
+    steps = prof.steps
+
+    def fraction(*args, **kwargs) -> Fraction:
+        if _active is prof:
+            steps['Fraction constructions'] += 1
+        return Fraction(*args, **kwargs)
+    return fraction
+
+
+def _instrument(prof: Profile) -> List[Tuple[dict, str, Any]]:
+    """ replace the references to the public functions by their wrappers, return what to restore """
+    from . import _submodules
+    package = __name__.rpartition('.')[0]
+    wrappers = {}
+    fraction = _counting_fraction(prof)
+    restore = []
+    for module_name, names in _submodules.items():
+        # imported now, so that no submodule binds the wrappers by importing itself inside the block
+        module = import_module('.' + module_name, package)
+        if module.__name__ == __name__:
+            continue
+        for name in names:
+            f = getattr(module, name)
+            if inspect.isfunction(f) and f.__module__ == module.__name__:
+                wrappers[id(f)] = (f, _wrap(name, f, prof))
+        if vars(module).get('Fraction') is Fraction:
+            restore.append((vars(module), 'Fraction', Fraction))
+            vars(module)['Fraction'] = fraction
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, '__dict__', None)
+        if namespace is None or module is sys.modules[__name__]:
+            continue
+        for key, value in list(namespace.items()):
+            f, wrapper = wrappers.get(id(value), (None, None))
+            if f is not None and value is f:
+                restore.append((namespace, key, f))
+                namespace[key] = wrapper
+    return restore
+
+
+@contextmanager
+def profiled(prof: Optional[Profile] = None) -> Iterator[Profile]:
+    """ count the calls, times and steps of the public functions inside the with block (see the module's doc):
+        a nested block shares the counters of the outermost one
+
+    Args:
+        prof: a Profile to add the counts to, a new one by default
+    Yields:
+        the Profile of the block, whose summary() is the report
+    Example:
+        with profiled() as prof:
+            CWpath((10**40 + 1, 3**80))
+        print(prof.summary())
+    """
+    global _active
+    if _active is not None:
+        yield _active
+        return
+    prof = Profile() if prof is None else prof
+    restore = _instrument(prof)
+    _active = prof
+    # a Profile given again goes on counting its elapsed time
+    prof._start, prof._stop = time.perf_counter() - prof.elapsed, None
+    try:
+        yield prof
+    finally:
+        prof._stop = time.perf_counter()
+        _active = None
+        for namespace, key, value in reversed(restore):
+            namespace[key] = value
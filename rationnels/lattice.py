@@ -0,0 +1,147 @@
+""" The Stern-Brocot tree in N²: coprime pairs, father, sons, ancestors and sibling of a node
+
+The neighbours of a node num/den are computed from its two nearest ancestors c/a < num/den < d/b, the
+nodes num/den is the mediant of (num == c + d, den == a + b), in O(log(den)) without any path.
+"""
+from fractions import Fraction
+from math import gcd
+from typing import Any, Optional, Union, Tuple
+
+from .paths import frac2pair
+
+
+def rel_prime(a: int, b: int) -> bool:
+    """ return True if a and b are relatively prime
+    
+    Args:
+        a: int
+        b: int
+    Returns:
+        True or False
+    """
+    if a == b == 1:
+        return False
+    return gcd(a,b) == 1
+
+
+def _sb_bounds(num: int, den: int) -> Tuple[int, int, int, int]:
+    """ return the bounds c/a < num/den < d/b of the Stern-Brocot node num/den, the nodes it is the mediant of:
+        num*a - den*c == 1 and d*den - b*num == 1 with 0 < a <= den, so a is the inverse of num modulo den,
+        found by the extended Euclidean algorithm in O(log(den)), and c + d == num, a + b == den
+
+    Args:
+        num: (int) the numerator of the node, num > 0
+        den: (int) the denominator of the node, den > 0, relatively prime to num
+    Returns:
+        the tuple (c, a, d, b), the left bound being 0/1 on the left border and the right bound 1/0 on the right border
+    """
+    a = pow(num, -1, den) or den
+    c = (num*a - 1) // den
+    return c, a, num - c, den - a
+
+
+def _sb_node(frac: Union[Tuple[int, int], str]) -> Tuple[int, int]:
+    """ return the reduced pair (numerator, denominator) of a fraction, a pair as (6, 4) being the node 3/2 """
+    num, den = frac2pair(frac)
+    assert num > 0 and den > 0, "{} is not a positive fraction".format(frac)
+    g = gcd(num, den)
+    return num // g, den // g
+
+
+def _sb_result(frac: Union[Tuple[int, int], str], pair: Optional[Tuple[int, int]]) -> Any:
+    """ return the pair, or its Fraction if frac is not a pair, None if pair is None """
+    if pair is None or type(frac) is tuple:
+        return pair
+    return Fraction(*pair)
+
+
+def SBancestors(frac: Union[Tuple[int, int], str]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    # -> Union[Tuple[int, int], Fraction[int, int]] type hint doesn't recognize Fraction
+    """ find the (left ancestor, right ancestor) nodes pair of a Stern-Brocot tree node: its nearest ancestors
+        on its left and on its right, the bounds of its subtree, without computing its path
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        a pair of pair's values if the frac parameter value was a pair, a pair of fraction values otherwise,
+        None for the left ancestor of the nodes 1/n, and for the right ancestor of the nodes n/1
+    Example:
+        SBancestors((3, 8)) -> ((1, 3), (2, 5))
+    """
+    num, den = _sb_node(frac)
+    c, a, d, b = _sb_bounds(num, den)
+    return _sb_result(frac, (c, a) if c > 0 else None), _sb_result(frac, (d, b) if b > 0 else None)
+
+
+def SBfather(frac: Union[Tuple[int, int], str]) -> Tuple[int, int]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    # -> Union[Tuple[int, int], Fraction[int, int]] type hint doesn't recognize Fraction
+    """ find the father node of a Stern-Brocot node from the pair or fraction value or string fraction value:
+        the father is the one of its two nearest ancestors which is the deepest, the one with the largest
+        numerator + denominator, so no path is computed
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the pair value of the father of frac if the frac parameter value was a pair
+        the fraction value of the father of frac if the frac parameter value was a fraction or a string fraction
+        (the root 1/1 is its own father)
+    Example:
+        SBfather((3, 8)) -> (2, 5)
+    """
+    num, den = _sb_node(frac)
+    if num == den:
+        return _sb_result(frac, (num, den))
+    c, a, d, b = _sb_bounds(num, den)
+    return _sb_result(frac, (c, a) if c + a > d + b else (d, b))
+
+
+def SBsons(frac: Union[Tuple[int, int], str]) -> Tuple[Tuple[int, int],Tuple[int, int]]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    # -> Union[Tuple[int, int], Fraction[int, int]] type hint doesn't recognize Fraction
+    """ find the (left son, right son) nodes pair of a Stern-Brocot tree node: the mediants of the node
+        with its left and right ancestors, so no path is computed
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        a pair of pair's values for the sons of frac if the frac parameter value was a pair
+        a pair of fraction values for the sons of frac if the frac parameter value was a fraction or a string
+    Example:
+        SBsons((2, 5)) -> ((3, 8), (3, 7))
+    """
+    num, den = _sb_node(frac)
+    c, a, d, b = _sb_bounds(num, den)
+    return _sb_result(frac, (num + c, den + a)), _sb_result(frac, (num + d, den + b))
+
+
+def SBsibling(frac: Union[Tuple[int, int], str]) -> Tuple[int, int]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    # -> Union[Tuple[int, int], Fraction[int, int]] type hint doesn't recognize Fraction
+    """ find the sibling of a Stern-Brocot tree node, the other son of its father: a left son c/a + num/den
+        of its father num/den has the sibling num/den + d/b, and conversely
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the pair value of the sibling of frac if the frac parameter value was a pair
+        the fraction value of the sibling of frac if the frac parameter value was a fraction or a string fraction
+        (the root 1/1 is its own sibling)
+    Example:
+        SBsibling((3, 8)) -> (3, 7)
+    """
+    num, den = _sb_node(frac)
+    if num == den:
+        return _sb_result(frac, (num, den))
+    c, a, d, b = _sb_bounds(num, den)
+    if c + a > d + b:
+        # frac is the right son of its father c/a, the mediant of the ancestors (c - d)/(a - b) and d/b:
+        # the sibling is the left son, the mediant of c/a and (c - d)/(a - b)
+        return _sb_result(frac, (2*c - d, 2*a - b))
+    # frac is the left son of its father d/b, and conversely
+    return _sb_result(frac, (2*d - c, 2*b - a))
@@ -0,0 +1,115 @@
+""" The first levels of the Stern-Brocot and Calkin-Wilf trees as numpy arrays """
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .sternseq import stern_dtype
+
+
+def stern_row(m: int, a: int = 0, b: int = 1, dtype: Optional[type] = None) -> np.array:
+    """ return the 2**m+1 terms array obtained from [a, b] by inserting m times the sum
+        of two adjacent terms between them. For a=0, b=1 it is the Stern sequence s(0),...,s(2**m)
+
+    Args:
+        m: (int) the number of insertion steps
+        a: (int) first initial value
+        b: (int) second initial value
+        dtype: the array dtype, by default stern_dtype(m, a, b)
+    Returns:
+        the np.array of the 2**m+1 terms
+    """
+    if dtype is None:
+        dtype = stern_dtype(m, a, b)
+    l = np.array([a, b], dtype=dtype)
+    for k in range(m):
+        row = np.empty(2*len(l)-1, dtype=dtype)
+        row[0::2] = l
+        np.add(l[:-1], l[1:], out=row[1::2])
+        l = row
+    return l
+
+
+def stern_arrays(m: int, a: int = 0, b: int = 1, dtype: Optional[type] = None) -> Tuple[List[np.array], np.array]:
+    """ array version of stern_levels: build the first m levels of the numerators of the Stern-Brocot binary tree
+        and the first 2**m-1 terms of the Stern sequence
+
+    Args:
+        m: (int) the desired number of levels for the Stern-Brocot binary tree
+        a: (int) first initial value
+        b: (int) second initial value
+        dtype: the arrays dtype, by default stern_dtype(m, a, b)
+    Returns: a tuple t = (levels, l)
+        t[0]: levels, a m terms list where levels[k] is a contiguous np.array of 2**k integers,
+              the numerators of kth level in the Stern-Brocot tree.
+        t[1]: np.array of the first 2**m-1 terms of the Stern sequence (a view of the last row)
+    """
+    l = stern_row(m, a, b, dtype)
+    levels = [np.ascontiguousarray(l[2**(m-1-k)::2**(m-k)]) for k in range(m)]
+    return levels, l[1:-1]
+
+
+def SBarrays(m: int, dtype: Optional[type] = None) -> List[Tuple[np.array, np.array]]:
+    """ return the first m levels of Stern-Brocot tree as pairs of arrays (numerators, denominators)
+
+    Args:
+        m: (int) the desired number of levels for the Stern-Brocot binary tree
+        dtype: the arrays dtype, by default stern_dtype(m)
+    Returns:
+        a m terms list where the kth term is the pair of np.array (numerators, denominators) of the kth level,
+        the denominators being the reversed numerators
+    """
+    nums, _ = stern_arrays(m, 0, 1, dtype)
+    return [(lvl, np.ascontiguousarray(lvl[::-1])) for lvl in nums]
+
+
+def CWarrays(m: int, dtype: Optional[type] = None) -> List[Tuple[np.array, np.array]]:
+    """ return the first m levels of Calkin-Wilf tree as pairs of arrays (numerators, denominators)
+
+    Args:
+        m: (int) the desired number of levels for the Calkin-Wilf binary tree
+        dtype: the arrays dtype, by default stern_dtype(m)
+    Returns:
+        a m terms list where the kth term is the pair of np.array (numerators, denominators) of the kth level:
+        the slices s[2**k:2**(k+1)] and s[2**k+1:2**(k+1)+1] of the Stern sequence s
+    """
+    s = stern_row(m, 0, 1, dtype)
+    return [(s[2**k:2**(k+1)], s[2**k+1:2**(k+1)+1]) for k in range(m)]
+
+
+def stern_levels(m: int, a: int = 0, b: int = 1) -> Tuple[List[List[int]], List[int]]:
+    """ This function build the first m levels of the numerators of the Stern-Brocot binary tree
+        and the list of the first 2**m-1 terms of the Stern sequence (as lists, see stern_arrays)
+
+    Args:
+        m: (int) the desired number of levels for the Stern-Brocot binary tree
+        a: (int) first initial value
+        b: (int) second initial value
+    Returns: a tuple t = (levels, l)
+        t[0]: levels, a m terms list where levels[k] is a list of 2**k integers,
+              a representation of the tree of the numerators of kth level in the Stern-Brocot tree.
+        t[1]: list of the first 2**m-1 terms of the Stern sequence
+    """
+    levels, l = stern_arrays(m, a, b)
+    return [lvl.tolist() for lvl in levels], l.tolist()
+
+
+def SBpairs(m: int) -> List[List[Tuple[int, int]]]:
+    """ return the first m levels of Stern-Brocot tree, the nodes being a pair (numerator,denominator)
+
+    Args:
+        m: (int) the desired number of levels for the Stern-Brocot binary tree
+    Returns:
+        the first m levels of Stern-Brocot tree, with the pairs (numerator, denominator) as nodes
+    """
+    return [list(zip(nums.tolist(), dens.tolist())) for nums, dens in SBarrays(m)]
+
+
+def CWpairs(m: int) -> List[List[Tuple[int, int]]]:
+    """ return the first m levels of Calkin-Wilf tree, the nodes being a pair (numerator,denominator)
+
+    Args:
+        m: (int) the desired number of levels for the Calkin-Wilf binary tree
+    Returns:
+        the first m levels of Calkin-Wilf tree, with the pairs (numerator, denominator) as nodes
+    """
+    return [list(zip(nums.tolist(), dens.tolist())) for nums, dens in CWarrays(m)]
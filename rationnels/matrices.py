@@ -0,0 +1,65 @@
+""" 2x2 matrices of the Stern-Brocot paths as numpy arrays """
+from typing import List, Union, Tuple
+
+import numpy as np
+
+from .paths import path2coefs, rle2mat
+
+L = np.array([[1,1],[0,1]])  # left move, left root's son
+R = np.array([[1,0],[1,1]])  # right move, right root's son
+I = np.eye(2,dtype=int)      #identity, root
+LR_mats = {'L': L, 'R': R}   # path's characters to matrices
+
+
+def powmat(M: np.array, n: int) -> np.array:
+    """ return the n-th power of a matrix M 
+    
+    Args: 
+        M: (np.array) a square matrix pxp
+        n: (int) exponent
+    Returns:
+        the n-th power of M
+    """    
+    assert n >= 0, "{} is not a positive or null integer".format(n)
+    P = np.eye(M.shape[0],dtype=int if M.dtype != object else object)
+    # repeated squaring: M**n is the product of the M**(2**i) for the bits i set in n
+    while n > 0:
+        if n & 1:
+            P = P @ M
+        n >>= 1
+        if n > 0:
+            M = M @ M
+    return P
+
+
+def matprod(mats: List[np.array], n: int = 2)-> np.array:
+    """ mats is a list of matrices pxp. By defaut n == 2
+    
+    Args:
+        mats: a list of square matrices pxp
+    Returns:
+        the matrix (np.array) product of all the matrices in the list in the same order
+    """
+    if len(mats) == 0:
+        return np.eye(n,dtype=int)
+    # balanced tree reduction: multiply the adjacent pairs of matrices until only one is left,
+    # without recursion and with matrices of similar sizes at each round
+    while len(mats) > 1:
+        prods = [mats[i] @ mats[i+1] for i in range(0, len(mats)-1, 2)]
+        if len(mats) % 2 == 1:
+            prods.append(mats[-1])
+        mats = prods
+    return mats[0]
+
+
+def path2mat(S: Union[str, List[Tuple[str, int]]], backend: str = 'int') -> np.array:
+    """return the exact matrix product corresponding to a path string in a Stern-Brocot binary tree
+
+    Args:
+        S: (str) a node's path string (or bits string) or its run-length encoded path
+        backend: (str) for run-length encoded paths, 'int' for Python integers or 'gmpy2' for gmpy2.mpz integers
+    Returns:
+        the corresponding product matrix (np.array of dtype object)
+    """
+    a, b, c, d = path2coefs(S) if isinstance(S, str) else rle2mat(S, backend)
+    return np.array([[a, b], [c, d]], dtype=object)
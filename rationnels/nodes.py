@@ -0,0 +1,197 @@
+""" Nodes of the Stern-Brocot and Calkin-Wilf trees as values caching their path and bounds
+
+A node is created from its fraction alone: its Path, its (level, idx), the bounds of its Stern-Brocot subtree
+and its twin (the node of the same path in the other tree) are computed on first access and kept. The nodes
+returned by the traversal methods (father, sons, sibling) are built from the state already known by the node,
+so a walk in the tree computes each path and each pair of bounds at most once, in O(1) per move.
+"""
+from fractions import Fraction
+from typing import Any, Optional, Tuple, Union
+
+from .lattice import _sb_bounds, _sb_node
+from .paths import Path
+
+
+class _Node:
+    """ the part common to SBNode and CWNode: the fraction num/den and its lazily computed attributes
+
+    Attributes:
+        num: (int) the numerator of the node's fraction
+        den: (int) the denominator of the node's fraction
+    """
+    __slots__ = ('num', 'den', '_path', '_bounds', '_twin')
+    tree = ''
+
+    def __init__(self, frac: Union[Tuple[int, int], str], path: Optional[Path] = None,
+                 bounds: Optional[Tuple[int, int, int, int]] = None) -> None:
+        # frac: Union[Tuple[int, int], Fraction[int, int], str]
+        # reduced, a pair as (6, 4) being the node 3/2
+        self.num, self.den = _sb_node(frac)
+        self._path = path
+        self._bounds = bounds
+        self._twin = None
+
+    @classmethod
+    def from_path(cls, path: Union[Path, str]) -> '_Node':
+        """ the node at the end of a Path (or of a path string) from the root """
+        path = path if isinstance(path, Path) else Path.from_str(path)
+        frac = path.SBfrac() if cls.tree == 'sb' else path.CWfrac()
+        return cls((frac.numerator, frac.denominator), path)
+
+    def __repr__(self) -> str:
+        return '{}({}/{})'.format(type(self).__name__, self.num, self.den)
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and (self.num, self.den) == (other.num, other.den)
+
+    def __hash__(self) -> int:
+        return hash((self.tree, self.num, self.den))
+
+    @property
+    def frac(self) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+        """ the node's fraction """
+        return Fraction(self.num, self.den)
+
+    @property
+    def pair(self) -> Tuple[int, int]:
+        """ the pair (numerator, denominator) of the node's fraction """
+        return self.num, self.den
+
+    @property
+    def path(self) -> Path:
+        """ the Path from the root to the node, computed by Euclid's algorithm on first access """
+        if self._path is None:
+            self._path = Path.from_frac((self.num, self.den), self.tree)
+        return self._path
+
+    @property
+    def level(self) -> int:
+        """ the node's level, its path's length """
+        return self.path.level
+
+    @property
+    def idx(self) -> int:
+        """ the node's index in its level, as level_idx """
+        return self.path.idx
+
+    def level_idx(self) -> Tuple[int, int]:
+        """ the pair (level, idx), as level_idx(str(self.path)) """
+        return self.path.level_idx()
+
+    @property
+    def bounds(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """ the pair ((c, a), (d, b)) of the nearest ancestors c/a < num/den < d/b of the fraction in the
+            Stern-Brocot tree, 0/1 on the left border and 1/0 on the right border (see lattice.SBancestors)
+        """
+        if self._bounds is None:
+            self._bounds = _sb_bounds(self.num, self.den)
+        c, a, d, b = self._bounds
+        return (c, a), (d, b)
+
+    def is_root(self) -> bool:
+        """ True for the root 1/1 """
+        return self.num == self.den
+
+    def twin(self) -> '_Node':
+        """ the node with the same path in the other tree (Stern-Brocot <-> Calkin-Wilf), which shares the path """
+        if self._twin is None:
+            other = CWNode if self.tree == 'sb' else SBNode
+            frac = self.path.CWfrac() if self.tree == 'sb' else self.path.SBfrac()
+            self._twin = other((frac.numerator, frac.denominator), self.path)
+            self._twin._twin = self
+        return self._twin
+
+
+class SBNode(_Node):
+    """ a node of the Stern-Brocot tree: its sons, father and sibling are obtained from the bounds
+        c/a < num/den < d/b of the node, the left son being (c + num)/(a + den), the right son (num + d)/(den + b)
+
+    Attributes:
+        num: (int) the numerator of the node's fraction
+        den: (int) the denominator of the node's fraction
+    Example:
+        SBNode((3, 8)).father() -> SBNode(2/5), SBNode((3, 8)).path -> Path('LLRL')
+    """
+    __slots__ = ()
+    tree = 'sb'
+
+    def _child(self, pair: Tuple[int, int], chr: str, bounds: Tuple[int, int, int, int]) -> 'SBNode':
+        return SBNode(pair, None if self._path is None else self._path.append(chr), bounds)
+
+    def left(self) -> 'SBNode':
+        """ the left son, between the left bound and the node """
+        (c, a), _ = self.bounds
+        return self._child((c + self.num, a + self.den), 'L', (c, a, self.num, self.den))
+
+    def right(self) -> 'SBNode':
+        """ the right son, between the node and the right bound """
+        _, (d, b) = self.bounds
+        return self._child((self.num + d, self.den + b), 'R', (self.num, self.den, d, b))
+
+    def sons(self) -> Tuple['SBNode', 'SBNode']:
+        """ the pair (left son, right son) """
+        return self.left(), self.right()
+
+    def father(self) -> 'SBNode':
+        """ the father, the deepest of the two bounds (the root is its own father) """
+        if self.is_root():
+            return self
+        (c, a), (d, b) = self.bounds
+        path = None if self._path is None else self._path.father()
+        if c + a > d + b:
+            # the father c/a is the mediant of (c - d)/(a - b) and d/b
+            return SBNode((c, a), path, (c - d, a - b, d, b))
+        return SBNode((d, b), path, (c, a, d - c, b - a))
+
+    def sibling(self) -> 'SBNode':
+        """ the other son of the father (the root is its own sibling) """
+        if self.is_root():
+            return self
+        (c, a), (d, b) = self.bounds
+        father = self.father()
+        return father.left() if c + a > d + b else father.right()
+
+
+class CWNode(_Node):
+    """ a node of the Calkin-Wilf tree: the sons of num/den are num/(num + den) and (num + den)/den,
+        so its sons and father are obtained in O(1)
+
+    Attributes:
+        num: (int) the numerator of the node's fraction
+        den: (int) the denominator of the node's fraction
+    Example:
+        CWNode((3, 8)).father() -> CWNode(3/5), CWNode((3, 8)).twin() -> SBNode(4/7)
+    """
+    __slots__ = ()
+    tree = 'cw'
+
+    def _child(self, pair: Tuple[int, int], chr: str) -> 'CWNode':
+        return CWNode(pair, None if self._path is None else self._path.append(chr))
+
+    def left(self) -> 'CWNode':
+        """ the left son num/(num + den) """
+        return self._child((self.num, self.num + self.den), 'L')
+
+    def right(self) -> 'CWNode':
+        """ the right son (num + den)/den """
+        return self._child((self.num + self.den, self.den), 'R')
+
+    def sons(self) -> Tuple['CWNode', 'CWNode']:
+        """ the pair (left son, right son) """
+        return self.left(), self.right()
+
+    def father(self) -> 'CWNode':
+        """ the father: num/(den - num) for a left son, (num - den)/den for a right son (the root is its own father) """
+        if self.is_root():
+            return self
+        path = None if self._path is None else self._path.father()
+        if self.num < self.den:
+            return CWNode((self.num, self.den - self.num), path)
+        return CWNode((self.num - self.den, self.den), path)
+
+    def sibling(self) -> 'CWNode':
+        """ the other son of the father (the root is its own sibling) """
+        if self.is_root():
+            return self
+        father = self.father()
+        return father.right() if self.num < self.den else father.left()
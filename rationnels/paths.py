@@ -0,0 +1,446 @@
+""" Paths of the Stern-Brocot and Calkin-Wilf trees: from a fraction to its path and back,
+    with plain Python integers (exact, without numpy)
+"""
+import re
+from fractions import Fraction
+from itertools import groupby
+from typing import Any, List, Union, Optional, Tuple
+
+from .bintree import paths_level, str_translate
+
+
+# the longest digit strings converted by int() at once: Python >= 3.11 limits the conversions to 4300 digits
+INT_DIGITS = 4000
+_decimal = re.compile(r'\s*(?:(\d+)/(\d+)|(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d+))?)\s*$')
+
+
+def _digits2int(digits: str, base: int = 10) -> int:
+    """ int(digits, base) for a string of digits of any length, converted by pieces of at most INT_DIGITS digits """
+    if len(digits) <= INT_DIGITS:
+        return int(digits, base)
+    low = len(digits) // 2
+    return _digits2int(digits[:-low], base)*base**low + _digits2int(digits[-low:], base)
+
+
+def _str2pair(frac: str) -> Tuple[int, int]:
+    """ the reduced pair of a string fraction '3/8' or decimal '3.14159' (or '314159e-5') of any length """
+    if len(frac) <= INT_DIGITS:
+        frac = Fraction(frac)
+        return frac.numerator, frac.denominator
+    match = _decimal.match(frac)
+    assert match is not None and (match.group(1) or match.group(3) or match.group(4)), \
+        "{}... is not a positive fraction or decimal number".format(frac[:20])
+    num, den, intpart, decimals, exp = match.groups()
+    if num is not None:
+        frac = Fraction(_digits2int(num), _digits2int(den))
+    else:
+        decimals = decimals or ''
+        exp = int(exp or 0) - len(decimals)
+        num = _digits2int((intpart or '') + decimals)
+        frac = Fraction(num*10**exp) if exp >= 0 else Fraction(num, 10**-exp)
+    return frac.numerator, frac.denominator
+
+
+def frac2pair(frac: Union[Tuple[int, int], str]) -> Tuple[int, int]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    """ return the pair (numerator, denominator) of a fraction
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or '3.14159' (of any length) or a fraction as Fraction(3,8)
+    Returns:
+        the pair (numerator, denominator), a tuple is returned unchanged
+    Example:
+        frac2pair('3/8') -> (3, 8)
+    """
+    if type(frac) is tuple:
+        return frac
+    if isinstance(frac, str):
+        return _str2pair(frac)
+    frac = Fraction(frac)
+    return frac.numerator, frac.denominator
+
+
+def SBpath_rle(frac: Union[Tuple[int, int], str]) -> List[Tuple[str, int]]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    """ find the run-length encoded Stern-Brocot path of a fraction, using Euclid's
+        algorithm: each run's length is a quotient of the Euclidean division
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the list of runs [(chr, k), ...] where chr is 'L' or 'R' and k > 0 its number of repetitions
+    Example:
+        SBpath_rle(3/8) -> [('L', 2), ('R', 1), ('L', 1)]
+    """
+    num, den = frac2pair(frac)
+    runs = []
+    while num != den:
+        if num > den:
+            q, num = divmod(num, den)
+            if num == 0:
+                q, num = q-1, den
+            runs.append(('R', q))
+        else:
+            q, den = divmod(den, num)
+            if den == 0:
+                q, den = q-1, num
+            runs.append(('L', q))
+    return runs
+
+
+def CWpath_rle(frac: Union[Tuple[int, int], str]) -> List[Tuple[str, int]]:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    """ find the run-length encoded Calkin-Wilf path of a fraction:
+        the reverse of the runs of the Stern-Brocot path
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the list of runs [(chr, k), ...] where chr is 'L' or 'R' and k > 0 its number of repetitions
+    Example:
+        CWpath_rle(3/8) -> [('L', 1), ('R', 1), ('L', 2)]
+    """
+    return SBpath_rle(frac)[::-1]
+
+
+def rle2path(runs: List[Tuple[str, int]]) -> str:
+    """ expand a run-length encoded path to the path string
+
+    Args:
+        runs: a list of runs [(chr, k), ...]
+    Returns:
+        the path string
+    Example:
+        rle2path([('L', 2), ('R', 1), ('L', 1)]) -> 'LLRL'
+    """
+    return ''.join([chr*k for chr, k in runs])
+
+
+def path2rle(S: str) -> List[Tuple[str, int]]:
+    """ run-length encode a path string
+
+    Args:
+        S: (str) a node's path string
+    Returns:
+        the list of runs [(chr, k), ...]
+    Example:
+        path2rle('LLRL') -> [('L', 2), ('R', 1), ('L', 1)]
+    """
+    return [(chr, len(list(grp))) for chr, grp in groupby(S)]
+
+
+def SBpath(frac: Union[Tuple[int, int], str]) -> str:
+    # -> Union[Tuple[int, int], str, Fraction[int, int]] type hint doesn't recognize Fraction
+    """ find the Stern-Brocot path string S corresponding to a fraction
+        by expanding its run-length encoded path SBpath_rle(frac)
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the path string S:
+    Example: SBpath(3/8) -> 'LLRL'
+    """
+    return rle2path(SBpath_rle(frac))
+
+
+def CWpath(frac: Union[Tuple[int, int], str]) -> str:
+    # -> Union[Tuple[int, int], str, Fraction[int, int]] type hint doesn't recognize Fraction
+    """ find the Calkin-Wilf path string S corresponding to a fraction
+        by expanding its run-length encoded path CWpath_rle(frac)
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the path string S:
+    Example: CWpath(3/8) -> 'LRLL'
+    """
+    return rle2path(CWpath_rle(frac))
+
+
+def rle2mat(runs: List[Tuple[str, int]], backend: str = 'int') -> Tuple[int, int, int, int]:
+    """ return the exact coefficients (a, b, c, d) of the matrix product [[a, b], [c, d]]
+        corresponding to a run-length encoded path, each run (chr, k) being multiplied
+        at once using the closed forms of L**k and R**k
+
+    Args:
+        runs: a list of runs [(chr, k), ...] where chr is 'L' or 'R' and k > 0
+        backend: (str) 'int' for Python integers or 'gmpy2' for gmpy2.mpz integers
+    Returns:
+        the tuple (a, b, c, d) of the product matrix coefficients
+    Example:
+        rle2mat([('L', 1), ('R', 1), ('L', 2)]) -> (2, 5, 1, 3)
+    """
+    assert backend in ('int', 'gmpy2'), "{} is not a known backend".format(backend)
+    if backend == 'gmpy2':
+        from gmpy2 import mpz
+        a, b, c, d = mpz(1), mpz(0), mpz(0), mpz(1)
+    else:
+        a, b, c, d = 1, 0, 0, 1
+    for chr, k in runs:
+        if chr == 'L':
+            b += k*a
+            d += k*c
+        else:
+            a += k*b
+            c += k*d
+    return a, b, c, d
+
+
+PATH_CHUNK = 8
+
+
+def build_path_table(width: int = PATH_CHUNK) -> dict:
+    """ return the table of the matrix coefficients (a, b, c, d) of all the paths
+        of length 1 up to width, as 'L'/'R' path strings and as '0'/'1' bit strings
+
+    Args:
+        width: (int) the maximal length of the paths in the table
+    Returns:
+        a dict mapping each path (or bits) string to the tuple (a, b, c, d)
+    Example:
+        build_path_table()['LRLL'] == build_path_table()['0100'] == (2, 5, 1, 3)
+    """
+    table = {'': (1, 0, 0, 1)}
+    for k in range(1, width+1):
+        for S in paths_level(k):
+            a, b, c, d = table[S[:-1]]
+            if S[-1] == 'L':
+                table[S] = (a, a + b, c, c + d)
+            else:
+                table[S] = (a + b, b, c + d, d)
+    for S in list(table):
+        if S != '':
+            table[str_translate(S,'LR','01')] = table[S]
+    return table
+
+
+path_table = build_path_table()
+
+
+def path2coefs(S: str) -> Tuple[int, int, int, int]:
+    """ return the exact coefficients (a, b, c, d) of the matrix product [[a, b], [c, d]]
+        corresponding to a path string, read by chunks of PATH_CHUNK characters in path_table
+
+    Args:
+        S: (str) a node's path string of 'L' and 'R' or its bits string of '0' and '1'
+    Returns:
+        the tuple (a, b, c, d) of the product matrix coefficients
+    Example:
+        path2coefs('LRLL') -> (2, 5, 1, 3)
+    """
+    a, b, c, d = 1, 0, 0, 1
+    for i in range(0, len(S), PATH_CHUNK):
+        e, f, g, h = path_table[S[i:i+PATH_CHUNK]]
+        a, b, c, d = a*e + b*g, a*f + b*h, c*e + d*g, c*f + d*h
+    return a, b, c, d
+
+
+def SBfrac(S: Union[str, List[Tuple[str, int]]]) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the Stern-Brocot node value as the fraction corresponding to the string path S
+
+    Args:
+        S: (str) a Stern-Brocot node path string (or bits string) or its run-length encoded path
+    Returns:
+        the Fraction value of the corresponding node
+    Example:
+        SBfrac('LRLL') -> Fraction(4, 7)
+    """
+    a, b, c, d = path2coefs(S) if isinstance(S, str) else rle2mat(S)
+    return Fraction(c + d, a + b)
+
+
+def CWfrac(S: Union[str, List[Tuple[str, int]]]) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the Calkin-Wilf node value as the fraction corresponding to the string path S
+
+    Args:
+        S: (str) a Calkin-Wilf node path string (or bits string) or its run-length encoded path
+    Returns:
+        the Fraction value of the corresponding node
+    Example:
+        CWfrac('LRLL') -> Fraction(3, 8)
+    """
+    a, b, c, d = path2coefs(S) if isinstance(S, str) else rle2mat(S)
+    return Fraction(a + c, b + d)
+
+
+def cw_nth(n: int) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the n-th fraction of the Calkin-Wilf tree in breadth-first order
+
+    Args:
+        n: (int) n >= 1, the node number: the root is 1 and the node (level, idx) is 2**level + idx
+    Returns:
+        the Fraction value of the node
+    Example:
+        cw_nth(11) -> Fraction(5, 2) (bin(11) == '0b1011', CWfrac('011') == CWfrac('LRR'))
+    """
+    assert n >= 1, "{} is not a positive integer".format(n)
+    return CWfrac(bin(n)[3:])
+
+
+def sb_nth(n: int) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+    """ return the n-th fraction of the Stern-Brocot tree in breadth-first order
+
+    Args:
+        n: (int) n >= 1, the node number: the root is 1 and the node (level, idx) is 2**level + idx
+    Returns:
+        the Fraction value of the node
+    Example:
+        sb_nth(11) -> Fraction(3, 4) (bin(11) == '0b1011', SBfrac('011') == SBfrac('LRR'))
+    """
+    assert n >= 1, "{} is not a positive integer".format(n)
+    return SBfrac(bin(n)[3:])
+
+
+def rle2index(runs: List[Tuple[str, int]]) -> int:
+    """ return the breadth-first number of the node defined by a run-length encoded path
+
+    Args:
+        runs: a list of runs [(chr, k), ...] where chr is 'L' or 'R'
+    Returns:
+        the node number n == 2**level + idx
+    Example:
+        rle2index([('L', 1), ('R', 2)]) -> 11 (0b1011)
+    """
+    n = 1
+    for chr, k in runs:
+        n <<= k
+        if chr == 'R':
+            n |= (1 << k) - 1
+    return n
+
+
+def cw_index(frac: Union[Tuple[int, int], str]) -> int:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    """ return the breadth-first number of a fraction in the Calkin-Wilf tree, the inverse of cw_nth
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the node number n such that cw_nth(n) == frac
+    Example:
+        cw_index((5, 2)) -> 11
+    """
+    return rle2index(CWpath_rle(frac))
+
+
+def sb_index(frac: Union[Tuple[int, int], str]) -> int:
+    # frac: Union[Tuple[int, int], Fraction[int, int], str]
+    """ return the breadth-first number of a fraction in the Stern-Brocot tree, the inverse of sb_nth
+
+    Args:
+        frac: a fraction as a tuple (numerator: int, denominator: int) as (3,8)
+        or a string as '3/8' or a fraction as Fraction(3,8)
+    Returns:
+        the node number n such that sb_nth(n) == frac
+    Example:
+        sb_index((3, 4)) -> 11
+    """
+    return rle2index(SBpath_rle(frac))
+
+
+LR2bits = str.maketrans('LR', '01')
+bits2LR = str.maketrans('01', 'LR')
+
+
+class Path:
+    """ a path in a binary tree, as the pair of integers (level, idx) of level_idx,
+        the bits of idx being the moves 'L' -> 0 and 'R' -> 1 from the root, the first move as the most significant bit
+
+    Attributes:
+        level: (int) the path's length
+        idx: (int) the path's bits
+        rev: (int) the reversed path's bits
+    Example:
+        Path.from_str('RRL') -> Path('RRL'), with level == 3, idx == 6, rev == 3
+    """
+    __slots__ = ('level', 'idx', 'rev')
+
+    def __init__(self, level: int = 0, idx: int = 0, rev: Optional[int] = None) -> None:
+        self.level = level
+        self.idx = idx
+        self.rev = int(bin(idx)[2:].zfill(level)[::-1], 2) if rev is None else rev
+
+    @classmethod
+    def from_str(cls, S: str) -> 'Path':
+        """ the Path of a path string of 'L' and 'R' (or a bits string of '0' and '1') """
+        bits = S.translate(LR2bits)
+        return cls(len(S), int(bits, 2) if S else 0, int(bits[::-1], 2) if S else 0)
+
+    @classmethod
+    def from_rle(cls, runs: List[Tuple[str, int]]) -> 'Path':
+        """ the Path of a run-length encoded path """
+        level, idx, rev = 0, 0, 0
+        for chr, k in runs:
+            ones = (1 << k) - 1 if chr == 'R' else 0
+            idx = (idx << k) | ones
+            rev |= ones << level
+            level += k
+        return cls(level, idx, rev)
+
+    @classmethod
+    def from_frac(cls, frac: Union[Tuple[int, int], str], tree: str = 'sb') -> 'Path':
+        # frac: Union[Tuple[int, int], Fraction[int, int], str]
+        """ the Path of a fraction in the Stern-Brocot (tree='sb') or Calkin-Wilf (tree='cw') tree """
+        path = cls.from_rle(SBpath_rle(frac))
+        return path if tree == 'sb' else path.reverse()
+
+    def __len__(self) -> int:
+        return self.level
+
+    def __str__(self) -> str:
+        return self.bits().translate(bits2LR)
+
+    def __repr__(self) -> str:
+        return "Path('{}')".format(self)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Path) and (self.level, self.idx) == (other.level, other.idx)
+
+    def __hash__(self) -> int:
+        return hash((self.level, self.idx))
+
+    def bits(self) -> str:
+        """ the path as a bits string of '0' and '1' """
+        return bin(self.idx)[2:].zfill(self.level) if self.level > 0 else ''
+
+    def level_idx(self) -> Tuple[int, int]:
+        """ the pair (level, idx), as level_idx(str(self)) """
+        return self.level, self.idx
+
+    def index(self) -> int:
+        """ the breadth-first number 2**level + idx of the node (see cw_nth, sb_nth) """
+        return (1 << self.level) | self.idx
+
+    def append(self, chr: str) -> 'Path':
+        """ the path followed by one more move chr: 'L' or 'R' (or '0' or '1'), ValueError for any other chr """
+        bit = {'L': 0, 'R': 1, '0': 0, '1': 1}.get(chr)
+        if bit is None:
+            raise ValueError("{!r} is not a move 'L', 'R', '0' or '1'".format(chr))
+        return Path(self.level + 1, (self.idx << 1) | bit, self.rev | (bit << self.level))
+
+    def prefix(self, k: int) -> 'Path':
+        """ the path of the first k moves """
+        assert 0 <= k <= self.level, "{} is not a prefix length of a path of length {}".format(k, self.level)
+        return Path(k, self.idx >> (self.level - k), self.rev & ((1 << k) - 1))
+
+    def father(self) -> 'Path':
+        """ the path without its last move, the path of the father's node """
+        return self.prefix(self.level - 1)
+
+    def reverse(self) -> 'Path':
+        """ the reversed path: the path of the same fraction in the other tree (Stern-Brocot <-> Calkin-Wilf) """
+        return Path(self.level, self.rev, self.idx)
+
+    def SBfrac(self) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+        """ the Stern-Brocot node value of the path, as SBfrac(str(self)) """
+        return SBfrac(self.bits())
+
+    def CWfrac(self) -> Tuple[int, int]:  # -> Fraction[int, int] type hint doesn't recognize Fraction
+        """ the Calkin-Wilf node value of the path, as CWfrac(str(self)) """
+        return CWfrac(self.bits())
@@ -0,0 +1,185 @@
+""" Plotting helpers for the trees in N² (matplotlib axes)
+
+    This submodule is only imported on demand (rationnels.plotting), and matplotlib itself
+    is not imported here: the functions draw on the matplotlib axes they are given.
+"""
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+def gridticks(ax,xmajticks=(0,11,5),xminticks=None,ymajticks=None,yminticks=None,alphamaj=0.5,alphamin=0.2):
+    """ plot a grid: see matplotlib.axes.Axes.set_xticks,matplotlib.axes.Axes.grid
+    """
+    if ymajticks == None:
+        ymajticks = xmajticks
+    if yminticks == None:
+        yminticks = xminticks
+    xmajor_ticks = np.arange(*xmajticks)
+    ymajor_ticks = np.arange(*ymajticks)
+    ax.set_xticks(xmajor_ticks)
+    ax.set_yticks(ymajor_ticks)
+    if xminticks != None:
+        xminor_ticks = np.arange(*xminticks)
+        ax.set_xticks(xminor_ticks, minor=True)
+        ax.grid(which='minor', alpha=alphamin)
+    if yminticks != None:
+        yminor_ticks = np.arange(*yminticks)
+        ax.set_yticks(yminor_ticks, minor=True)
+        ax.grid(which='minor', alpha=alphamin)
+    ax.grid(which='major', alpha=alphamaj)
+
+
+def plot_points(ax, pts: np.array, lw: float = 1.2, colors:List[str] = ['red'], marker: str = 'o') -> None:
+    """ plot a list of points: see matplotlib plot, fig.add_subplot
+    Args:
+        ax: axes as result of fig.add_subplot(X,X,X)
+        pts: a np.array of points (x:float,y:float)
+        lw: (float) line width
+        colors: a list of matplot_lib colors, here string of named colors, 
+                coloring the points and cycling according to the length of colors
+        marker: (str) a one char string, see matplotlib.markers
+    Returns: None
+    """
+    ptsT = pts.T
+    x_points, y_points = ptsT
+    size = len(x_points)
+    for i in range(size):
+        ax.plot(x_points[i], y_points[i], color=colors[i%len(colors)], marker=marker)
+
+
+def plot_pt2pts(ax, pt: Tuple[float,float], pts: np.array, 
+                lw: float = 1.2, colors=['green'], ls: str = '-') -> None:
+    """ Plot lines from pt to each point in pts
+    
+    Args: 
+        ax: axes as result of fig.add_subplot(X,X,X)
+        pt: (float,float) a point
+        pts: a np.array of points (x:float,y:float)
+        lw: (float) line width
+        colors: a list of matplot_lib colors, here string of named colors, 
+                coloring the points and cycling according to the length of colors
+        ls: (str) linestyle  one or two chars string,
+            https://matplotlib.org/1.5.3/api/pyplot_api.html#matplotlib.pyplot.plot
+    """
+    ptsT = pts.T
+    x_points, y_points = ptsT
+    size = len(x_points)
+    for i in range(size):
+        ax.plot([pt[0], x_points[i]], 
+                 [pt[1], y_points[i]], 
+                 color=colors[i%len(colors)], linestyle=ls, linewidth=lw)
+
+
+def xylinefrom(*pts: np.array) -> Tuple[Tuple[float,float],Tuple[float,float]]:
+    """ compute 2 pairs (x0,x1),(y0,y1) to be plotted by matlib.plot, or, if the points are arrays
+        of n points, the 2 arrays (2,n) of n segments clipped at once
+
+    Args:
+        pts : a np.array of 2 or 3 points in the plane, or of 2 or 3 np.array (n,2) of points
+        the 2 pts pts[0] and pts[1] verifying:
+           0 < pts[0][0] < pts[1][0]
+           0 < pts[0][1] < pts[1][1]
+        if present, the third point defines a clipping
+        window (0,xmax=pts[2][0]),(0,ymax=pts[2][1])
+        to the segment defined by pts[0]to pts[1]:
+        pts[0] is in the window and pts[1] is moved back along the segment into it.
+    Returns:
+        two pairs (x0,x1),(y0,y1) defining the segment
+        ready to be plotted by matlib.plot, or two np.array (2,n) whose columns are
+        the n segments (ax.plot(xs, ys) draws them, see also plot_segments)
+    Example:
+        xylinefrom((1,1),(2,5),(10,3)) -> ([1.0, 1.5], [1.0, 3.0])
+    """
+    p0 = np.asarray(pts[0], dtype=float)
+    p1 = np.asarray(pts[1], dtype=float)
+    if len(pts) == 3:
+        window = np.asarray(pts[2], dtype=float)
+        d = p1 - p0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # the fraction of the segment inside the window, along x then along y
+            t = np.where(p1 > window, (window - p0)/d, 1.0)
+        t = np.minimum(t[..., 0], t[..., 1])
+        p1 = p0 + t[..., None]*d
+    xs = np.stack((p0[..., 0], p1[..., 0]))
+    ys = np.stack((p0[..., 1], p1[..., 1]))
+    if p0.ndim == 1:
+        return xs.tolist(), ys.tolist()
+    return xs, ys
+
+
+def tree_segments(levels: List[Tuple[np.array, np.array]]) -> Tuple[np.array, np.array]:
+    """ compute all the father-son edges of a tree in N² given by levels of arrays, the sons of the node i
+        of a level being the nodes 2i and 2i+1 of the next level (layout of SBarrays and CWarrays)
+
+    Args:
+        levels: a list of pairs of np.array (numerators, denominators), as SBarrays(m) or CWarrays(m)
+    Returns:
+        a pair (segments, level) where segments is a np.array (2**m - 2, 2, 2) of the edges
+        ((father_x, father_y), (son_x, son_y)) and level the np.array of the levels of the fathers
+    Example:
+        tree_segments(SBarrays(2))[0] -> array([[[1., 1.], [1., 2.]], [[1., 1.], [2., 1.]]])
+    """
+    segments, level = [], []
+    for k in range(len(levels) - 1):
+        fathers = np.repeat(np.column_stack(levels[k]).astype(float), 2, axis=0)
+        sons = np.column_stack(levels[k+1]).astype(float)
+        segments.append(np.stack((fathers, sons), axis=1))
+        level.append(np.full(len(sons), k))
+    if not segments:
+        return np.empty((0, 2, 2)), np.empty(0, dtype=int)
+    return np.concatenate(segments), np.concatenate(level)
+
+
+def plot_segments(ax, p0: np.array, p1: np.array, lw: float = 1.2, colors: List[str] = ['green'],
+                  ls: str = '-') -> Any:
+    """ plot the n segments p0[i] to p1[i] as one matplotlib LineCollection
+
+    Args:
+        ax: axes as result of fig.add_subplot(X,X,X)
+        p0: a np.array (n,2) of the first points
+        p1: a np.array (n,2) of the second points
+        lw: (float) line width
+        colors: a list of matplot_lib colors, coloring the segments and cycling according to the length of colors
+        ls: (str) linestyle
+    Returns:
+        the matplotlib.collections.LineCollection added to ax
+    """
+    segments = np.stack((np.asarray(p0, dtype=float), np.asarray(p1, dtype=float)), axis=1)
+    return _add_lines(ax, segments, [colors[i % len(colors)] for i in range(len(segments))], lw, ls)
+
+
+def _add_lines(ax, segments: np.array, colors: List[str], lw: float, ls: str) -> Any:
+    from matplotlib.collections import LineCollection
+    lines = LineCollection(segments, colors=colors, linewidths=lw, linestyles=ls)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    return lines
+
+
+def plot_tree(ax, levels: List[Tuple[np.array, np.array]], lw: float = 1.2,
+              colors: List[str] = ['blue', 'brown', 'green', 'navy', 'goldenrod', 'turquoise'],
+              point_colors: List[str] = ['red'], marker: str = 'o', s: Optional[float] = None
+              ) -> Tuple[Any, List[Any]]:
+    """ plot a tree in N² given by levels of arrays: all the father-son edges as one LineCollection,
+        the edges from the level k colored by colors[k%len(colors)], and the nodes as one scatter per level,
+        so that the number of matplotlib artists doesn't depend on the number of nodes
+
+    Args:
+        ax: axes as result of fig.add_subplot(X,X,X)
+        levels: a list of pairs of np.array (numerators, denominators), as SBarrays(m) or CWarrays(m)
+        lw: (float) line width
+        colors: a list of matplot_lib colors of the edges, cycling over the levels
+        point_colors: a list of matplot_lib colors of the nodes, cycling over the levels
+        marker: (str) a one char string, see matplotlib.markers
+        s: (float) the marker size in points**2, see matplotlib scatter
+    Returns:
+        the pair (LineCollection, list of the PathCollection of each level)
+    Example:
+        plot_tree(ax, SBarrays(14))
+    """
+    segments, level = tree_segments(levels)
+    lines = _add_lines(ax, segments, [colors[k % len(colors)] for k in level], lw, '-')
+    points = [ax.scatter(nums, dens, s=s, color=point_colors[k % len(point_colors)], marker=marker, zorder=2)
+              for k, (nums, dens) in enumerate(levels)]
+    return lines, points
@@ -0,0 +1,188 @@
+""" Images of the Stern-Brocot tree in N²: the coprime pairs and the father-son edges of a box as numpy arrays
+
+The images are computed by blocks with numpy, from the sieve of iter_coprimes for the nodes and from the
+levels of the tree restricted to the box for the edges (the fathers and sons of a whole level at once), so
+no matplotlib artist is created whatever the size N of the box (up to N = 10**4 and more): an image of
+size x size pixels covers the box [0, N] x [0, N], the row 0 being y = 0. save_png writes an image to a PNG
+file with matplotlib.image (no figure, no display), matplotlib being imported on demand.
+"""
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from .coprimes import iter_coprimes
+from .plotting import xylinefrom
+
+
+def coprime_mask(N: int, chunk: int = 2**20) -> np.array:
+    """ return the image of the coprime pairs of the box [0, N] x [0, N], one pixel per pair,
+        the nodes of the Stern-Brocot tree in N² (the root (1, 1) included)
+
+    Args:
+        N: (int) the largest x and y
+        chunk: (int) the number of cells of the box sieved at once (see iter_coprimes)
+    Returns:
+        the np.array of (N+1)x(N+1) booleans, mask[y, x] being True if x, y >= 1 are relatively prime:
+        only the positive nodes x/y of the tree, the row 0 and the column 0 (0/1 and 1/0) being False
+    Example:
+        coprime_mask(3)[2] -> array([False,  True, False,  True])
+    """
+    mask = np.zeros((N + 1, N + 1), dtype=bool)
+    for xs, ys in iter_coprimes(N, N, chunk):
+        mask[ys, xs] = True
+    return mask
+
+
+def _pixels(xs: np.array, ys: np.array, N: int, size: int) -> np.array:
+    """ the flat indices in the size x size image of the points (xs, ys) of the box [0, N] x [0, N] """
+    scale = size/(N + 1)
+    cols = np.minimum((xs*scale).astype(np.int64), size - 1)
+    rows = np.minimum((ys*scale).astype(np.int64), size - 1)
+    return rows*size + cols
+
+
+def coprime_density(N: int, size: int = 1024, chunk: int = 2**20) -> np.array:
+    """ return the density of the coprime pairs of the box [0, N] x [0, N] in an image of size x size pixels,
+        each pixel covering about ((N+1)/size)**2 cells of the box (6/pi**2 ~ 0.61 on average)
+
+    Args:
+        N: (int) the largest x and y
+        size: (int) the width and height of the image in pixels
+        chunk: (int) the number of cells of the box sieved at once (see iter_coprimes)
+    Returns:
+        the np.array (size, size) of float64, the fraction of the cells of each pixel which are coprime pairs
+    """
+    counts = np.zeros(size*size, dtype=np.int64)
+    for xs, ys in iter_coprimes(N, N, chunk):
+        counts += np.bincount(_pixels(xs, ys, N, size), minlength=size*size)
+    # cells[i]: the number of integers of [0, N] in the column (or the row) i
+    cells = np.bincount(_pixels(np.arange(N + 1), np.zeros(N + 1), N, size), minlength=size)
+    return (counts / np.maximum(np.outer(cells, cells).ravel(), 1)).reshape(size, size)
+
+
+def _box_levels(N: int) -> Iterator[Tuple[np.array, ...]]:
+    """ generate the levels of the Stern-Brocot tree in N² restricted to the box [1, N] x [1, N], as arrays
+        (x, y, c, a, d, b) of the nodes (x, y) and of their bounds c/a < x/y < d/b: the sons of a node being
+        larger than the node, the levels hold all the coprime pairs of the box, the deepest being (N, 1)
+        and (1, N) at the level N-1
+    """
+    x, y = np.ones(1, dtype=np.int64), np.ones(1, dtype=np.int64)
+    c, a, d, b = np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64), np.ones(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    while len(x):
+        yield x, y, c, a, d, b
+        # the left son (x + c, y + a) has the bounds c/a and x/y, the right son (x + d, y + b) x/y and d/b
+        lx, ly, rx, ry = x + c, y + a, x + d, y + b
+        left = (lx <= N) & (ly <= N)
+        right = (rx <= N) & (ry <= N)
+        x, y, c, a, d, b = (np.concatenate((l[left], r[right]))
+                            for l, r in ((lx, rx), (ly, ry), (c, x), (a, y), (x, d), (y, b)))
+
+
+def _level_edges(N: int, kind: str) -> Iterator[Tuple[np.array, np.array]]:
+    """ generate, level by level, the pairs of np.array (n, 2) of the ends of the edges from the nodes of the box
+        to their father, or to their sons clipped to the box
+    """
+    levels = _box_levels(N)
+    if kind == 'father':
+        next(levels)  # the root has no father
+    for x, y, c, a, d, b in levels:
+        pts = np.column_stack((x, y))
+        if kind == 'father':
+            # the father is the deepest bound, as in SBfather
+            yield pts, np.where((c + a > d + b)[:, None], np.column_stack((c, a)), np.column_stack((d, b)))
+        else:
+            for sons in (np.column_stack((x + c, y + a)), np.column_stack((x + d, y + b))):
+                # the sons out of the box are moved back along the edge to its border
+                xs, ys = xylinefrom(pts, sons, (N, N))
+                yield pts, np.column_stack((xs[1], ys[1]))
+
+
+def _edges(N: int, kind: str, chunk: int) -> Iterator[Tuple[np.array, np.array]]:
+    """ the edges of _level_edges regrouped by blocks of about chunk edges (the deep levels are small) """
+    block, size = [], 0
+    for p0, p1 in _level_edges(N, kind):
+        for lo in range(0, len(p0), chunk):
+            block.append((p0[lo:lo+chunk], p1[lo:lo+chunk]))
+            size += len(block[-1][0])
+            if size >= chunk:
+                yield np.concatenate([e[0] for e in block]), np.concatenate([e[1] for e in block])
+                block, size = [], 0
+    if block:
+        yield np.concatenate([e[0] for e in block]), np.concatenate([e[1] for e in block])
+
+
+def edge_density(N: int, size: int = 1024, kind: str = 'father', samples: int = 4, seed: int = 0,
+                 chunk: int = 2**20) -> np.array:
+    """ return the density of the father-son edges of the Stern-Brocot tree in the box [0, N] x [0, N]
+        in an image of size x size pixels: each edge adds its length (in pixels) to the pixels it crosses
+
+    Each edge of length l pixels is sampled at max(samples, ceil(l)) points, less than one pixel apart,
+    stratified along the edge and shifted by a random offset drawn from seed, each adding its share of l to
+    its pixel: every pixel crossed by an edge is reached, so the long edges are drawn as continuous lines, and
+    the image is the same for the same seed. The cost is O(N**2 * (samples + size/5)), the edges being about
+    N/5 long on average.
+
+    Args:
+        N: (int) the largest x and y
+        size: (int) the width and height of the image in pixels
+        kind: (str) 'father' for the edges from each node (x, y) of the box to its father (in the box),
+              'sons' for the edges from each node of the box to its two sons, clipped to the box
+        samples: (int) the smallest number of points sampled on an edge
+        seed: (int) the seed of the offsets of the samples
+        chunk: (int) the number of points sampled at once (about)
+    Returns:
+        the np.array (size, size) of float64, the length of the edges in each pixel, row 0 being y = 0
+    """
+    assert kind in ('father', 'sons'), "{} is not a known kind of edges".format(kind)
+    assert samples >= 1, "{} is not a positive number of samples".format(samples)
+    rng = np.random.default_rng(seed)
+    scale = size/(N + 1)
+    image = np.zeros(size*size)
+    for p0, p1 in _edges(N, kind, max(1, chunk // samples)):
+        x0, y0 = p0[:, 0]*scale, p0[:, 1]*scale
+        dx, dy = p1[:, 0]*scale - x0, p1[:, 1]*scale - y0
+        lengths = np.hypot(dx, dy)
+        counts = np.maximum(samples, np.ceil(lengths).astype(np.int64))
+        # the point k of an edge is at (x0, y0) + (k + offset)*(sx, sy), k = 0, 1, ..., count - 1
+        sx, sy = dx/counts, dy/counts
+        offsets = rng.random(len(x0))
+        x0, y0 = x0 + offsets*sx, y0 + offsets*sy
+        ends = np.cumsum(counts)
+        # the edges lo:hi are sampled at once, about chunk points
+        bounds = np.searchsorted(ends, np.arange(chunk, ends[-1], chunk), side='right')
+        for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(x0)]))):
+            if lo == hi:
+                continue
+            n = counts[lo:hi]
+            k = np.arange(ends[hi - 1] - ends[lo] + n[0]) - np.repeat(ends[lo:hi] - n - (ends[lo] - n[0]), n)
+            cols = np.minimum((np.repeat(x0[lo:hi], n) + k*np.repeat(sx[lo:hi], n)).astype(np.int64), size - 1)
+            rows = np.minimum((np.repeat(y0[lo:hi], n) + k*np.repeat(sy[lo:hi], n)).astype(np.int64), size - 1)
+            image += np.bincount(rows*size + cols, weights=np.repeat(lengths[lo:hi]/n, n), minlength=size*size)
+    return image.reshape(size, size)
+
+
+def save_png(image: np.array, path: str, cmap: str = 'gray_r', log: bool = False,
+             vmax: Optional[float] = None, compress_level: int = 1) -> None:
+    """ write an image (row 0 at the bottom) to a PNG file with matplotlib.image.imsave, without any figure:
+        usable on a headless node, whatever the matplotlib backend
+
+    Args:
+        image: a np.array (h, w) of booleans or numbers, or (h, w, 3|4) of RGB(A) colors
+        path: (str) the name of the PNG file
+        cmap: (str) the matplotlib colormap of the numbers
+        log: (bool) if True, the numbers v are shown as log(1 + v), to see the rare edges beside the dense ones
+        vmax: (float) the value shown with the last color of cmap, the largest value by default
+        compress_level: (int) the zlib compression level of the PNG, from 0 (none) to 9 (smallest, slowest)
+    Returns: None
+    """
+    from matplotlib import colormaps
+    from matplotlib.image import imsave
+    if image.ndim == 2:
+        # the colors are looked up in a table of 256 colors of cmap: much faster than imsave's colormapping
+        # on 10**8 pixels
+        values = np.log1p(image) if log else image.astype(float)
+        vmax = values.max(initial=0) if vmax is None else (np.log1p(vmax) if log else vmax)
+        idx = np.clip(values*(255/vmax if vmax > 0 else 0), 0, 255).astype(np.uint8)
+        lut = (colormaps[cmap](np.linspace(0, 1, 256))[:, :3]*255).astype(np.uint8)
+        image = lut[idx]
+    imsave(path, image, origin='lower', pil_kwargs={'compress_level': compress_level})
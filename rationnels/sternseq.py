@@ -0,0 +1,91 @@
+""" The Stern sequence s(0), s(1), ...: single terms in O(log n) and ranges of terms as numpy arrays """
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+
+def stern_dtype(m: int, a: int = 0, b: int = 1) -> type:
+    """ return the array dtype for the first m levels built from the initial values a, b
+
+    Args:
+        m: (int) the desired number of levels
+        a: (int) first initial value
+        b: (int) second initial value
+    Returns:
+        np.uint64 if all the terms fit in 64 bits (they are bounded by (a+b)*1.62**(m+1)),
+        object (Python integers) otherwise
+    """
+    if a >= 0 and b >= 0 and (a + b)*1.62**(m+1) < 2**64:
+        return np.uint64
+    return object
+
+
+STERN_BLOCK = 2**16
+
+
+def stern(n: int) -> int:
+    """ return the n-th term s(n) of the Stern sequence in O(log n), reading the bits of n
+
+    Args:
+        n: (int) n >= 0
+    Returns:
+        s(n)
+    Example:
+        stern(11) -> 5
+    """
+    a, b = 1, 0
+    while n > 0:
+        if n & 1:
+            b += a
+        else:
+            a += b
+        n >>= 1
+    return b
+
+
+def stern_range(lo: int, hi: int, dtype: Optional[type] = None, cache: bool = False) -> np.array:
+    """ return the terms s(lo), ..., s(hi-1) of the Stern sequence, computed from the terms
+        s(lo//2), ..., s(hi//2) using s(2n) = s(n) and s(2n+1) = s(n) + s(n+1)
+
+    Args:
+        lo: (int) lo >= 0, index of the first term
+        hi: (int) hi >= lo, index after the last term
+        dtype: the array dtype, by default stern_dtype(hi.bit_length())
+        cache: (bool) if True, assemble the result from the cached blocks of stern_block
+    Returns:
+        the np.array of the hi-lo terms
+    Example:
+        stern_range(8, 16) -> array([1, 4, 3, 5, 2, 5, 3, 4], dtype=uint64)
+    """
+    assert 0 <= lo <= hi, "[{}, {}) is not a range of non negative integers".format(lo, hi)
+    if dtype is None:
+        dtype = stern_dtype(hi.bit_length())
+    if cache:
+        blocks = [stern_block(i, dtype) for i in range(lo // STERN_BLOCK, (hi - 1) // STERN_BLOCK + 1)]
+        start = lo - (lo // STERN_BLOCK)*STERN_BLOCK
+        return np.concatenate(blocks)[start:start + hi - lo] if hi > lo else np.empty(0, dtype=dtype)
+    if hi - lo <= 64:
+        return np.array([stern(n) for n in range(lo, hi)], dtype=dtype)
+    half = stern_range(lo // 2, hi // 2 + 1, dtype)
+    idx = (np.arange(hi - lo) + lo % 2) // 2
+    terms = half[idx]
+    odd = np.arange(1 - lo % 2, hi - lo, 2)
+    terms[odd] += half[idx[odd] + 1]
+    return terms
+
+
+@lru_cache(maxsize=64)
+def stern_block(i: int, dtype: type = np.uint64) -> np.array:
+    """ return the i-th block s(i*STERN_BLOCK), ..., s((i+1)*STERN_BLOCK - 1) of the Stern sequence,
+        memoized: the returned array is read-only
+
+    Args:
+        i: (int) the block number
+        dtype: the array dtype
+    Returns:
+        the np.array of the STERN_BLOCK terms of the block
+    """
+    block = stern_range(i*STERN_BLOCK, (i+1)*STERN_BLOCK, dtype)
+    block.flags.writeable = False
+    return block
@@ -0,0 +1,139 @@
+""" On-disk store of deep levels of the Stern-Brocot and Calkin-Wilf trees, read back as memory maps
+
+Each level k is written, block by block, as one .npy file of its 2**k numerators: the denominators are the
+reversed numerators (SBdens = l[::-1], and the same holds in the Calkin-Wilf tree, whose level k is made of the
+inverses of the reversed level), so they are a view of the same file. The numerators of the level k are
+s(2i+1) = s(i) + s(i+1) in the Stern-Brocot tree and s(2**k + i) in the Calkin-Wilf tree, 0 <= i < 2**k, computed
+by stern_range: no level is ever held in memory.
+"""
+import os
+from typing import Any, Iterable, List, Tuple, Union
+
+import numpy as np
+
+from .sternseq import stern_range
+
+STORE_BLOCK = 2**22
+
+
+def level_dtype(k: int) -> type:
+    """ return the smallest unsigned dtype holding the level k, whose terms are at most Fibonacci(k+2) < 1.62**(k+2)
+
+    Args:
+        k: (int) the level number
+    Returns:
+        np.uint32 or np.uint64
+    """
+    assert 1.62**(k+2) < 2**64, "the level {} does not fit in 64 bits".format(k)
+    return np.uint32 if 1.62**(k+2) < 2**32 else np.uint64
+
+
+def level_path(directory: str, k: int, tree: str = 'sb') -> str:
+    """ return the name of the file of the level k of the tree in directory """
+    return os.path.join(directory, '{}_level_{:02d}.npy'.format(tree, k))
+
+
+def level_block(k: int, lo: int, hi: int, tree: str = 'sb', dtype: type = np.uint64) -> np.array:
+    """ return the numerators lo, ..., hi-1 of the level k of the tree
+
+    Args:
+        k: (int) the level number
+        lo: (int) 0 <= lo, index of the first node
+        hi: (int) lo <= hi <= 2**k, index after the last node
+        tree: (str) 'sb' for the Stern-Brocot tree, 'cw' for the Calkin-Wilf tree
+        dtype: the array dtype
+    Returns:
+        the np.array of the hi-lo numerators
+    Example:
+        level_block(3, 0, 8) -> array([1, 2, 3, 3, 4, 5, 5, 4], dtype=uint64)
+    """
+    assert tree in ('sb', 'cw'), "{} is not a known tree".format(tree)
+    if tree == 'cw':
+        return stern_range(2**k + lo, 2**k + hi, dtype)
+    s = stern_range(lo, hi + 1, dtype)
+    return s[:-1] + s[1:]
+
+
+def write_levels(directory: str, levels: Union[int, Iterable[int]], tree: str = 'sb',
+                 block: int = STORE_BLOCK) -> List[str]:
+    """ write levels of the tree in directory, one .npy file of numerators per level, streamed by blocks
+        of block nodes: the memory used is O(block) whatever the level
+
+    Args:
+        directory: (str) the directory of the store, created if needed
+        levels: (int) the number m of levels 0, ..., m-1 or an iterable of level numbers
+        tree: (str) 'sb' for the Stern-Brocot tree, 'cw' for the Calkin-Wilf tree
+        block: (int) the number of nodes computed and written at once
+    Returns:
+        the list of the written files
+    """
+    assert tree in ('sb', 'cw'), "{} is not a known tree".format(tree)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for k in (range(levels) if isinstance(levels, int) else levels):
+        dtype = level_dtype(k)
+        path = level_path(directory, k, tree)
+        nums = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(2**k,))
+        for lo in range(0, 2**k, block):
+            hi = min(lo + block, 2**k)
+            nums[lo:hi] = level_block(k, lo, hi, tree, np.uint64)
+        nums.flush()
+        del nums
+        paths.append(path)
+    return paths
+
+
+class LevelStore:
+    """ the levels of a tree written by write_levels, as read-only np.memmap: store[k] is the level k
+        (the layout of bin_levels) and store[k, idx] the node (level, idx) as a pair (numerator, denominator),
+        without copying anything
+
+    Attributes:
+        directory: (str) the directory of the store
+        tree: (str) 'sb' or 'cw'
+    Example:
+        store = LevelStore('levels'); store[3, 2] -> (3, 5), store.dens(3)[2] -> 5
+    """
+    __slots__ = ('directory', 'tree', '_levels')
+
+    def __init__(self, directory: str, tree: str = 'sb') -> None:
+        assert tree in ('sb', 'cw'), "{} is not a known tree".format(tree)
+        self.directory = directory
+        self.tree = tree
+        self._levels = {}
+
+    def __len__(self) -> int:
+        """ the number of consecutive levels 0, 1, ... in the store """
+        k = 0
+        while os.path.exists(level_path(self.directory, k, self.tree)):
+            k += 1
+        return k
+
+    def __repr__(self) -> str:
+        return "LevelStore('{}', '{}')".format(self.directory, self.tree)
+
+    def nums(self, k: int) -> np.memmap:
+        """ the numerators of the level k, memory-mapped on first access """
+        if k not in self._levels:
+            self._levels[k] = np.load(level_path(self.directory, k, self.tree), mmap_mode='r')
+        return self._levels[k]
+
+    def dens(self, k: int) -> np.memmap:
+        """ the denominators of the level k, the reversed numerators (a view) """
+        return self.nums(k)[::-1]
+
+    def levels(self) -> List[np.memmap]:
+        """ the list of the levels [store[0], store[1], ...], as bin_levels """
+        return [self.nums(k) for k in range(len(self))]
+
+    def __getitem__(self, key: Union[int, Tuple[int, Any]]) -> Any:
+        """ store[k]: the numerators of the level k, store[k, idx]: the node (k, idx) as a pair
+            (numerator, denominator), or a pair of arrays if idx is a slice or an array
+        """
+        if isinstance(key, tuple):
+            k, idx = key
+            nums = self.nums(k)
+            if isinstance(idx, (int, np.integer)):
+                return int(nums[idx]), int(nums[len(nums) - 1 - idx])
+            return nums[idx], self.dens(k)[idx]
+        return self.nums(key)